@@ -0,0 +1,38 @@
+# Librería de LCS: reúne los algoritmos de la actividad para usarlos como funciones
+# desde otro programa (por ejemplo, un servidor de larga duración). Importarla no
+# lanza hilos, no lee sys.argv y no mide recursos; la medición de recursos solo se
+# hace en el main() de cada script. Los motores que dependen de NumPy (lcs_onda)
+# o de módulos más pesados se cargan la primera vez que se usan.
+#
+#   import lcs
+#   lcs.lcs_divcon(A, B, lcs.lcs_bits_fila)
+from lcs_rec import lcs_rec, lcs_rec_memo, MemoLRU, MemoMatriz
+from lcs_dp import lcs_dp, lcs_dp_direcciones, lcs_dp_control, MODOS
+from lcs_divcon import lcs_divcon, lcs_divcon_len, MOTORES
+from lcs_bits import mascaras_bits, lcs_bits_len, lcs_bits_fila, lcs_bits_vector
+from lcs_alfabeto import codificar_pareja, decodificar
+from lcs_banda import lcs_banda, lcs_banda_len
+from lcs_hs import lcs_hs, lcs_hs_len, lcs_auto, lcs_auto_len
+from lcs_incremental import LCSIncremental
+
+# Funciones que se importan de forma diferida: nombre -> módulo
+_DIFERIDAS = {
+    "lcs_onda": "lcs_onda",
+    "lcs_onda_fila": "lcs_onda",
+    "lcs_onda_matriz": "lcs_onda",
+    "lcs_divcon_paralelo": "lcs_paralelo",
+    "lcs_bloques": "lcs_bloques",
+    "lcs_bloques_len": "lcs_bloques",
+    "lcs_bloques_fila": "lcs_bloques",
+    "procesar_lote": "lcs_lote",
+    "lcs_flujo_len": "lcs_flujo",
+    "CacheLCS": "lcs_cache",
+    "lcs_matriz": "lcs_matriz",
+}
+
+def __getattr__(nombre):
+    if nombre in _DIFERIDAS:
+        valor = getattr(__import__(_DIFERIDAS[nombre]), nombre)
+        globals()[nombre] = valor
+        return valor
+    raise AttributeError(f"module 'lcs' has no attribute '{nombre}'")
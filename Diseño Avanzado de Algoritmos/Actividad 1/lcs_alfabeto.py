@@ -0,0 +1,38 @@
+# Representación compacta de las cadenas de entrada del LCS. Cada cadena se codifica
+# una sola vez con una tabla de símbolos (un byte por carácter si el alfabeto tiene
+# como mucho 256 símbolos) y los algoritmos trabajan sobre vistas memoryview de ese
+# búfer, que se pueden recortar e invertir sin copiar. El LCS solo se decodifica al final.
+from array import array
+
+# Función para construir la tabla de símbolos común a varias cadenas
+def tabla_simbolos(*cadenas):
+    simbolos = sorted(set().union(*cadenas))
+    return simbolos, {c: k for k, c in enumerate(simbolos)}
+
+# Función para codificar una cadena con la tabla de símbolos. Devuelve bytes si el
+# alfabeto cabe en un byte y array('I') en caso contrario
+def codificar(A, codigos):
+    if len(codigos) <= 256:
+        return bytes(A.translate({ord(c): k for c, k in codigos.items()}), "latin-1")
+    return array('I', [codigos[c] for c in A])
+
+# Función para codificar una pareja de cadenas con una tabla común. Devuelve las
+# vistas de A y B y la lista de símbolos para decodificar
+def codificar_pareja(A, B):
+    simbolos, codigos = tabla_simbolos(A, B)
+    return memoryview(codificar(A, codigos)), memoryview(codificar(B, codigos)), simbolos
+
+# Función para decodificar una secuencia de códigos (o una lista de vistas sobre
+# ella) a la cadena original
+def decodificar(codigos, simbolos):
+    if isinstance(codigos, list):
+        if len(simbolos) <= 256:
+            codigos = b"".join(codigos)
+        else:
+            datos = array('I')
+            for vista in codigos:
+                datos.frombytes(vista)
+            codigos = datos
+    if len(simbolos) <= 256:
+        return bytes(codigos).decode("latin-1").translate(dict(enumerate(simbolos)))
+    return "".join(simbolos[k] for k in codigos)
@@ -0,0 +1,158 @@
+# LCS en banda diagonal para cadenas casi idénticas (estilo Ukkonen). Solo se calculan
+# las celdas cuya diagonal t = j - i está a distancia k como mucho de la diagonal que
+# une (0, 0) con (la, lb), y k se duplica hasta que el resultado es óptimo con garantía.
+#
+# Cota de optimalidad: un camino que sale de la banda tiene al menos |lb - la| + 2k + 2
+# saltos (movimientos que no son diagonales). Como un LCS de longitud L tiene
+# la + lb - 2L saltos, si el mejor camino dentro de la banda tiene como mucho
+# |lb - la| + 2k + 1 saltos, cualquier LCS está dentro de la banda y el resultado es exacto.
+#
+# El cálculo por banda se usa como fila del corte de Hirschberg, de forma que la
+# reconstrucción sigue necesitando solo memoria lineal.
+import sys
+import time
+from lcs_alfabeto import codificar_pareja, decodificar
+
+# Valor de las celdas fuera de la banda (inalcanzables)
+INALCANZABLE = -(1 << 62)
+
+# Anchura inicial de la banda a cada lado de la diagonal
+K_INICIAL = 8
+
+# Función para calcular los límites de la banda [t_min, t_max] de anchura k
+def limites_banda(la, lb, k):
+    d = lb - la
+    return min(0, d) - k, max(0, d) + k
+
+# Función para calcular la última fila DP entre A y B restringida a los caminos que
+# no salen de la banda t_min <= j - i <= t_max. Las columnas fuera de la banda de la
+# última fila valen INALCANZABLE. Solo se recorren las celdas de la banda, por lo que
+# el coste es O(la * (t_max - t_min))
+def lcs_banda_fila(A, B, t_min, t_max):
+    la, lb = len(A), len(B)
+    X = [INALCANZABLE] * (lb + 1)
+    Y = [INALCANZABLE] * (lb + 1)
+
+    # Fila 0: las celdas de la banda valen 0
+    jlo, jhi = max(0, t_min), min(lb, t_max)
+    for j in range(jlo, jhi + 1):
+        X[j] = 0
+
+    for i in range(1, la + 1):
+        jlo, jhi = max(0, i + t_min), min(lb, i + t_max)
+
+        # La celda a la izquierda de la banda puede tener un valor antiguo de este búfer
+        if jlo > 0:
+            Y[jlo - 1] = INALCANZABLE
+
+        a = A[i - 1]
+        for j in range(jlo, jhi + 1):
+            if j == 0:
+                Y[0] = 0
+            elif a == B[j - 1]:
+                Y[j] = X[j - 1] + 1
+            else:
+                Y[j] = max(X[j], Y[j - 1])
+
+        # Alternamos las filas para la siguiente iteración
+        X, Y = Y, X
+
+    fila = [INALCANZABLE] * (lb + 1)
+    fila[jlo:jhi + 1] = X[jlo:jhi + 1]
+    return fila
+
+# Función para saber si el resultado de la banda de anchura k es óptimo con garantía
+def es_optimo(la, lb, k, longitud):
+    t_min, t_max = limites_banda(la, lb, k)
+    if t_min <= -la and t_max >= lb:
+        return True
+    return la + lb - 2 * longitud <= abs(lb - la) + 2 * k + 1
+
+# Función para calcular la longitud del LCS duplicando la banda hasta que es óptima
+def lcs_banda_len(A, B, k=K_INICIAL):
+    la, lb = len(A), len(B)
+    while True:
+        longitud = lcs_banda_fila(A, B, *limites_banda(la, lb, k))[lb]
+        if es_optimo(la, lb, k, longitud):
+            return longitud
+        k = max(1, 2 * k)
+
+# LCS completo: Hirschberg con las filas del corte calculadas en banda
+def lcs_banda(A, B, k=K_INICIAL):
+    a, b, simbolos = codificar_pareja(A, B)
+    piezas = []
+    lcs_banda_vistas(a, b, k, piezas)
+    return decodificar(piezas, simbolos)
+
+# Recursión de Hirschberg sobre las vistas codificadas (ver lcs_divcon_vistas)
+def lcs_banda_vistas(A, B, k_inicial, piezas):
+    la, lb = len(A), len(B)
+
+    # Pasos base
+    if 0 in (la, lb): return
+    if la == 1:
+        if A[0] in B: piezas.append(A)
+        return
+    if lb == 1:
+        if B[0] in A: piezas.append(B)
+        return
+
+    piv = la // 2
+    A1, A2 = A[:piv], A[piv:]
+    A2_rev, B_rev = A2[::-1], B[::-1]
+
+    # La banda es simétrica: en las cadenas invertidas la diagonal t pasa a ser
+    # lb - la - t, y el intervalo [t_min, t_max] se transforma en sí mismo
+    k = k_inicial
+    while True:
+        t_min, t_max = limites_banda(la, lb, k)
+        L1 = lcs_banda_fila(A1, B, t_min, t_max)
+        L2 = lcs_banda_fila(A2_rev, B_rev, t_min, t_max)
+
+        # Buscamos el punto de corte óptimo como en lcs_divcon
+        max_sum = -1
+        for i in range(lb + 1):
+            current_sum = L1[i] + L2[lb - i]
+            if current_sum > max_sum:
+                max_sum = current_sum
+                j = i
+
+        if es_optimo(la, lb, k, max_sum):
+            break
+        k = max(1, 2 * k)
+
+    lcs_banda_vistas(A1, B[:j], k_inicial, piezas)
+    lcs_banda_vistas(A2, B[j:], k_inicial, piezas)
+
+# Punto de entrada del script
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    if not argv:
+        print("Uso: python lcs_banda.py <entrada.txt> [anchura inicial de la banda]")
+        return 1
+
+    entrada = argv[0]
+    k = int(argv[1]) if len(argv) > 1 else K_INICIAL
+
+    # Medición de recursos (tiempo de CPU y pico de memoria)
+    from perfilado import Perfil
+    perfil = Perfil().iniciar()
+    inicio = time.time()
+
+    with open(entrada, "r", encoding="utf-8") as f:
+        cadenas = f.readlines()
+    A = cadenas[0].strip()
+    B = cadenas[1].strip()
+
+    res = lcs_banda(A, B, k)
+
+    fin = time.time()
+    max_mem = perfil.detener().memoria()
+
+    print(res, "| Longitud de ", len(res))
+    print("Tiempo de ejecución: ", fin - inicio, "segundos.")
+    print("Uso máximo de memoria: ", max_mem / (1024*1024), "MB.")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,245 @@
+# Banco de pruebas unificado de los algoritmos de LCS. Importa los algoritmos como
+# funciones y mide cada ejecución por separado, sin incluir la lectura de archivos:
+#   - tiempo con perf_counter_ns (mejor de varias repeticiones)
+#   - pico de memoria de Python con tracemalloc (en una ejecución aparte para no
+#     afectar al tiempo)
+#   - pico de memoria del proceso con ru_maxrss. Cada medición se hace en un proceso
+#     nuevo para que el pico corresponda solo a esa ejecución
+# Recorre los datasets 25/250/500/750/1000 y varios generadores sintéticos, guarda los
+# resultados en JSON y ajusta una curva de complejidad t = c * n^k por algoritmo.
+import os
+import sys
+import json
+import math
+import time
+import random
+import argparse
+import tracemalloc
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from perfilado import pico_rss
+
+CARPETA = os.path.dirname(os.path.abspath(__file__))
+if CARPETA not in sys.path:
+    sys.path.insert(0, CARPETA)
+DATASETS = ("25", "250", "500", "750", "1000")
+TAMANOS = (25, 250, 500, 750, 1000)
+
+# Tamaños para los algoritmos exponenciales, que no pueden con los anteriores
+TAMANOS_PEQUENOS = (4, 6, 8, 10, 12)
+
+# Algoritmos disponibles: nombre -> (módulo, función, argumentos extra, tamaño máximo).
+# Un argumento extra que sea el nombre de un motor del diccionario MOTORES del módulo
+# (por ejemplo "bits" en lcs_divcon) se sustituye por la función del motor
+ALGORITMOS = {
+    "rec": ("lcs_rec", "lcs_rec", (), 12),
+    "rec_memo": ("lcs_rec", "lcs_rec_memo", ("matriz",), None),
+    "dp": ("lcs_dp", "lcs_dp", ("matriz",), None),
+    "dp_direcciones": ("lcs_dp", "lcs_dp", ("direcciones",), None),
+    "dp_control": ("lcs_dp", "lcs_dp", ("control",), None),
+    "divcon": ("lcs_divcon", "lcs_divcon", (), None),
+    "divcon_bits": ("lcs_divcon", "lcs_divcon", ("bits",), None),
+    "onda": ("lcs_onda", "lcs_onda", (), None),
+    "banda": ("lcs_banda", "lcs_banda", (), None),
+    "hs": ("lcs_hs", "lcs_hs", (), None),
+    "bloques": ("lcs_bloques", "lcs_bloques", (), None),
+    "auto": ("lcs_hs", "lcs_auto", (), None),
+}
+
+# Generadores sintéticos de parejas de tamaño n
+def gen_aleatorio(n, rnd):
+    return ("".join(rnd.choice("ABCD") for _ in range(n)),
+            "".join(rnd.choice("ABCD") for _ in range(n)))
+
+def gen_identicas(n, rnd):
+    A = "".join(rnd.choice("ABCD") for _ in range(n))
+    return A, A
+
+def gen_casi_identicas(n, rnd):
+    A = "".join(rnd.choice("ABCD") for _ in range(n))
+    B = list(A)
+    for _ in range(max(1, n // 100)):
+        B[rnd.randrange(n)] = rnd.choice("ABCD")
+    return A, "".join(B)
+
+def gen_disjuntas(n, rnd):
+    return ("".join(rnd.choice("AB") for _ in range(n)),
+            "".join(rnd.choice("CD") for _ in range(n)))
+
+def gen_sesgado(n, rnd):
+    pesos = (0.85, 0.05, 0.05, 0.05)
+    return ("".join(rnd.choices("ABCD", pesos, k=n)),
+            "".join(rnd.choices("ABCD", pesos, k=n)))
+
+GENERADORES = {
+    "aleatorio": gen_aleatorio,
+    "identicas": gen_identicas,
+    "casi_identicas": gen_casi_identicas,
+    "disjuntas": gen_disjuntas,
+    "sesgado": gen_sesgado,
+}
+
+# Función para obtener la función de un algoritmo a partir de su nombre
+def cargar_algoritmo(nombre):
+    modulo, funcion, extra, _ = ALGORITMOS[nombre]
+    modulo = __import__(modulo)
+    f = getattr(modulo, funcion)
+    motores = getattr(modulo, "MOTORES", {})
+    extra = tuple(motores[x] if isinstance(x, str) and motores.get(x) else x for x in extra)
+    return lambda A, B: f(A, B, *extra)
+
+# Medición de un algoritmo sobre una pareja. Se ejecuta en un proceso nuevo
+def medir(nombre, A, B, repeticiones):
+    algoritmo = cargar_algoritmo(nombre)
+    rss_base = pico_rss()
+
+    # Tiempo: mejor de las repeticiones
+    tiempos = []
+    for _ in range(repeticiones):
+        inicio = time.perf_counter_ns()
+        res = algoritmo(A, B)
+        tiempos.append(time.perf_counter_ns() - inicio)
+    rss_pico = pico_rss()
+
+    # Memoria de Python en una ejecución aparte
+    tracemalloc.start()
+    algoritmo(A, B)
+    _, pico_python = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        "algoritmo": nombre,
+        "la": len(A),
+        "lb": len(B),
+        "longitud": len(res),
+        "tiempo_ns": min(tiempos),
+        "tiempos_ns": tiempos,
+        "pico_python_bytes": pico_python,
+        "pico_rss_bytes": rss_pico,
+        "rss_base_bytes": rss_base,
+    }
+
+# Función para cargar un dataset de la carpeta
+def leer_dataset(nombre):
+    with open(os.path.join(CARPETA, nombre + ".txt"), "r", encoding="utf-8") as f:
+        cadenas = f.readlines()
+    return cadenas[0].strip(), cadenas[1].strip()
+
+# Función para generar todos los casos (serie, n, A, B) de un algoritmo
+def casos(nombre, semilla):
+    limite = ALGORITMOS[nombre][3]
+    if limite is None:
+        for d in DATASETS:
+            A, B = leer_dataset(d)
+            yield "datasets", len(A), A, B
+    tamanos = TAMANOS if limite is None else [n for n in TAMANOS_PEQUENOS if n <= limite]
+    for serie, generador in GENERADORES.items():
+        rnd = random.Random(semilla)
+        for n in tamanos:
+            A, B = generador(n, rnd)
+            yield serie, n, A, B
+
+# Ajuste por mínimos cuadrados de log(t) = k * log(n) + log(c). Devuelve k, c y el
+# coeficiente de determinación
+def ajustar_curva(puntos):
+    puntos = [(math.log(n), math.log(t)) for n, t in puntos if n > 0 and t > 0]
+    if len(puntos) < 2:
+        return None
+    m = len(puntos)
+    sx = sum(x for x, _ in puntos)
+    sy = sum(y for _, y in puntos)
+    sxx = sum(x * x for x, _ in puntos)
+    sxy = sum(x * y for x, y in puntos)
+    den = m * sxx - sx * sx
+    if den == 0:
+        return None
+    k = (m * sxy - sx * sy) / den
+    b = (sy - k * sx) / m
+    media = sy / m
+    total = sum((y - media) ** 2 for _, y in puntos)
+    residuo = sum((y - (k * x + b)) ** 2 for x, y in puntos)
+    return {"exponente": k, "constante_ns": math.exp(b), "r2": 1 - residuo / total if total else 1.0}
+
+# Función para comparar con un informe anterior. Devuelve las mediciones que son más
+# lentas que antes por encima de la tolerancia y los ajustes cuyo exponente ha crecido
+def regresiones(informe, anterior, tolerancia=1.5, margen_exponente=0.2):
+    previos = {(r["algoritmo"], r["serie"], r["n"]): r for r in anterior["resultados"]}
+    avisos = []
+    for r in informe["resultados"]:
+        previo = previos.get((r["algoritmo"], r["serie"], r["n"]))
+        if previo and r["tiempo_ns"] > previo["tiempo_ns"] * tolerancia:
+            avisos.append(f"{r['algoritmo']} {r['serie']} n={r['n']}: "
+                          f"{previo['tiempo_ns'] / 1e6:.3f} ms -> {r['tiempo_ns'] / 1e6:.3f} ms")
+    for nombre, series in informe["ajustes"].items():
+        for serie, ajuste in series.items():
+            previo = anterior["ajustes"].get(nombre, {}).get(serie)
+            if previo and ajuste["exponente"] > previo["exponente"] + margen_exponente:
+                avisos.append(f"{nombre} {serie}: exponente {previo['exponente']:.2f} -> {ajuste['exponente']:.2f}")
+    return avisos
+
+# Ejecución completa del banco de pruebas
+def ejecutar(algoritmos, repeticiones=3, semilla=1, aislar=True):
+    resultados = []
+    contexto = multiprocessing.get_context("spawn")
+
+    for nombre in algoritmos:
+        for serie, n, A, B in casos(nombre, semilla):
+            if aislar:
+                with ProcessPoolExecutor(max_workers=1, mp_context=contexto) as ejecutor:
+                    r = ejecutor.submit(medir, nombre, A, B, repeticiones).result()
+            else:
+                r = medir(nombre, A, B, repeticiones)
+            r["serie"] = serie
+            r["n"] = n
+            resultados.append(r)
+            print(f"{nombre:15} {serie:10} n={n:5}  {r['tiempo_ns'] / 1e6:10.3f} ms  "
+                  f"{r['pico_python_bytes'] / 1024:10.1f} KB", file=sys.stderr)
+
+    # Ajustamos una curva por algoritmo y serie
+    ajustes = {}
+    for nombre in algoritmos:
+        ajustes[nombre] = {}
+        for serie in ("datasets",) + tuple(GENERADORES):
+            puntos = [(r["n"], r["tiempo_ns"]) for r in resultados
+                      if r["algoritmo"] == nombre and r["serie"] == serie]
+            ajuste = ajustar_curva(puntos)
+            if ajuste:
+                ajustes[nombre][serie] = ajuste
+
+    return {"resultados": resultados, "ajustes": ajustes}
+
+# Punto de entrada del script
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Banco de pruebas de los algoritmos de LCS")
+    parser.add_argument("-a", "--algoritmos", nargs="+", choices=list(ALGORITMOS), default=list(ALGORITMOS))
+    parser.add_argument("-r", "--repeticiones", type=int, default=3)
+    parser.add_argument("-s", "--semilla", type=int, default=1)
+    parser.add_argument("-o", "--salida", default="benchmark_lcs.json")
+    parser.add_argument("-c", "--comparar", help="informe JSON anterior con el que buscar regresiones")
+    parser.add_argument("--sin-aislar", action="store_true", help="medir en el mismo proceso (ru_maxrss deja de ser por ejecución)")
+    args = parser.parse_args(argv)
+
+    informe = ejecutar(args.algoritmos, args.repeticiones, args.semilla, not args.sin_aislar)
+    with open(args.salida, "w", encoding="utf-8") as f:
+        json.dump(informe, f, indent=2)
+
+    print()
+    print("Curvas de complejidad ajustadas (t = c * n^k):")
+    for nombre, series in informe["ajustes"].items():
+        for serie, ajuste in series.items():
+            print(f"  {nombre:15} {serie:10} k = {ajuste['exponente']:.2f}  (R² = {ajuste['r2']:.3f})")
+    print(f"Resultados guardados en {args.salida}")
+
+    if args.comparar:
+        with open(args.comparar, "r", encoding="utf-8") as f:
+            avisos = regresiones(informe, json.load(f))
+        print()
+        print(f"Regresiones respecto a {args.comparar}: {len(avisos)}")
+        for aviso in avisos:
+            print("  " + aviso)
+        if avisos:
+            return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,92 @@
+# Cálculo de la longitud del LCS mediante paralelismo de bits (Allison-Dix / Hyyrö).
+# Cada fila de la tabla DP se codifica como un entero de Python que hace de vector
+# de bits sobre B, de forma que procesar un carácter de A cuesta O(|B|/w)
+# operaciones de palabra en lugar de O(|B|) comparaciones sueltas.
+from itertools import accumulate
+
+# Por encima de este tamaño de alfabeto deja de compensar recorrer B una vez por símbolo
+MAX_ALFABETO_TRADUCCION = 64
+
+# Función para calcular la máscara de coincidencias de cada símbolo de B.
+# El bit j de la máscara de un símbolo vale 1 si B[j] es ese símbolo
+def mascaras_bits(B):
+    mascaras = {}
+
+    # Las vistas de un byte por símbolo (lcs_alfabeto) se copian a bytes para poder
+    # usar translate, que es mucho más rápido que recorrerlas desde Python
+    if isinstance(B, memoryview) and B.itemsize == 1:
+        B = B.tobytes()
+    simbolos = set(B)
+
+    # Con alfabetos pequeños traducimos B a una cadena binaria por símbolo y dejamos
+    # que int() haga el empaquetado de bits (todo en C)
+    if isinstance(B, str) and len(simbolos) <= MAX_ALFABETO_TRADUCCION:
+        B_rev = B[::-1]
+        ceros = {ord(c): '0' for c in simbolos}
+        for s in simbolos:
+            tabla = dict(ceros)
+            tabla[ord(s)] = '1'
+            mascaras[s] = int(B_rev.translate(tabla), 2)
+        return mascaras
+
+    # Lo mismo para cadenas de bytes, en las que cada símbolo es un entero de 0 a 255
+    if isinstance(B, (bytes, bytearray)) and len(simbolos) <= MAX_ALFABETO_TRADUCCION:
+        B_rev = B[::-1]
+        for s in simbolos:
+            tabla = bytearray(b'0' * 256)
+            tabla[s] = ord('1')
+            mascaras[s] = int(B_rev.translate(tabla), 2)
+        return mascaras
+
+    # Con alfabetos grandes agrupamos las posiciones de cada símbolo y las
+    # empaquetamos en un bytearray que solo cubre el tramo donde aparece
+    posiciones = {}
+    for j, c in enumerate(B):
+        posiciones.setdefault(c, []).append(j)
+    for s, pos in posiciones.items():
+        base = pos[0] & ~7
+        bits = bytearray(((pos[-1] - base) >> 3) + 1)
+        for j in pos:
+            bits[(j - base) >> 3] |= 1 << ((j - base) & 7)
+        mascaras[s] = int.from_bytes(bits, 'little') << base
+    return mascaras
+
+# Función que recorre A actualizando el vector de bits. Al terminar, el número de
+# bits a 0 entre las j primeras posiciones es la longitud del LCS entre A y B[:j].
+# Si se indica V se continúa desde ese vector, lo que permite procesar A por trozos
+def lcs_bits_vector(A, mascaras, lb, V=None):
+    todos = (1 << lb) - 1
+    if V is None:
+        V = todos
+    for c in A:
+        U = V & mascaras.get(c, 0)
+        V = ((V + U) | (V - U)) & todos
+    return V
+
+# Función para calcular únicamente la longitud del LCS entre A y B
+def lcs_bits_len(A, B, mascaras=None):
+    lb = len(B)
+    if mascaras is None:
+        mascaras = mascaras_bits(B)
+    V = lcs_bits_vector(A, mascaras, lb)
+    return lb - bin(V).count('1')
+
+# Función para expandir el vector de bits a la fila DP completa
+def fila_desde_vector(V, lb):
+    if lb == 0:
+        return [0]
+
+    # Invertimos la cadena binaria para que el carácter j corresponda al bit j y
+    # contamos los ceros acumulados
+    bits = bin(V)[2:].zfill(lb)[::-1]
+    fila = [0]
+    fila.extend(accumulate(map(int, bits.translate({ord('0'): '1', ord('1'): '0'}))))
+    return fila
+
+# Función equivalente a lcs_divcon_len: devuelve la última fila de la tabla DP del
+# LCS entre A y B, de forma que se pueda usar para el corte de Hirschberg
+def lcs_bits_fila(A, B, mascaras=None):
+    lb = len(B)
+    if mascaras is None:
+        mascaras = mascaras_bits(B)
+    return fila_desde_vector(lcs_bits_vector(A, mascaras, lb), lb)
@@ -0,0 +1,146 @@
+# LCS por bloques (tiling). La tabla DP se divide en bloques de TAM_BLOQUE x TAM_BLOQUE
+# celdas y cada bloque se calcula en un búfer plano array('i') que cabe en caché, en
+# lugar de recorrer listas de listas. Entre bloques solo se pasan los bordes: la última
+# fila (hacia el bloque de abajo) y la última columna (hacia el de la derecha).
+#
+# Los bloques de una misma antidiagonal de bloques no dependen entre sí, así que se
+# reparten entre los procesos de un ProcessPoolExecutor. La longitud sale del último
+# borde y la reconstrucción se hace con el corte de Hirschberg de lcs_divcon usando
+# este cálculo por bloques como motor de filas.
+import os
+import sys
+import time
+import argparse
+from array import array
+from functools import partial
+from concurrent.futures import ProcessPoolExecutor
+from lcs_divcon import lcs_divcon
+
+# Lado de cada bloque. 128x128 enteros de 4 bytes ocupan 64 KB
+TAM_BLOQUE = 128
+
+# Función para calcular un bloque a partir de su borde superior (arriba, con la esquina
+# en la posición 0) y su borde izquierdo (izquierda, también con la esquina). Devuelve
+# la última fila y la última columna del bloque
+def calcular_bloque(A, B, arriba, izquierda):
+    h, w = len(A), len(B)
+    ancho = w + 1
+    M = array('i', bytes(4 * (h + 1) * ancho))
+    M[0:ancho] = arriba
+
+    for i in range(1, h + 1):
+        base = i * ancho
+        previa = base - ancho
+        izq = izquierda[i]
+        M[base] = izq
+        a = A[i - 1]
+        for j in range(1, ancho):
+            if a == B[j - 1]:
+                v = M[previa + j - 1] + 1
+            else:
+                v = M[previa + j]
+                if izq > v:
+                    v = izq
+            M[base + j] = v
+            izq = v
+
+    return M[h * ancho:], M[w::ancho]
+
+# Función para extraer el trozo de una cadena que necesita un bloque. Las vistas
+# memoryview (las que usa lcs_divcon) se copian para poder mandarlas a otro proceso
+def _trozo(X, inicio, fin):
+    trozo = X[inicio:fin]
+    if isinstance(trozo, memoryview):
+        return trozo.tobytes() if trozo.itemsize == 1 else trozo.tolist()
+    return trozo
+
+# Función para calcular la última fila DP entre A y B por bloques (mismo resultado que
+# lcs_divcon_len). Con ejecutor, los bloques de cada antidiagonal se calculan en paralelo
+def lcs_bloques_fila(A, B, tam=TAM_BLOQUE, ejecutor=None):
+    la, lb = len(A), len(B)
+    if la == 0 or lb == 0:
+        return [0] * (lb + 1)
+
+    filas = [(i, min(i + tam, la)) for i in range(0, la, tam)]
+    columnas = [(j, min(j + tam, lb)) for j in range(0, lb, tam)]
+    trozos_a = [_trozo(A, i0, i1) for i0, i1 in filas]
+    trozos_b = [_trozo(B, j0, j1) for j0, j1 in columnas]
+
+    # Bordes pendientes: el inferior de cada columna de bloques y el derecho de cada
+    # fila de bloques. Al principio son la fila y la columna 0 de la tabla
+    abajo = [array('i', bytes(4 * (j1 - j0 + 1))) for j0, j1 in columnas]
+    derecha = [array('i', bytes(4 * (i1 - i0 + 1))) for i0, i1 in filas]
+
+    nf, nc = len(filas), len(columnas)
+    for s in range(nf + nc - 1):
+        bloques = [(bi, s - bi) for bi in range(max(0, s - nc + 1), min(nf, s + 1))]
+        if ejecutor is not None and len(bloques) > 1:
+            futuros = [ejecutor.submit(calcular_bloque, trozos_a[bi], trozos_b[bj], abajo[bj], derecha[bi])
+                       for bi, bj in bloques]
+            resultados = [f.result() for f in futuros]
+        else:
+            resultados = [calcular_bloque(trozos_a[bi], trozos_b[bj], abajo[bj], derecha[bi])
+                          for bi, bj in bloques]
+        for (bi, bj), (fila, columna) in zip(bloques, resultados):
+            abajo[bj] = fila
+            derecha[bi] = columna
+
+    # Unimos los bordes inferiores sin repetir las esquinas compartidas
+    res = abajo[0].tolist()
+    for fila in abajo[1:]:
+        res.extend(fila[1:])
+    return res
+
+# Longitud del LCS por bloques
+def lcs_bloques_len(A, B, tam=TAM_BLOQUE, ejecutor=None):
+    return lcs_bloques_fila(A, B, tam, ejecutor)[-1]
+
+# LCS completo: Hirschberg con las filas calculadas por bloques. Con procesos > 1 se
+# abre un ProcessPoolExecutor que se reutiliza en todos los cortes
+def lcs_bloques(A, B, tam=TAM_BLOQUE, procesos=1):
+    if procesos == 1:
+        return lcs_divcon(A, B, partial(lcs_bloques_fila, tam=tam))
+    with ProcessPoolExecutor(max_workers=procesos) as ejecutor:
+        return lcs_divcon(A, B, partial(lcs_bloques_fila, tam=tam, ejecutor=ejecutor))
+
+# Punto de entrada del script
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="LCS por bloques con paralelismo por antidiagonales")
+    parser.add_argument("entrada", help="archivo con las cadenas A y B en dos líneas")
+    parser.add_argument("-p", "--procesos", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("-t", "--tam", type=int, default=TAM_BLOQUE, help="lado de cada bloque")
+    parser.add_argument("--lcs", action="store_true", help="reconstruir también la cadena LCS")
+    args = parser.parse_args(argv)
+
+    # Medición de recursos sumando el pico de los procesos trabajadores
+    from perfilado import Perfil
+    perfil = Perfil(hijos=True).iniciar()
+    inicio = time.time()
+
+    with open(args.entrada, "r", encoding="utf-8") as f:
+        cadenas = f.readlines()
+    A = cadenas[0].strip()
+    B = cadenas[1].strip()
+
+    if args.lcs:
+        res = lcs_bloques(A, B, args.tam, args.procesos)
+        longitud = len(res)
+    elif args.procesos == 1:
+        longitud = lcs_bloques_len(A, B, args.tam)
+    else:
+        with ProcessPoolExecutor(max_workers=args.procesos) as ejecutor:
+            longitud = lcs_bloques_len(A, B, args.tam, ejecutor)
+
+    fin = time.time()
+    max_mem = perfil.detener().memoria()
+
+    if args.lcs:
+        print(res, "| Longitud de ", longitud)
+    else:
+        print("Longitud del LCS: ", longitud)
+    print("Tiempo de ejecución: ", fin - inicio, "segundos.")
+    print("Uso máximo de memoria: ", max_mem / (1024*1024), "MB.")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,175 @@
+# Caché persistente de resultados de LCS en SQLite, direccionada por contenido. La
+# clave de cada resultado es el SHA-256 de (algoritmo, A, B), de forma que el mismo
+# cálculo repetido en otra ejecución se lee del disco en lugar de recalcularse.
+#
+# Además de los resultados se guarda, para cada B, la última fila DP de algunos
+# prefijos de A (como vector de bits de lcs_bits, igual que los puntos de control de
+# lcs_flujo). Si se pide la longitud del LCS de una A que extiende un prefijo ya
+# calculado, solo se procesan los caracteres nuevos.
+#
+# El tamaño total se limita con expulsión LRU: cada lectura actualiza el contador de
+# uso y, al superar el máximo, se borran las entradas usadas hace más tiempo.
+import sys
+import time
+import sqlite3
+import hashlib
+import argparse
+from lcs_bits import mascaras_bits, lcs_bits_vector, lcs_bits_fila
+from lcs_divcon import lcs_divcon
+from lcs_dp import lcs_dp
+
+# Algoritmos que se pueden cachear: nombre -> función (A, B) -> LCS
+ALGORITMOS = {
+    "dp": lcs_dp,
+    "divcon": lcs_divcon,
+    "divcon_bits": lambda A, B: lcs_divcon(A, B, lcs_bits_fila),
+}
+
+# Tamaño máximo por defecto de la caché (resultados y filas) en bytes
+MAX_BYTES = 64 * 1024 * 1024
+
+# Número máximo de prefijos de A que se comprueban al buscar una fila guardada
+MAX_CANDIDATOS = 16
+
+# Función para calcular la clave de una pareja. Se incluye la longitud de A para que
+# (A, B) y (A + x, B[1:]) no compartan clave
+def clave(*partes):
+    h = hashlib.sha256()
+    for parte in partes:
+        datos = parte.encode("utf-8", "surrogatepass")
+        h.update(len(datos).to_bytes(8, "little"))
+        h.update(datos)
+    return h.hexdigest()
+
+class CacheLCS:
+    def __init__(self, ruta="lcs_cache.sqlite", max_bytes=MAX_BYTES):
+        self.max_bytes = max_bytes
+        self.conexion = sqlite3.connect(ruta)
+        self.conexion.executescript("""
+            CREATE TABLE IF NOT EXISTS resultados (
+                clave TEXT PRIMARY KEY, algoritmo TEXT, lcs TEXT, tam INTEGER, uso INTEGER);
+            CREATE TABLE IF NOT EXISTS filas (
+                clave TEXT PRIMARY KEY, clave_b TEXT, la INTEGER, vector BLOB, tam INTEGER, uso INTEGER);
+            CREATE INDEX IF NOT EXISTS filas_b ON filas (clave_b, la);
+        """)
+        self.aciertos = 0
+        self.fallos = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *excepcion):
+        self.cerrar()
+
+    def cerrar(self):
+        self.conexion.close()
+
+    # Contador de uso para la LRU: nanosegundos, creciente entre ejecuciones
+    def _uso(self):
+        return time.time_ns()
+
+    # LCS de A y B con el algoritmo indicado, leído de la caché si ya se calculó
+    def lcs(self, A, B, algoritmo="divcon_bits"):
+        c = clave(algoritmo, A, B)
+        fila = self.conexion.execute("SELECT lcs FROM resultados WHERE clave = ?", (c,)).fetchone()
+        if fila is not None:
+            self.aciertos += 1
+            with self.conexion:
+                self.conexion.execute("UPDATE resultados SET uso = ? WHERE clave = ?", (self._uso(), c))
+            return fila[0]
+
+        self.fallos += 1
+        res = ALGORITMOS[algoritmo](A, B)
+        with self.conexion:
+            self.conexion.execute("INSERT OR REPLACE INTO resultados VALUES (?, ?, ?, ?, ?)",
+                                  (c, algoritmo, res, len(c) + len(res.encode("utf-8", "surrogatepass")), self._uso()))
+            self._expulsar()
+        return res
+
+    # Función para buscar la fila guardada del prefijo más largo de A. Devuelve la
+    # longitud del prefijo y su vector, o (0, None)
+    def _buscar_fila(self, A, clave_b):
+        candidatos = self.conexion.execute(
+            "SELECT clave, la, vector FROM filas WHERE clave_b = ? AND la <= ? ORDER BY la DESC LIMIT ?",
+            (clave_b, len(A), MAX_CANDIDATOS)).fetchall()
+        for c, la, vector in candidatos:
+            if c == clave(clave_b, A[:la]):
+                with self.conexion:
+                    self.conexion.execute("UPDATE filas SET uso = ? WHERE clave = ?", (self._uso(), c))
+                return la, int.from_bytes(vector, "little")
+        return 0, None
+
+    # Longitud del LCS de A y B. Continúa desde la fila del prefijo de A más largo que
+    # haya en la caché y guarda la fila final para las siguientes extensiones de A
+    def longitud(self, A, B):
+        lb = len(B)
+        clave_b = clave(B)
+        inicio, V = self._buscar_fila(A, clave_b)
+        if inicio == len(A) and V is not None:
+            self.aciertos += 1
+        else:
+            self.fallos += 1
+            V = lcs_bits_vector(A[inicio:], mascaras_bits(B), lb, V)
+            vector = V.to_bytes((lb + 7) // 8, "little")
+            c = clave(clave_b, A)
+            with self.conexion:
+                self.conexion.execute("INSERT OR REPLACE INTO filas VALUES (?, ?, ?, ?, ?, ?)",
+                                      (c, clave_b, len(A), vector, len(c) + len(vector), self._uso()))
+                self._expulsar()
+        return lb - bin(V).count('1')
+
+    # Tamaño total ocupado por las entradas de la caché
+    def tamano(self):
+        return self.conexion.execute(
+            "SELECT (SELECT COALESCE(SUM(tam), 0) FROM resultados) + (SELECT COALESCE(SUM(tam), 0) FROM filas)"
+        ).fetchone()[0]
+
+    # Expulsión LRU: se borran las entradas con menor contador de uso hasta que el
+    # tamaño total vuelve a estar por debajo del máximo
+    def _expulsar(self):
+        sobrante = self.tamano() - self.max_bytes
+        if sobrante <= 0:
+            return
+        entradas = self.conexion.execute(
+            "SELECT uso, 'resultados', clave, tam FROM resultados "
+            "UNION ALL SELECT uso, 'filas', clave, tam FROM filas ORDER BY uso")
+        borrar = {"resultados": [], "filas": []}
+        for _, tabla, c, tam in entradas:
+            if sobrante <= 0:
+                break
+            borrar[tabla].append((c,))
+            sobrante -= tam
+        for tabla, claves in borrar.items():
+            self.conexion.executemany(f"DELETE FROM {tabla} WHERE clave = ?", claves)
+
+# Punto de entrada del script
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="LCS con caché persistente en SQLite")
+    parser.add_argument("entrada", help="archivo con las cadenas A y B en dos líneas")
+    parser.add_argument("-a", "--algoritmo", choices=list(ALGORITMOS), default="divcon_bits")
+    parser.add_argument("-c", "--cache", default="lcs_cache.sqlite", help="archivo de la caché")
+    parser.add_argument("-m", "--max-mb", type=float, default=MAX_BYTES / (1024*1024), help="tamaño máximo de la caché")
+    parser.add_argument("--longitud", action="store_true", help="calcular solo la longitud (reanuda desde prefijos de A)")
+    args = parser.parse_args(argv)
+
+    inicio = time.time()
+
+    with open(args.entrada, "r", encoding="utf-8") as f:
+        cadenas = f.readlines()
+    A = cadenas[0].strip()
+    B = cadenas[1].strip()
+
+    with CacheLCS(args.cache, int(args.max_mb * 1024 * 1024)) as cache:
+        if args.longitud:
+            print("Longitud del LCS: ", cache.longitud(A, B))
+        else:
+            res = cache.lcs(A, B, args.algoritmo)
+            print(res, "| Longitud de ", len(res))
+        print("Aciertos de caché: ", cache.aciertos, "| Fallos: ", cache.fallos)
+
+    fin = time.time()
+    print("Tiempo de ejecución: ", fin - inicio, "segundos.")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
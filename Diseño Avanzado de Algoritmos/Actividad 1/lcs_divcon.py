@@ -1,48 +1,32 @@
-# Librerías para realizar el tiempo de ejecución y el
-# uso de recursos (CPU)
-import psutil
+# Librerías para realizar el tiempo de ejecución. El uso de recursos (perfilado) solo
+# se carga al ejecutar el script, no al importar el módulo como librería
 import time
-import os
 import sys
-import threading
-
-# Inicializamos de las variables para medición de tiempo y recursos
-max_mem = 0
-running = True
-pid = os.getpid()
-proceso = psutil.Process(pid)
-
-# Definimos la función utilizada para medir el máximo de memoria utilizada
-def monitor_mem():
-    global max_mem
-    while running:
-        mem = proceso.memory_info().rss   # Bytes de RAM usados
-        if mem > max_mem:
-            max_mem = mem
-        time.sleep(0.05)  # pequeño intervalo para no saturar CPU
-
-# Lanzar monitor
-t = threading.Thread(target=monitor_mem)
-t.start()
-        
-# Tomamos tiempo de inicio
-inicio = time.time()
+from lcs_bits import lcs_bits_fila
+from lcs_alfabeto import codificar_pareja, decodificar
 
-def lcs_divcon_len(A, B):
+def lcs_divcon_len(A, B, X=None):
     # Algoritmo para calcular la última fila de la tabla
     # DP del LCS entre ambas cadenas y encontrar el punto
-    # óptimo para cortar la cadena B
+    # óptimo para cortar la cadena B. Si se indica X, se
+    # continúa desde esa fila en lugar de desde la fila 0.
+    # Las vistas memoryview de la recursión se copian a bytes
+    # una vez por llamada: indexar bytes es más rápido que
+    # indexar una vista (sobre todo si está invertida)
+    if isinstance(A, memoryview): A = A.tobytes()
+    if isinstance(B, memoryview): B = B.tobytes()
     la, lb = len(A), len(B)
 
     # X es la línea anterior de la matriz de programacion
     # dinámica y Y es la actual
-    X = [0] * (lb + 1)
+    X = [0] * (lb + 1) if X is None else list(X)
     Y = [0] * (lb + 1)
 
     # Comparamos cuantos caracteres estarían en la misma posicion
     for i in range(1, la + 1):
+        a = A[i-1]
         for j in range(1, lb + 1):
-            if A[i-1] == B[j-1]:
+            if a == B[j-1]:
                 Y[j] = X[j-1] + 1
             else:
                 Y[j] = max(X[j], Y[j-1])
@@ -53,33 +37,47 @@ def lcs_divcon_len(A, B):
     
     return X
 
-def lcs_divcon(A, B):
+# El parámetro fila permite elegir el motor que calcula las filas DP del corte:
+# lcs_divcon_len (celda a celda) o lcs_bits_fila (paralelismo de bits).
+# Las cadenas se codifican una sola vez y la recursión trabaja sobre vistas
+# memoryview, por lo que los cortes e inversiones no copian datos
+def lcs_divcon(A, B, fila=lcs_divcon_len):
+    a, b, simbolos = codificar_pareja(A, B)
+    piezas = []
+    lcs_divcon_vistas(a, b, fila, piezas)
+    return decodificar(piezas, simbolos)
+
+# Recursión de Hirschberg sobre las vistas codificadas. Las piezas del LCS se van
+# añadiendo en orden a la lista piezas como vistas sobre A o B
+def lcs_divcon_vistas(A, B, fila, piezas):
 
     # Sacamos las longitudes de ambas cadenas
     la, lb = len(A), len(B)
     
     # Declaramos los pasos base.
-    # Si alguna de las cadenas está vacía se devuelve una cadena vacía
-    if 0 in (la,lb): return ""
+    # Si alguna de las cadenas está vacía no se añade nada
+    if 0 in (la,lb): return
 
-    # Si alguna de las cadenas tiene solo un elemento se devuelve ese
+    # Si alguna de las cadenas tiene solo un elemento se añade ese
     # elemento si esta dentro de la otra cadena
     if la == 1:
-        return A if A in B else ""  
+        if A[0] in B: piezas.append(A)
+        return
     if lb == 1:
-        return B if B in A else ""
+        if B[0] in A: piezas.append(B)
+        return
     
     # Dividimos la primera cadena en funcion de su punto medio entero
     piv = la//2
     A1, A2 = A[:piv], A[piv:]
     
     # Calculamos la primera mitad
-    L1 = lcs_divcon_len(A1, B)
+    L1 = fila(A1, B)
     
-    # Calculamos la segunda mitad
+    # Calculamos la segunda mitad sobre vistas invertidas (sin copiar)
     A2_rev = A2[::-1]
     B_rev = B[::-1]
-    L2 = lcs_divcon_len(A2_rev, B_rev)
+    L2 = fila(A2_rev, B_rev)
     
     # Con el resultado de la primera función buscamos
     # el punto de corte óptimo
@@ -95,32 +93,72 @@ def lcs_divcon(A, B):
     B1, B2 = B[:j], B[j:]
     
     # Llamamos de manera recursiva a esta misma función para sacar
-    # las soluciones parciales y luego combinarlas en la solución final
-    return (lcs_divcon(A1, B1) + lcs_divcon(A2, B2))
-
-# Las pareja de cadenas a utilizar estará en un archivo de texto externo
-# separadas en dos líneas diferentes
-entrada = sys.argv[1]
-with open(entrada,"r", encoding="utf-8") as f:
-    cadenas = f.readlines()
-A = cadenas[0].strip()
-B = cadenas[1].strip()
-
-# Calculamos el resultado
-res = lcs_divcon(A,B)
-
-# Tomamos el tiempo de final
-fin = time.time()
-
-running = False
-t.join()
-
-max_mem_MB = max_mem / (1024*1024)
-t_exec = fin - inicio
-
-# Mostramos por pantalla el resultado e indicamos su longitud
-# También indicamos el tiempo de ejecución y el uso medio de la CPU
-
-print(res, "| Longitud de ", len(res))
-print("Tiempo de ejecución: ", t_exec, "segundos.")
-print("Uso máximo de memoria: ", max_mem_MB, "MB.")
+    # las soluciones parciales en orden
+    lcs_divcon_vistas(A1, B1, fila, piezas)
+    lcs_divcon_vistas(A2, B2, fila, piezas)
+
+# Motores disponibles para el cálculo de las filas DP. El motor onda necesita
+# NumPy y bloques importa lcs_divcon, así que solo se importan si se eligen
+MOTORES = {
+    "clasico": lcs_divcon_len,
+    "bits": lcs_bits_fila,
+    "onda": None,
+    "bloques": None
+}
+
+# Mensaje de uso del script
+USO = "Uso: python lcs_divcon.py <entrada.txt> [motor (" + ", ".join(MOTORES) + ")]"
+
+# Punto de entrada del script: lee la pareja de cadenas, calcula el LCS y muestra el
+# tiempo de ejecución y el uso máximo de memoria
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    if not argv:
+        print(USO)
+        return 1
+
+    # Medición de recursos (tiempo de CPU y pico de memoria)
+    from perfilado import Perfil
+    perfil = Perfil().iniciar()
+
+    # Tomamos tiempo de inicio
+    inicio = time.time()
+
+    # Las pareja de cadenas a utilizar estará en un archivo de texto externo
+    # separadas en dos líneas diferentes. Opcionalmente se indica el motor
+    entrada = argv[0]
+    motor = argv[1] if len(argv) > 1 else "clasico"
+    if motor not in MOTORES:
+        perfil.detener()
+        print(USO)
+        return 1
+    if motor == "onda":
+        from lcs_onda import lcs_onda_fila
+        MOTORES["onda"] = lcs_onda_fila
+    if motor == "bloques":
+        from lcs_bloques import lcs_bloques_fila
+        MOTORES["bloques"] = lcs_bloques_fila
+    with open(entrada,"r", encoding="utf-8") as f:
+        cadenas = f.readlines()
+    A = cadenas[0].strip()
+    B = cadenas[1].strip()
+
+    # Calculamos el resultado
+    res = lcs_divcon(A,B,MOTORES[motor])
+
+    # Tomamos el tiempo de final
+    fin = time.time()
+
+    max_mem_MB = perfil.detener().memoria() / (1024*1024)
+    t_exec = fin - inicio
+
+    # Mostramos por pantalla el resultado e indicamos su longitud
+    # También indicamos el tiempo de ejecución y el uso medio de la CPU
+
+    print(res, "| Longitud de ", len(res))
+    print("Tiempo de ejecución: ", t_exec, "segundos.")
+    print("Uso máximo de memoria: ", max_mem_MB, "MB.")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
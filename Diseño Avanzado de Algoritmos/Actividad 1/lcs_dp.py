@@ -1,35 +1,24 @@
-# Librerías para realizar el tiempo de ejecución y el
-# uso de recursos (CPU)
-import psutil
+# Librerías para realizar el tiempo de ejecución. El uso de recursos (perfilado) solo
+# se carga al ejecutar el script, no al importar el módulo como librería
 import time
-import os
 import sys
-import threading
-
-# Inicializamos de las variables para medición de tiempo y recursos
-max_mem = 0
-running = True
-pid = os.getpid()
-proceso = psutil.Process(pid)
-
-# Definimos la función utilizada para medir el máximo de memoria utilizada
-def monitor_mem():
-    global max_mem
-    while running:
-        mem = proceso.memory_info().rss   # Bytes de RAM usados
-        if mem > max_mem:
-            max_mem = mem
-        time.sleep(0.05)  # pequeño intervalo para no saturar CPU
-
-# Lanzar monitor
-t = threading.Thread(target=monitor_mem)
-t.start()
-        
-# Tomamos tiempo de inicio
-inicio = time.time()
+import math
+from array import array
 
 # Definimos la función de cálculo de LCS mediante programacion dinámica
-def lcs_dp(A, B):
+# El parámetro modo permite elegir cómo se guarda la información para la reconstrucción:
+#   - matriz: matriz (la+1)x(lb+1) completa de enteros (más rápido, más memoria)
+#   - direcciones: matriz de direcciones empaquetada a 2 bits por celda
+#   - control: filas de control cada sqrt(la) filas y recálculo por bloques
+#   - onda: matriz int32 de NumPy rellenada por antidiagonales (lcs_onda.py)
+def lcs_dp(A, B, modo="matriz"):
+    if modo == "direcciones":
+        return lcs_dp_direcciones(A, B)
+    if modo == "control":
+        return lcs_dp_control(A, B)
+    if modo == "onda":
+        from lcs_onda import lcs_onda
+        return lcs_onda(A, B)
 
     # Calculamos las longitudes de las cadenas
     la = len(A)
@@ -67,30 +56,157 @@ def lcs_dp(A, B):
     
     return res
 
-# Las pareja de cadenas a utilizar estará en un archivo de texto externo
-# separadas en dos líneas diferentes
-entrada = sys.argv[1]
-with open(entrada,"r", encoding="utf-8") as f:
-    cadenas = f.readlines()
-A = cadenas[0].strip()
-B = cadenas[1].strip()
+# Códigos de dirección utilizados en la matriz empaquetada
+DIAGONAL = 1
+ARRIBA = 2
+IZQUIERDA = 3
 
-# Calculamos el resultado
-res = lcs_dp(A,B)
+# Función para calcular la siguiente fila DP a partir de la anterior (X) con el
+# carácter a de A
+def siguiente_fila(a, B, X):
+    Y = array('i', bytes(len(X) * X.itemsize))
+    for j in range(1, len(B) + 1):
+        if a == B[j - 1]:
+            Y[j] = X[j - 1] + 1
+        else:
+            Y[j] = max(X[j], Y[j - 1])
+    return Y
+
+# LCS con la matriz de direcciones empaquetada en un bytearray (4 celdas por byte).
+# Solo se mantienen dos filas de valores, por lo que la memoria pasa de
+# (la+1)*(lb+1) enteros a la*lb/4 bytes
+def lcs_dp_direcciones(A, B):
+    la = len(A)
+    lb = len(B)
+    direcciones = bytearray((la * lb + 3) // 4)
+
+    X = [0] * (lb + 1)
+    for i in range(1, la + 1):
+        Y = [0] * (lb + 1)
+        base = (i - 1) * lb
+        a = A[i - 1]
+        for j in range(1, lb + 1):
+            # Se usa el mismo criterio de desempate que en la reconstrucción de lcs_dp
+            if a == B[j - 1]:
+                Y[j] = X[j - 1] + 1
+                codigo = DIAGONAL
+            elif X[j] > Y[j - 1]:
+                Y[j] = X[j]
+                codigo = ARRIBA
+            else:
+                Y[j] = Y[j - 1]
+                codigo = IZQUIERDA
+            pos = base + j - 1
+            direcciones[pos >> 2] |= codigo << ((pos & 3) << 1)
+        X = Y
+
+    # Reconstruimos el LCS siguiendo las direcciones desde la esquina final
+    res = []
+    i, j = la, lb
+    while i > 0 and j > 0:
+        pos = (i - 1) * lb + j - 1
+        codigo = (direcciones[pos >> 2] >> ((pos & 3) << 1)) & 3
+        if codigo == DIAGONAL:
+            res.append(A[i - 1])
+            i -= 1
+            j -= 1
+        elif codigo == ARRIBA:
+            i -= 1
+        else:
+            j -= 1
+
+    return "".join(reversed(res))
+
+# LCS con filas de control: se guarda una fila de cada k = sqrt(la) y, durante la
+# reconstrucción, se recalcula cada bloque de k filas a partir de su fila de control.
+# La memoria es O(sqrt(la)*lb) a cambio de calcular la tabla dos veces
+def lcs_dp_control(A, B):
+    la = len(A)
+    lb = len(B)
+    k = max(1, math.isqrt(la))
+
+    # Primera pasada: guardamos las filas 0, k, 2k, ...
+    control = {0: array('i', bytes(4 * (lb + 1)))}
+    X = control[0]
+    for i in range(1, la + 1):
+        X = siguiente_fila(A[i - 1], B, X)
+        if i % k == 0:
+            control[i] = X
+
+    # Segunda pasada: reconstruimos bloque a bloque desde el final
+    res = []
+    i, j = la, lb
+    while i > 0 and j > 0:
+        # Recalculamos las filas del bloque en el que está i
+        inicio_bloque = ((i - 1) // k) * k
+        bloque = [control[inicio_bloque]]
+        for fila in range(inicio_bloque + 1, i + 1):
+            bloque.append(siguiente_fila(A[fila - 1], B, bloque[-1]))
+
+        # Recorremos el bloque con el mismo criterio que lcs_dp
+        while i > inicio_bloque and j > 0:
+            if A[i - 1] == B[j - 1]:
+                res.append(A[i - 1])
+                i -= 1
+                j -= 1
+            elif bloque[i - 1 - inicio_bloque][j] > bloque[i - inicio_bloque][j - 1]:
+                i -= 1
+            else:
+                j -= 1
+
+    return "".join(reversed(res))
+
+# Modos de reconstrucción disponibles
+MODOS = ("matriz", "direcciones", "control", "onda")
+
+# Mensaje de uso del script
+USO = "Uso: python lcs_dp.py <entrada.txt> [modo (" + ", ".join(MODOS) + ")]"
+
+# Punto de entrada del script: lee la pareja de cadenas, calcula el LCS y muestra el
+# tiempo de ejecución y el uso máximo de memoria
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    if not argv:
+        print(USO)
+        return 1
+
+    # Medición de recursos (tiempo de CPU y pico de memoria)
+    from perfilado import Perfil
+    perfil = Perfil().iniciar()
+
+    # Tomamos tiempo de inicio
+    inicio = time.time()
+
+    # Las pareja de cadenas a utilizar estará en un archivo de texto externo
+    # separadas en dos líneas diferentes. Opcionalmente se indica el modo de reconstrucción
+    entrada = argv[0]
+    modo = argv[1] if len(argv) > 1 else "matriz"
+    if modo not in MODOS:
+        perfil.detener()
+        print(USO)
+        return 1
+    with open(entrada,"r", encoding="utf-8") as f:
+        cadenas = f.readlines()
+    A = cadenas[0].strip()
+    B = cadenas[1].strip()
 
-# Tomamos el tiempo de final
-fin = time.time()
+    # Calculamos el resultado
+    res = lcs_dp(A,B,modo)
 
-running = False
-t.join()
+    # Tomamos el tiempo de final
+    fin = time.time()
 
-max_mem_MB = max_mem / (1024*1024)
-t_exec = fin - inicio
+    max_mem_MB = perfil.detener().memoria() / (1024*1024)
+    t_exec = fin - inicio
 
-# Mostramos por pantalla el resultado e indicamos su longitud
-# También indicamos el tiempo de ejecución y el uso medio de la CPU
+    # Mostramos por pantalla el resultado e indicamos su longitud
+    # También indicamos el tiempo de ejecución y el uso medio de la CPU
 
-print(res, "| Longitud de ", len(res))
-print("Tiempo de ejecución: ", t_exec, "segundos.")
-print("Uso máximo de memoria: ", max_mem_MB, "MB.")
+    print(res, "| Longitud de ", len(res))
+    print("Modo de reconstrucción: ", modo)
+    print("Tiempo de ejecución: ", t_exec, "segundos.")
+    print("Uso máximo de memoria: ", max_mem_MB, "MB.")
+    return 0
 
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,153 @@
+# Cálculo en flujo de la longitud del LCS para archivos más grandes que la memoria.
+# El archivo de entrada (A en la primera línea y B en la segunda) se proyecta en
+# memoria con mmap y A se consume por trozos de bytes, manteniendo solo una fila DP
+# sobre B codificada como vector de bits (la misma recurrencia de filas que usa
+# lcs_divcon_len, calculada con lcs_bits). Nunca se decodifica el archivo a str.
+#
+# Opcionalmente se guarda cada cierto número de caracteres de A un punto de control
+# con la fila actual, de forma que una ejecución interrumpida se puede reanudar. El
+# punto de control guarda la longitud de A y de B, el CRC de B y el CRC de la parte de
+# A ya consumida, y solo se reanuda si todo coincide con el archivo actual. Al
+# terminar el cálculo se borra.
+import os
+import sys
+import mmap
+import json
+import time
+import zlib
+from lcs_bits import mascaras_bits, lcs_bits_vector
+
+# Caracteres de A que se procesan en cada trozo
+TAM_TROZO = 1 << 20
+
+# Función para localizar las dos líneas del archivo proyectado. Devuelve los
+# intervalos [inicio, fin) de A y de B sin el salto de línea
+def localizar_lineas(mm):
+    fin_a = mm.find(b"\n")
+    if fin_a < 0:
+        raise ValueError("El archivo debe tener A y B en dos líneas diferentes")
+    fin_b = mm.find(b"\n", fin_a + 1)
+    if fin_b < 0:
+        fin_b = len(mm)
+
+    # Quitamos los espacios y retornos de carro finales de cada línea
+    def recortar(inicio, fin):
+        while fin > inicio and mm[fin - 1] in b" \r\t":
+            fin -= 1
+        return inicio, fin
+
+    return recortar(0, fin_a), recortar(fin_a + 1, fin_b)
+
+# Función para calcular el CRC de mm[inicio:fin] por trozos
+def crc_intervalo(mm, inicio, fin, tam_trozo=TAM_TROZO):
+    crc = 0
+    for k in range(inicio, fin, tam_trozo):
+        crc = zlib.crc32(mm[k:min(k + tam_trozo, fin)], crc)
+    return crc
+
+# Función para leer un punto de control. Solo se usa si corresponde a la misma B y a
+# la misma A (longitud y CRC de la parte ya consumida). Devuelve la posición, la fila
+# y el CRC de A hasta la posición
+def leer_control(ruta, mm, a0, a1, lb, crc_b):
+    if not os.path.exists(ruta):
+        return 0, None, 0
+    with open(ruta, "rb") as f:
+        try:
+            cabecera = json.loads(f.readline())
+            posicion = cabecera["posicion"]
+            if (cabecera["lb"] != lb or cabecera["crc_b"] != crc_b or
+                    cabecera["la"] != a1 - a0 or not 0 < posicion <= a1 - a0):
+                return 0, None, 0
+            crc_a = crc_intervalo(mm, a0, a0 + posicion)
+            if cabecera["crc_a"] != crc_a:
+                return 0, None, 0
+        except (ValueError, KeyError, TypeError):
+            return 0, None, 0
+        return posicion, int.from_bytes(f.read(), "little"), crc_a
+
+# Función para guardar un punto de control con la posición de A alcanzada, el CRC de
+# A hasta esa posición y la fila actual. Se escribe en un archivo temporal y se
+# renombra para no dejarlo a medias
+def guardar_control(ruta, posicion, V, la, crc_a, lb, crc_b):
+    temporal = ruta + ".tmp"
+    cabecera = {"posicion": posicion, "la": la, "crc_a": crc_a, "lb": lb, "crc_b": crc_b}
+    with open(temporal, "wb") as f:
+        f.write((json.dumps(cabecera) + "\n").encode())
+        f.write(V.to_bytes((lb + 7) // 8, "little"))
+    os.replace(temporal, ruta)
+
+# Función para calcular la longitud del LCS entre las dos líneas del archivo.
+# Con cada_control > 0 se guarda un punto de control cada cada_control caracteres
+# de A en ruta_control y, si existe uno previo para las mismas A y B, se reanuda
+# desde él. El punto de control se borra al terminar
+def lcs_flujo_len(entrada, ruta_control=None, cada_control=0, tam_trozo=TAM_TROZO):
+    with open(entrada, "rb") as f:
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            (a0, a1), (b0, b1) = localizar_lineas(mm)
+
+            # B se mantiene como bytes para construir las máscaras de cada símbolo
+            B = mm[b0:b1]
+            lb = len(B)
+            mascaras = mascaras_bits(B)
+            crc_b = zlib.crc32(B)
+            del B
+
+            posicion, V, crc_a = 0, None, 0
+            if ruta_control:
+                posicion, V, crc_a = leer_control(ruta_control, mm, a0, a1, lb, crc_b)
+            siguiente_control = posicion + cada_control
+
+            # Recorremos A por trozos continuando el vector de bits de cada trozo
+            while posicion < a1 - a0:
+                fin = min(posicion + tam_trozo, a1 - a0)
+                if cada_control > 0:
+                    fin = min(fin, siguiente_control)
+                trozo = mm[a0 + posicion:a0 + fin]
+                V = lcs_bits_vector(trozo, mascaras, lb, V)
+                if ruta_control:
+                    crc_a = zlib.crc32(trozo, crc_a)
+                del trozo
+                posicion = fin
+
+                if ruta_control and cada_control > 0 and posicion == siguiente_control:
+                    guardar_control(ruta_control, posicion, V, a1 - a0, crc_a, lb, crc_b)
+                    siguiente_control += cada_control
+
+            # El cálculo ha terminado, así que el punto de control ya no hace falta
+            if ruta_control and os.path.exists(ruta_control):
+                os.remove(ruta_control)
+
+            if V is None:
+                return 0
+            return lb - bin(V).count("1")
+
+# Punto de entrada del script
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    if not argv:
+        print("Uso: python lcs_flujo.py <entrada.txt> [caracteres entre puntos de control]")
+        return 1
+
+    entrada = argv[0]
+    cada_control = int(argv[1]) if len(argv) > 1 else 0
+    ruta_control = entrada + ".ckpt" if cada_control > 0 else None
+
+    # Medición de recursos (tiempo de CPU y pico de memoria)
+    from perfilado import Perfil
+    perfil = Perfil().iniciar()
+    inicio = time.time()
+
+    res = lcs_flujo_len(entrada, ruta_control, cada_control)
+
+    fin = time.time()
+    max_mem = perfil.detener().memoria()
+
+    print("Longitud del LCS: ", res)
+    if ruta_control:
+        print("Punto de control: ", ruta_control)
+    print("Tiempo de ejecución: ", fin - inicio, "segundos.")
+    print("Uso máximo de memoria: ", max_mem / (1024*1024), "MB.")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,139 @@
+# LCS de Hunt-Szymanski para alfabetos grandes, donde las coincidencias son escasas.
+# Se construye una sola vez un índice con las posiciones de cada símbolo en B y se
+# recorre A manteniendo el array de umbrales T, donde T[k] es la menor posición de B
+# en la que termina una subsecuencia común de longitud k+1. Cada coincidencia se coloca
+# con una búsqueda binaria (como en el patience sorting), por lo que el coste es
+# O((r + n) log n) con r el número de parejas (i, j) con A[i] == B[j].
+#
+# lcs_auto estima r antes de calcular y elige entre Hunt-Szymanski y el paralelismo
+# de bits de lcs_bits, cuyo coste no depende del número de coincidencias.
+import sys
+import time
+from bisect import bisect_left
+from collections import Counter
+from lcs_bits import lcs_bits_len, lcs_bits_fila
+from lcs_divcon import lcs_divcon
+
+# Coste relativo de colocar una coincidencia frente al de una palabra de 64 bits del
+# paralelismo de bits (medido en CPython). Se usa Hunt-Szymanski cuando
+# r * log2(lb) * COSTE_COINCIDENCIA < la * lb / 64
+COSTE_COINCIDENCIA = 4
+
+# Función para construir el índice de B: símbolo -> posiciones en orden decreciente.
+# Recorrerlas de mayor a menor evita usar dos posiciones de B con el mismo carácter de A
+def indice_posiciones(B):
+    indice = {}
+    for j in range(len(B) - 1, -1, -1):
+        indice.setdefault(B[j], []).append(j)
+    return indice
+
+# Función para contar las coincidencias r = suma de cuenta_A(c) * cuenta_B(c) en O(n)
+def contar_coincidencias(A, B):
+    cuenta_b = Counter(B)
+    return sum(n * cuenta_b[c] for c, n in Counter(A).items() if c in cuenta_b)
+
+# Longitud del LCS con Hunt-Szymanski
+def lcs_hs_len(A, B, indice=None):
+    if indice is None:
+        indice = indice_posiciones(B)
+    T = []
+    for a in A:
+        posiciones = indice.get(a)
+        if posiciones is None:
+            continue
+        for j in posiciones:
+            k = bisect_left(T, j)
+            if k == len(T):
+                T.append(j)
+            else:
+                T[k] = j
+    return len(T)
+
+# LCS completo con Hunt-Szymanski. Cada vez que se actualiza T[k] se guarda un enlace
+# (j, enlace de T[k-1]) y al final se sigue la cadena desde el último umbral. La
+# memoria es O(r) en el peor caso, pero en alfabetos grandes r es pequeño
+def lcs_hs(A, B, indice=None):
+    if indice is None:
+        indice = indice_posiciones(B)
+    T = []
+    enlaces = []
+    for a in A:
+        posiciones = indice.get(a)
+        if posiciones is None:
+            continue
+        for j in posiciones:
+            k = bisect_left(T, j)
+            nodo = (j, enlaces[k - 1] if k else None)
+            if k == len(T):
+                T.append(j)
+                enlaces.append(nodo)
+            else:
+                T[k] = j
+                enlaces[k] = nodo
+
+    res = []
+    nodo = enlaces[-1] if enlaces else None
+    while nodo is not None:
+        res.append(B[nodo[0]])
+        nodo = nodo[1]
+    return "".join(reversed(res))
+
+# Función para decidir si conviene Hunt-Szymanski según el número de coincidencias
+def usar_hs(A, B, r=None):
+    la, lb = len(A), len(B)
+    if la == 0 or lb == 0:
+        return True
+    if r is None:
+        r = contar_coincidencias(A, B)
+    return r * max(1, lb.bit_length()) * COSTE_COINCIDENCIA < la * lb / 64
+
+# Longitud del LCS eligiendo el motor según la estimación de coincidencias
+def lcs_auto_len(A, B):
+    if usar_hs(A, B):
+        return lcs_hs_len(A, B)
+    return lcs_bits_len(A, B)
+
+# LCS completo eligiendo entre Hunt-Szymanski y Hirschberg con paralelismo de bits
+def lcs_auto(A, B):
+    if usar_hs(A, B):
+        return lcs_hs(A, B)
+    return lcs_divcon(A, B, lcs_bits_fila)
+
+# Punto de entrada del script
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    if not argv:
+        print("Uso: python lcs_hs.py <entrada.txt> [hs|auto]")
+        return 1
+
+    entrada = argv[0]
+    motor = argv[1] if len(argv) > 1 else "auto"
+    if motor not in ("hs", "auto"):
+        print("Motor desconocido:", motor, "(hs o auto)")
+        return 1
+
+    # Medición de recursos (tiempo de CPU y pico de memoria)
+    from perfilado import Perfil
+    perfil = Perfil().iniciar()
+    inicio = time.time()
+
+    with open(entrada, "r", encoding="utf-8") as f:
+        cadenas = f.readlines()
+    A = cadenas[0].strip()
+    B = cadenas[1].strip()
+
+    r = contar_coincidencias(A, B)
+    elegido = "hs" if motor == "hs" or usar_hs(A, B, r) else "bits"
+    res = lcs_hs(A, B) if elegido == "hs" else lcs_divcon(A, B, lcs_bits_fila)
+
+    fin = time.time()
+    max_mem = perfil.detener().memoria()
+
+    print(res, "| Longitud de ", len(res))
+    print("Coincidencias: ", r, "| Motor: ", elegido)
+    print("Tiempo de ejecución: ", fin - inicio, "segundos.")
+    print("Uso máximo de memoria: ", max_mem / (1024*1024), "MB.")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
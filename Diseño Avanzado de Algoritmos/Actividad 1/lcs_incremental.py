@@ -0,0 +1,49 @@
+# LCS incremental para cuando una de las cadenas crece por el final. Se guardan A, B y
+# los dos bordes de la tabla DP que hacen falta para continuar:
+#   - fila: la última fila, DP[la][0..lb], para añadir caracteres a A
+#   - columna: la última columna, DP[0..la][lb], para añadir caracteres a B
+# Cada carácter añadido a A cuesta una fila de lcs_divcon_len (O(lb)) y cada carácter
+# añadido a B una columna (O(la)), en lugar de recalcular toda la tabla.
+#
+# Añadir por el principio cambia todas las celdas de la tabla, así que no se admite:
+# en ese caso hay que crear un objeto nuevo.
+from lcs_divcon import lcs_divcon, lcs_divcon_len
+from lcs_bits import lcs_bits_fila
+
+class LCSIncremental:
+    def __init__(self, A="", B=""):
+        self.A = A
+        self.B = B
+
+        # Los bordes iniciales se calculan con paralelismo de bits. La columna es la
+        # última fila de la tabla traspuesta (B frente a A)
+        self.fila = lcs_bits_fila(A, B)
+        self.columna = lcs_bits_fila(B, A)
+        self._lcs = None
+
+    # Añadir caracteres al final de A: una fila nueva por carácter
+    def append_a(self, texto):
+        for a in texto:
+            self.fila = lcs_divcon_len(a, self.B, self.fila)
+            self.columna.append(self.fila[-1])
+        self.A += texto
+        self._lcs = None
+
+    # Añadir caracteres al final de B: una columna nueva por carácter
+    def append_b(self, texto):
+        for b in texto:
+            self.columna = lcs_divcon_len(b, self.A, self.columna)
+            self.fila.append(self.columna[-1])
+        self.B += texto
+        self._lcs = None
+
+    # Longitud del LCS actual, sin coste
+    def lcs_length(self):
+        return self.fila[-1]
+
+    # Cadena LCS actual. Necesita recorrer toda la tabla (Hirschberg con paralelismo
+    # de bits), así que se guarda hasta el siguiente cambio
+    def lcs(self):
+        if self._lcs is None:
+            self._lcs = lcs_divcon(self.A, self.B, lcs_bits_fila)
+        return self._lcs
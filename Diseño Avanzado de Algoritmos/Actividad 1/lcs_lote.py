@@ -0,0 +1,145 @@
+# Servicio de LCS por lotes. En una sola ejecución se procesan muchas parejas (A, B)
+# o una cadena de referencia frente a muchas candidatas, repartiendo el trabajo entre
+# varios procesos y devolviendo una línea JSON por pareja con su tiempo de cálculo.
+#
+# Formatos de entrada:
+#   - parejas: archivo (o - para la entrada estándar) con las parejas en líneas
+#     consecutivas, A en una línea y B en la siguiente
+#   - referencia: archivo cuya primera línea es la cadena de referencia y archivo
+#     (o -) de candidatas con una cadena por línea
+import sys
+import json
+import time
+import argparse
+from multiprocessing import Pool
+from lcs_bits import mascaras_bits, lcs_bits_len, lcs_bits_fila
+from lcs_divcon import lcs_divcon
+
+# Parejas que se mandan juntas a cada proceso
+TAM_BLOQUE = 16
+
+# Datos de cada proceso trabajador: la referencia con sus máscaras precalculadas y la
+# última B vista en modo parejas, para reutilizar sus máscaras si se repite
+_referencia = None
+_mascaras_referencia = None
+_ultima_B = None
+_mascaras_ultima_B = None
+_reconstruir = False
+
+# Inicialización de cada proceso trabajador. Las máscaras de la referencia se calculan
+# una sola vez por proceso y se reutilizan en todas sus candidatas
+def _iniciar_trabajador(referencia, reconstruir):
+    global _referencia, _mascaras_referencia, _reconstruir
+    _referencia = referencia
+    _reconstruir = reconstruir
+    if referencia is not None:
+        _mascaras_referencia = mascaras_bits(referencia)
+
+# Función para obtener las máscaras de B, reutilizando las de la referencia o las de
+# la pareja anterior cuando B coincide
+def _mascaras(B):
+    global _ultima_B, _mascaras_ultima_B
+    if B is _referencia:
+        return _mascaras_referencia
+    if B != _ultima_B:
+        _ultima_B = B
+        _mascaras_ultima_B = mascaras_bits(B)
+    return _mascaras_ultima_B
+
+# Tarea de cada pareja: (índice, A, B). En modo referencia B es None
+def _procesar(tarea):
+    indice, A, B = tarea
+    if B is None:
+        B = _referencia
+
+    inicio = time.perf_counter()
+    resultado = {"par": indice, "longitud": lcs_bits_len(A, B, _mascaras(B))}
+    if _reconstruir:
+        resultado["lcs"] = lcs_divcon(A, B, lcs_bits_fila)
+    resultado["tiempo_ms"] = (time.perf_counter() - inicio) * 1000
+    return resultado
+
+# Función para abrir un archivo de entrada o la entrada estándar
+def abrir(ruta):
+    if ruta == "-":
+        return sys.stdin
+    return open(ruta, "r", encoding="utf-8")
+
+# Generador de tareas a partir de un archivo de parejas en líneas consecutivas. Si el
+# archivo tiene un número impar de líneas, la última A no tiene pareja y es un error
+def leer_parejas(f):
+    indice = 0
+    A = None
+    numero = 0
+    for numero, linea in enumerate(f, 1):
+        linea = linea.strip()
+        if A is None:
+            A = linea
+        else:
+            yield (indice, A, linea)
+            indice += 1
+            A = None
+    if A is not None:
+        raise ValueError(f"la línea {numero} no tiene pareja (falta la cadena B)")
+
+# Generador de tareas a partir de un archivo de candidatas (una por línea). Una línea
+# vacía es una candidata vacía y su LCS con la referencia tiene longitud 0
+def leer_candidatas(f):
+    for indice, linea in enumerate(f):
+        yield (indice, linea.strip(), None)
+
+# Función para procesar un lote de tareas y escribir los resultados en formato JSONL
+# en el mismo orden de la entrada. Si la lectura de las tareas falla (ValueError), el
+# error se guarda y se lanza después de escribir los resultados de las tareas leídas,
+# en lugar de dejar que el pool lo lance y descarte el bloque en el que ocurre
+def procesar_lote(tareas, salida, referencia=None, procesos=None, reconstruir=False):
+    errores = []
+
+    def leer_tareas():
+        try:
+            yield from tareas
+        except ValueError as error:
+            errores.append(error)
+
+    total = 0
+    with Pool(processes=procesos, initializer=_iniciar_trabajador,
+              initargs=(referencia, reconstruir)) as pool:
+        for resultado in pool.imap(_procesar, leer_tareas(), chunksize=TAM_BLOQUE):
+            salida.write(json.dumps(resultado, ensure_ascii=False) + "\n")
+            total += 1
+    if errores:
+        raise errores[0]
+    return total
+
+# Punto de entrada del script
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="LCS por lotes con salida JSONL")
+    parser.add_argument("entrada", help="archivo de parejas, o de candidatas si se usa --referencia (- para la entrada estándar)")
+    parser.add_argument("-r", "--referencia", help="archivo cuya primera línea es la cadena de referencia")
+    parser.add_argument("-p", "--procesos", type=int, default=None, help="número de procesos (por defecto, uno por núcleo)")
+    parser.add_argument("--lcs", action="store_true", help="incluir también la cadena LCS en cada resultado")
+    args = parser.parse_args(argv)
+
+    referencia = None
+    if args.referencia:
+        with open(args.referencia, "r", encoding="utf-8") as f:
+            referencia = f.readline().strip()
+
+    # La entrada estándar no se cierra al terminar
+    inicio = time.perf_counter()
+    f = abrir(args.entrada)
+    try:
+        tareas = leer_candidatas(f) if referencia is not None else leer_parejas(f)
+        total = procesar_lote(tareas, sys.stdout, referencia, args.procesos, args.lcs)
+    except ValueError as error:
+        print(f"Error: {error}", file=sys.stderr)
+        return 1
+    finally:
+        if f is not sys.stdin:
+            f.close()
+
+    print(f"Parejas procesadas: {total} en {time.perf_counter() - inicio:.3f} segundos.", file=sys.stderr)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,93 @@
+# Matriz de longitudes de LCS entre todas las parejas de N secuencias. En lugar de
+# lanzar un proceso por pareja, las secuencias se codifican una sola vez con una tabla
+# de símbolos común y se mandan una vez a cada proceso trabajador.
+#
+# Solo se calculan las parejas i < j (la matriz es simétrica y la diagonal es la
+# longitud de cada secuencia). Las tareas son trozos de una fila i, de forma que las
+# máscaras de bits de la secuencia i se calculan una vez por tarea, y se reparten con
+# imap_unordered y chunksize=1: cada proceso coge una tarea nueva en cuanto termina la
+# anterior, así que los procesos libres se llevan el trabajo pendiente de los lentos.
+# Las tareas más caras se mandan primero para que no queden al final.
+#
+# La matriz se escribe en un archivo .npy proyectado en memoria (open_memmap), que
+# después se puede abrir con np.load(ruta, mmap_mode="r") sin copiarla.
+import sys
+import time
+import argparse
+from multiprocessing import Pool
+import numpy as np
+from lcs_alfabeto import tabla_simbolos, codificar
+from lcs_bits import mascaras_bits, lcs_bits_len
+
+# Número máximo de parejas por tarea
+TAM_TAREA = 64
+
+# Secuencias codificadas de cada proceso trabajador
+_secuencias = None
+
+def _iniciar_trabajador(secuencias):
+    global _secuencias
+    _secuencias = secuencias
+
+# Tarea: (i, columnas). Devuelve i, las columnas y las longitudes del LCS
+def _procesar(tarea):
+    i, columnas = tarea
+    mascaras = mascaras_bits(_secuencias[i])
+    return i, columnas, [lcs_bits_len(_secuencias[j], _secuencias[i], mascaras) for j in columnas]
+
+# Función para generar las tareas ordenadas de mayor a menor coste estimado
+def generar_tareas(longitudes, tam_tarea=TAM_TAREA):
+    n = len(longitudes)
+    tareas = []
+    for i in range(n):
+        for inicio in range(i + 1, n, tam_tarea):
+            columnas = list(range(inicio, min(inicio + tam_tarea, n)))
+            coste = longitudes[i] * sum(longitudes[j] for j in columnas)
+            tareas.append((coste, i, columnas))
+    tareas.sort(key=lambda t: t[0], reverse=True)
+    return [(i, columnas) for _, i, columnas in tareas]
+
+# Función para calcular la matriz N x N de longitudes del LCS. Con salida se escribe
+# en ese archivo .npy proyectado en memoria; si no, se devuelve un array normal
+def lcs_matriz(secuencias, salida=None, procesos=None, tam_tarea=TAM_TAREA):
+    n = len(secuencias)
+    _, codigos = tabla_simbolos(*secuencias)
+    codificadas = [codificar(s, codigos) for s in secuencias]
+    longitudes = [len(s) for s in secuencias]
+
+    if salida is None:
+        M = np.zeros((n, n), dtype=np.int32)
+    else:
+        M = np.lib.format.open_memmap(salida, mode="w+", dtype=np.int32, shape=(n, n))
+    M[np.arange(n), np.arange(n)] = longitudes
+
+    with Pool(processes=procesos, initializer=_iniciar_trabajador, initargs=(codificadas,)) as pool:
+        for i, columnas, valores in pool.imap_unordered(_procesar, generar_tareas(longitudes, tam_tarea), chunksize=1):
+            M[i, columnas] = valores
+            M[columnas, i] = valores
+
+    if salida is not None:
+        M.flush()
+    return M
+
+# Punto de entrada del script
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Matriz de longitudes del LCS entre todas las parejas de secuencias")
+    parser.add_argument("entrada", help="archivo con una secuencia por línea")
+    parser.add_argument("-o", "--salida", default="matriz_lcs.npy", help="archivo .npy de salida")
+    parser.add_argument("-p", "--procesos", type=int, default=None, help="número de procesos (por defecto, uno por núcleo)")
+    parser.add_argument("-t", "--tam-tarea", type=int, default=TAM_TAREA, help="parejas por tarea")
+    args = parser.parse_args(argv)
+
+    with open(args.entrada, "r", encoding="utf-8") as f:
+        secuencias = [linea.strip() for linea in f if linea.strip()]
+
+    inicio = time.perf_counter()
+    lcs_matriz(secuencias, args.salida, args.procesos, args.tam_tarea)
+    n = len(secuencias)
+    print(f"Matriz {n}x{n} ({n * (n - 1) // 2} parejas) guardada en {args.salida} "
+          f"en {time.perf_counter() - inicio:.3f} segundos.")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
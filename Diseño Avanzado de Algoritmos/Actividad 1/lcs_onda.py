@@ -0,0 +1,91 @@
+# Motor de LCS por frente de onda con NumPy. Las celdas de una misma antidiagonal
+# (i + j = d) solo dependen de las dos antidiagonales anteriores, así que cada una
+# se puede calcular con una única operación vectorizada en lugar de celda a celda.
+import numpy as np
+
+# Función para convertir una cadena en un array de NumPy sin copiar los datos.
+# Si todos los caracteres caben en latin-1 se usa un byte por carácter y si no utf-32.
+# Las cadenas ya codificadas (vistas de lcs_alfabeto) se usan directamente
+def codificar(A, ancho=1):
+    if not isinstance(A, str):
+        return np.asarray(A)
+    if ancho == 1:
+        return np.frombuffer(A.encode("latin-1"), dtype=np.uint8)
+    return np.frombuffer(A.encode("utf-32-le"), dtype=np.uint32)
+
+# Función para codificar las dos cadenas con el mismo ancho
+def codificar_pareja(A, B):
+    try:
+        return codificar(A), codificar(B)
+    except UnicodeEncodeError:
+        return codificar(A, 4), codificar(B, 4)
+
+# Función equivalente a lcs_divcon_len: devuelve la última fila de la tabla DP del
+# LCS entre A y B. Solo se guardan tres antidiagonales indexadas por i
+def lcs_onda_fila(A, B):
+    la, lb = len(A), len(B)
+    if la == 0:
+        return [0] * (lb + 1)
+
+    a, b = codificar_pareja(A, B)
+    b_rev = b[::-1]
+
+    # d2, d1 y d0 son las antidiagonales d-2, d-1 y d. Las posiciones que quedan
+    # fuera de la tabla se mantienen a 0, que es el valor de la fila y la columna 0
+    d2 = np.zeros(la + 1, dtype=np.int32)
+    d1 = np.zeros(la + 1, dtype=np.int32)
+    d0 = np.zeros(la + 1, dtype=np.int32)
+    fila = [0] * (lb + 1)
+
+    for d in range(2, la + lb + 1):
+        lo = max(1, d - lb)
+        hi = min(la, d - 1)
+
+        # Para i en [lo, hi] y j = d - i, B[j-1] es b_rev[lb - d + i]
+        iguales = a[lo - 1:hi] == b_rev[lb - d + lo:lb - d + hi + 1]
+        d0[lo:hi + 1] = np.where(iguales, d2[lo - 1:hi] + 1,
+                                 np.maximum(d1[lo - 1:hi], d1[lo:hi + 1]))
+        # La celda (d, 0) pertenece a la columna 0 y debe valer 0
+        if d <= la:
+            d0[d] = 0
+
+        # La celda (la, d - la) es de la última fila
+        if lo <= la <= hi:
+            fila[d - la] = int(d0[la])
+
+        d2, d1, d0 = d1, d0, d2
+
+    return fila
+
+# Función para calcular la matriz DP completa por antidiagonales en un array int32,
+# que ocupa 4 bytes por celda frente a los enteros de Python de la lista de listas
+def lcs_onda_matriz(A, B):
+    la, lb = len(A), len(B)
+    a, b = codificar_pareja(A, B)
+    matriz = np.zeros((la + 1, lb + 1), dtype=np.int32)
+
+    for d in range(2, la + lb + 1):
+        i = np.arange(max(1, d - lb), min(la, d - 1) + 1)
+        j = d - i
+        matriz[i, j] = np.where(a[i - 1] == b[j - 1], matriz[i - 1, j - 1] + 1,
+                                np.maximum(matriz[i - 1, j], matriz[i, j - 1]))
+
+    return matriz
+
+# LCS completo: matriz por antidiagonales y la misma reconstrucción que lcs_dp
+def lcs_onda(A, B):
+    matriz = lcs_onda_matriz(A, B)
+    res = []
+    i, j = len(A), len(B)
+
+    while i > 0 and j > 0:
+        if A[i - 1] == B[j - 1]:
+            res.append(A[i - 1])
+            i -= 1
+            j -= 1
+        elif matriz[i - 1, j] > matriz[i, j - 1]:
+            i -= 1
+        else:
+            j -= 1
+
+    return "".join(reversed(res))
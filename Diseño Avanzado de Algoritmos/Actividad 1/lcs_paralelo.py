@@ -0,0 +1,158 @@
+# Algoritmo de Hirschberg en paralelo. Las dos pasadas de cada corte (la fila
+# hacia delante sobre A1 y la fila invertida sobre A2) y los dos subproblemas
+# resultantes son independientes, así que se reparten en un ProcessPoolExecutor.
+# Las cadenas se comparten con los procesos mediante memoria compartida y cada
+# tarea solo recibe los desplazamientos de su subproblema.
+import sys
+import time
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+from lcs_bits import lcs_bits_fila
+from lcs_divcon import lcs_divcon
+
+# Por debajo de este número de celdas (la*lb) un subproblema se resuelve de forma secuencial
+UMBRAL_SECUENCIAL = 250000
+
+# Número máximo de niveles de corte que se reparten entre los procesos. A partir de
+# ese nivel cada subproblema se manda entero a un proceso, de forma que nunca hay
+# más de 2^MAX_PROFUNDIDAD tareas en vuelo
+MAX_PROFUNDIDAD = 5
+
+# Memoria compartida a la que se conecta cada proceso trabajador
+_memoria = None
+_ancho = 1
+_codificacion = "latin-1"
+
+# Algoritmo de Hirschberg secuencial: lcs_divcon calculando las filas con el motor
+# de paralelismo de bits
+def hirschberg(A, B, fila=lcs_bits_fila):
+    return lcs_divcon(A, B, fila)
+
+# Función para buscar el punto de corte de B que maximiza L1[j] + L2[lb - j]
+def mejor_corte(L1, L2, lb):
+    max_sum = -1
+    j = 0
+    for i in range(lb + 1):
+        current_sum = L1[i] + L2[lb - i]
+        if current_sum > max_sum:
+            max_sum = current_sum
+            j = i
+    return j
+
+# Función para codificar A y B en un único bloque de bytes. Si todos los caracteres
+# caben en latin-1 se usa un byte por carácter y si no cuatro (utf-32)
+def codificar(A, B):
+    try:
+        return (A + B).encode("latin-1"), 1, "latin-1"
+    except UnicodeEncodeError:
+        return (A + B).encode("utf-32-le"), 4, "utf-32-le"
+
+# Inicialización de cada proceso trabajador: se conecta a la memoria compartida
+def _iniciar_trabajador(nombre, ancho, codificacion):
+    global _memoria, _ancho, _codificacion
+    _memoria = shared_memory.SharedMemory(name=nombre)
+    _ancho = ancho
+    _codificacion = codificacion
+
+# Función para leer la subcadena [ini, fin) de la memoria compartida
+def _subcadena(ini, fin):
+    return bytes(_memoria.buf[ini * _ancho:fin * _ancho]).decode(_codificacion)
+
+# Tarea que calcula la última fila DP de A[a0:a1] frente a B[b0:b1]. Con inverso
+# se calcula sobre ambas cadenas invertidas (segunda mitad del corte)
+def _tarea_fila(a0, a1, b0, b1, inverso):
+    A = _subcadena(a0, a1)
+    B = _subcadena(b0, b1)
+    if inverso:
+        A, B = A[::-1], B[::-1]
+    return array('i', lcs_bits_fila(A, B))
+
+# Tarea que resuelve un subproblema completo de forma secuencial
+def _tarea_resolver(a0, a1, b0, b1):
+    return hirschberg(_subcadena(a0, a1), _subcadena(b0, b1))
+
+# Hirschberg en paralelo. Se recorre el árbol de cortes por niveles: en cada nivel
+# se lanzan a la vez las dos filas de todos los subproblemas pendientes y con sus
+# resultados se calculan los subproblemas del nivel siguiente
+def lcs_divcon_paralelo(A, B, procesos=None, umbral=UMBRAL_SECUENCIAL, max_profundidad=MAX_PROFUNDIDAD):
+    la, lb = len(A), len(B)
+
+    # Los problemas pequeños no compensan el coste de arrancar los procesos
+    if la * lb <= umbral:
+        return hirschberg(A, B)
+
+    datos, ancho, codificacion = codificar(A, B)
+    memoria = shared_memory.SharedMemory(create=True, size=len(datos))
+    try:
+        memoria.buf[:len(datos)] = datos
+
+        with ProcessPoolExecutor(max_workers=procesos, initializer=_iniciar_trabajador,
+                                 initargs=(memoria.name, ancho, codificacion)) as ejecutor:
+            # Cada subproblema se identifica con la secuencia de mitades (0 izquierda,
+            # 1 derecha) que lleva hasta él, así que ordenando las claves se obtienen
+            # las piezas del LCS en orden. A ocupa [0, la) y B [la, la + lb)
+            piezas = {}
+            frontera = [((), (0, la, la, la + lb))]
+            profundidad = 0
+
+            while frontera:
+                cortes = []
+                for clave, (a0, a1, b0, b1) in frontera:
+                    m, n = a1 - a0, b1 - b0
+                    if m == 0 or n == 0:
+                        piezas[clave] = ""
+                    elif m == 1 or n == 1 or m * n <= umbral or profundidad >= max_profundidad:
+                        piezas[clave] = ejecutor.submit(_tarea_resolver, a0, a1, b0, b1)
+                    else:
+                        piv = a0 + m // 2
+                        f1 = ejecutor.submit(_tarea_fila, a0, piv, b0, b1, False)
+                        f2 = ejecutor.submit(_tarea_fila, piv, a1, b0, b1, True)
+                        cortes.append((clave, a0, a1, b0, b1, piv, f1, f2))
+
+                # Con las dos filas de cada corte buscamos el punto óptimo de B
+                frontera = []
+                for clave, a0, a1, b0, b1, piv, f1, f2 in cortes:
+                    j = b0 + mejor_corte(f1.result(), f2.result(), b1 - b0)
+                    frontera.append((clave + (0,), (a0, piv, b0, j)))
+                    frontera.append((clave + (1,), (piv, a1, j, b1)))
+                profundidad += 1
+
+            return "".join(p if isinstance(p, str) else p.result()
+                           for _, p in sorted(piezas.items()))
+    finally:
+        memoria.close()
+        memoria.unlink()
+
+# Punto de entrada del script
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    if not argv:
+        print("Uso: python lcs_paralelo.py <entrada.txt> [procesos]")
+        return 1
+
+    entrada = argv[0]
+    procesos = int(argv[1]) if len(argv) > 1 else None
+
+    # Medición de recursos sumando el pico de los procesos trabajadores
+    from perfilado import Perfil
+    perfil = Perfil(hijos=True).iniciar()
+    inicio = time.time()
+
+    with open(entrada, "r", encoding="utf-8") as f:
+        cadenas = f.readlines()
+    A = cadenas[0].strip()
+    B = cadenas[1].strip()
+
+    res = lcs_divcon_paralelo(A, B, procesos)
+
+    fin = time.time()
+    max_mem = perfil.detener().memoria()
+
+    print(res, "| Longitud de ", len(res))
+    print("Tiempo de ejecución: ", fin - inicio, "segundos.")
+    print("Uso máximo de memoria: ", max_mem / (1024*1024), "MB.")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,32 +1,9 @@
-# Librerías para realizar el tiempo de ejecución y el
-# uso de recursos (CPU)
-import psutil
+# Librerías para realizar el tiempo de ejecución. El uso de recursos (perfilado) solo
+# se carga al ejecutar el script, no al importar el módulo como librería
 import time
-import os
 import sys
-import threading
-
-# Inicializamos de las variables para medición de tiempo y recursos
-max_mem = 0
-running = True
-pid = os.getpid()
-proceso = psutil.Process(pid)
-
-# Definimos la función utilizada para medir el máximo de memoria utilizada
-def monitor_mem():
-    global max_mem
-    while running:
-        mem = proceso.memory_info().rss   # Bytes de RAM usados
-        if mem > max_mem:
-            max_mem = mem
-        time.sleep(0.05)  # pequeño intervalo para no saturar CPU
-
-# Lanzar monitor
-t = threading.Thread(target=monitor_mem)
-t.start()
-        
-# Tomamos tiempo de inicio
-inicio = time.time()
+from array import array
+from collections import OrderedDict
 
 # Definición de la función recursiva para cálculo de LCS
 def lcs_rec(A, B):
@@ -47,30 +24,174 @@ def lcs_rec(A, B):
         B_rec = lcs_rec(A,B[:-1])
         return A_rec if len(A_rec) > len(B_rec) else B_rec
 
-# Las pareja de cadenas a utilizar estará en un archivo de texto externo
-# separadas en dos líneas diferentes
-entrada = sys.argv[1]
-with open(entrada,"r", encoding="utf-8") as f:
-    cadenas = f.readlines()
-A = cadenas[0].strip()
-B = cadenas[1].strip()
+# Almacenes de memoria para la variante memorizada. Todos se usan como un dict:
+# get((i, j)) devuelve la longitud guardada o None y memo[(i, j)] = v la guarda
 
-# Calculamos el resultado
-res = lcs_rec(A,B)
+# Memoria LRU con un tamaño máximo: al llenarse se descarta la entrada usada hace más tiempo
+class MemoLRU:
+    def __init__(self, capacidad):
+        self.capacidad = capacidad
+        self.datos = OrderedDict()
 
-# Tomamos el tiempo de final
-fin = time.time()
+    def get(self, clave):
+        valor = self.datos.get(clave)
+        if valor is not None:
+            self.datos.move_to_end(clave)
+        return valor
 
-running = False
-t.join()
+    def __setitem__(self, clave, valor):
+        self.datos[clave] = valor
+        self.datos.move_to_end(clave)
+        if len(self.datos) > self.capacidad:
+            self.datos.popitem(last=False)
 
-max_mem_MB = max_mem / (1024*1024)
-t_exec = fin - inicio
+# Memoria densa: una fila array('i') por cada i, con -1 en las celdas sin calcular
+class MemoMatriz:
+    def __init__(self, la, lb):
+        self.filas = [array('i', [-1]) * (lb + 1) for _ in range(la + 1)]
 
-# Mostramos por pantalla el resultado e indicamos su longitud
-# También indicamos el tiempo de ejecución y el uso medio de la CPU
+    def get(self, clave):
+        valor = self.filas[clave[0]][clave[1]]
+        return None if valor < 0 else valor
 
-print(res, "| Longitud de ", len(res))
-print("Tiempo de ejecución: ", t_exec, "segundos.")
-print("Uso máximo de memoria: ", max_mem_MB, "MB.")
+    def __setitem__(self, clave, valor):
+        self.filas[clave[0]][clave[1]] = valor
 
+# Función para crear el almacén de memoria indicado
+def crear_memo(tipo, la, lb, capacidad=100000):
+    if tipo == "dict":
+        return {}
+    if tipo == "lru":
+        return MemoLRU(capacidad)
+    if tipo == "matriz":
+        return MemoMatriz(la, lb)
+    raise ValueError("Tipo de memoria desconocido: " + str(tipo))
+
+# Función para calcular la longitud del LCS entre A[:i] y B[:j] con la misma
+# recursión que lcs_rec, pero trabajando con índices en lugar de cortes de la cadena
+# y con una pila explícita en lugar de la pila de llamadas de Python.
+# Cada marco de la pila es [i, j, fase, resultado parcial]
+def lcs_rec_len(A, B, i, j, memo):
+    pila = [[i, j, 0, 0]]
+    ret = 0
+
+    while pila:
+        marco = pila[-1]
+        i, j, fase = marco[0], marco[1], marco[2]
+
+        if fase == 0:
+            # Paso base: alguna de las cadenas es vacía
+            if i == 0 or j == 0:
+                ret = 0
+                pila.pop()
+                continue
+
+            # Si ya tenemos el valor guardado no lo volvemos a calcular
+            valor = memo.get((i, j))
+            if valor is not None:
+                ret = valor
+                pila.pop()
+                continue
+
+            # Si coinciden los últimos caracteres bajamos por la diagonal y si no
+            # exploramos primero quitando el último carácter de A
+            if A[i - 1] == B[j - 1]:
+                marco[2] = 3
+                pila.append([i - 1, j - 1, 0, 0])
+            else:
+                marco[2] = 1
+                pila.append([i - 1, j, 0, 0])
+
+        elif fase == 1:
+            # Guardamos el resultado sin el último carácter de A en el propio marco, por
+            # si la memoria lo descarta antes de terminar, y probamos sin el de B
+            marco[3] = ret
+            marco[2] = 2
+            pila.append([i, j - 1, 0, 0])
+
+        else:
+            if fase == 2:
+                ret = max(marco[3], ret)
+            else:
+                ret += 1
+            memo[(i, j)] = ret
+            pila.pop()
+
+    return ret
+
+# Variante memorizada e iterativa de lcs_rec. Reconstruye el LCS desde (la, lb)
+# con el mismo criterio de desempate que lcs_rec
+def lcs_rec_memo(A, B, memo="dict", capacidad=100000):
+    la, lb = len(A), len(B)
+    if isinstance(memo, str):
+        memo = crear_memo(memo, la, lb, capacidad)
+
+    res = []
+    i, j = la, lb
+    while i > 0 and j > 0:
+        if A[i - 1] == B[j - 1]:
+            res.append(A[i - 1])
+            i -= 1
+            j -= 1
+        elif lcs_rec_len(A, B, i - 1, j, memo) > lcs_rec_len(A, B, i, j - 1, memo):
+            i -= 1
+        else:
+            j -= 1
+
+    return "".join(reversed(res))
+
+# Mensaje de uso del script
+USO = "Uso: python lcs_rec.py <entrada.txt> [memoria (dict, lru, matriz)] [capacidad]"
+
+# Punto de entrada del script: lee la pareja de cadenas, calcula el LCS y muestra el
+# tiempo de ejecución y el uso máximo de memoria
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    if not argv:
+        print(USO)
+        return 1
+
+    # Medición de recursos (tiempo de CPU y pico de memoria)
+    from perfilado import Perfil
+    perfil = Perfil().iniciar()
+
+    # Tomamos tiempo de inicio
+    inicio = time.time()
+
+    # Las pareja de cadenas a utilizar estará en un archivo de texto externo
+    # separadas en dos líneas diferentes. Opcionalmente se indica el tipo de memoria
+    # (dict, lru, matriz) para usar la variante memorizada y la capacidad de la LRU
+    entrada = argv[0]
+    memo = argv[1] if len(argv) > 1 else None
+    if memo not in (None, "dict", "lru", "matriz"):
+        perfil.detener()
+        print(USO)
+        return 1
+    capacidad = int(argv[2]) if len(argv) > 2 else 100000
+    with open(entrada,"r", encoding="utf-8") as f:
+        cadenas = f.readlines()
+    A = cadenas[0].strip()
+    B = cadenas[1].strip()
+
+    # Calculamos el resultado
+    if memo is None:
+        res = lcs_rec(A,B)
+    else:
+        res = lcs_rec_memo(A,B,memo,capacidad)
+
+    # Tomamos el tiempo de final
+    fin = time.time()
+
+    max_mem_MB = perfil.detener().memoria() / (1024*1024)
+    t_exec = fin - inicio
+
+    # Mostramos por pantalla el resultado e indicamos su longitud
+    # También indicamos el tiempo de ejecución y el uso medio de la CPU
+
+    print(res, "| Longitud de ", len(res))
+    print("Tiempo de ejecución: ", t_exec, "segundos.")
+    print("Uso máximo de memoria: ", max_mem_MB, "MB.")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
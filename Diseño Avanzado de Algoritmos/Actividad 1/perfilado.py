@@ -0,0 +1,147 @@
+# Perfilador de recursos común a los scripts. Sustituye a las consultas periódicas de
+# la memoria con psutil (un hilo cada 50 ms o una llamada en cada paso de la búsqueda),
+# que no ven los picos cortos y cuestan tiempo, por medidas que ya llevan el sistema
+# operativo y el intérprete:
+#   - pico de memoria del proceso (ru_maxrss de resource.getrusage)
+#   - pico de memoria de Python con tracemalloc (opcional, porque ralentiza las reservas)
+#   - tiempo real y tiempo de CPU
+#   - temporizadores por fase
+#
+#   with Perfil() as perfil:
+#       with perfil.fase("carga"):
+#           ...
+#   perfil.imprimir()
+#
+# Con el perfil desactivado no se mide nada y las fases devuelven un contexto vacío.
+# Variables de entorno: PERFIL=0 lo desactiva, PERFIL_PYTHON=1 activa tracemalloc y
+# PERFIL_JSON=<ruta> guarda el informe en JSON al terminar.
+import os
+import sys
+import json
+import time
+from contextlib import contextmanager, nullcontext
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+# Contexto vacío que devuelven las fases con el perfil desactivado
+_NULO = nullcontext()
+
+# Función para leer el pico de memoria del proceso en bytes. Con hijos=True se lee el
+# del mayor de los procesos hijos ya terminados. None si no está disponible
+def pico_rss(hijos=False):
+    if resource is not None:
+        quien = resource.RUSAGE_CHILDREN if hijos else resource.RUSAGE_SELF
+        pico = resource.getrusage(quien).ru_maxrss
+        # En Linux ru_maxrss está en KB y en macOS en bytes
+        return pico if sys.platform == "darwin" else pico * 1024
+
+    # En Windows no existe resource: el pico es el conjunto de trabajo máximo
+    if hijos:
+        return None
+    try:
+        import psutil
+    except ImportError:
+        return None
+    return getattr(psutil.Process(os.getpid()).memory_info(), "peak_wset", None)
+
+class Perfil:
+    def __init__(self, activo=None, python=None, hijos=False, ruta_json=None):
+        entorno = os.environ
+        self.activo = entorno.get("PERFIL", "1") != "0" if activo is None else activo
+        self.python = entorno.get("PERFIL_PYTHON") == "1" if python is None else python
+        self.ruta_json = entorno.get("PERFIL_JSON") if ruta_json is None else ruta_json
+        self.hijos = hijos
+        self.fases = {}
+        self.tiempo = 0.0
+        self.cpu = 0.0
+        self.pico_rss = None
+        self.pico_rss_hijos = None
+        self.pico_python = None
+        self._tracemalloc_propio = False
+
+    # Empezar a medir
+    def iniciar(self):
+        if self.activo:
+            if self.python:
+                import tracemalloc
+                if not tracemalloc.is_tracing():
+                    tracemalloc.start()
+                    self._tracemalloc_propio = True
+            self._inicio = time.perf_counter()
+            self._inicio_cpu = time.process_time()
+        return self
+
+    # Terminar de medir y recoger los picos
+    def detener(self):
+        if not self.activo:
+            return self
+        self.tiempo = time.perf_counter() - self._inicio
+        self.cpu = time.process_time() - self._inicio_cpu
+        self.pico_rss = pico_rss()
+        if self.hijos:
+            self.pico_rss_hijos = pico_rss(hijos=True)
+        if self.python:
+            import tracemalloc
+            if tracemalloc.is_tracing():
+                self.pico_python = tracemalloc.get_traced_memory()[1]
+                if self._tracemalloc_propio:
+                    tracemalloc.stop()
+                    self._tracemalloc_propio = False
+        if self.ruta_json:
+            self.guardar(self.ruta_json)
+        return self
+
+    def __enter__(self):
+        return self.iniciar()
+
+    def __exit__(self, *excepcion):
+        self.detener()
+        return False
+
+    # Temporizador de una fase. Las fases con el mismo nombre se acumulan
+    def fase(self, nombre):
+        if not self.activo:
+            return _NULO
+        return self._fase(nombre)
+
+    @contextmanager
+    def _fase(self, nombre):
+        inicio = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.fases[nombre] = self.fases.get(nombre, 0.0) + time.perf_counter() - inicio
+
+    # Pico de memoria en bytes: el del proceso más el del mayor de sus hijos
+    def memoria(self):
+        return (self.pico_rss or 0) + (self.pico_rss_hijos or 0)
+
+    # Informe estructurado con todas las medidas
+    def informe(self):
+        return {
+            "tiempo_s": self.tiempo,
+            "cpu_s": self.cpu,
+            "pico_rss_bytes": self.pico_rss,
+            "pico_rss_hijos_bytes": self.pico_rss_hijos,
+            "pico_python_bytes": self.pico_python,
+            "fases_s": dict(self.fases),
+        }
+
+    # Guardar el informe en JSON
+    def guardar(self, ruta):
+        with open(ruta, "w", encoding="utf-8") as f:
+            json.dump(self.informe(), f, indent=2)
+
+    # Mostrar el tiempo de CPU, el pico de Python y las fases medidas
+    def imprimir(self, archivo=None):
+        if not self.activo:
+            return
+        archivo = archivo or sys.stdout
+        print(f"Tiempo de CPU: {self.cpu:.2f} segundos", file=archivo)
+        if self.pico_python is not None:
+            print(f"Pico de memoria de Python: {self.pico_python / 1024 / 1024:.2f} MB", file=archivo)
+        for nombre, segundos in self.fases.items():
+            print(f"  Fase {nombre}: {segundos:.4f} segundos", file=archivo)
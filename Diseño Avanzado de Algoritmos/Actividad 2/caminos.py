@@ -0,0 +1,131 @@
+# Caminos mínimos entre todos los pares de vértices por las aristas seguras, para cada
+# métrica (distancia, riesgo, consumo y la combinación distancia + 50 * riesgo de las
+# estrategias 3, 4 y 5). Se calculan con Floyd-Warshall vectorizado con NumPy: para
+# cada vértice intermedio k se actualiza toda la matriz a la vez con
+#   D = min(D, D[:, k] + D[k, :])
+# Para cada métrica se guardan dos matrices n x n:
+#   - distancias[i, j]: coste mínimo de i a j (infinito si no hay camino)
+#   - previos[i, j]: vértice anterior a j en el camino mínimo de i a j (-1 si no hay)
+#
+# Las matrices se guardan en un archivo .npz junto al JSON de la instancia. La clave
+# es el SHA-256 del grafo compacto (vértices, aristas y pesos), que ya tiene en cuenta
+# las zonas no-fly, así que si cambia la instancia la caché no coincide y se recalcula.
+# Un archivo truncado o dañado se trata igual que una caché que no coincide.
+import os
+import zipfile
+import hashlib
+import numpy as np
+
+# Métricas disponibles: nombre -> función que da el coste de cada arista
+METRICAS = {
+    'distancia': lambda g: np.frombuffer(g.distancia, dtype=np.float64),
+    'riesgo': lambda g: np.frombuffer(g.riesgo, dtype=np.float64),
+    'consumo': lambda g: np.frombuffer(g.consumo, dtype=np.float64),
+    'mixta': lambda g: np.frombuffer(g.distancia, dtype=np.float64) + np.frombuffer(g.riesgo, dtype=np.float64) * 50,
+}
+
+# Métrica que minimiza cada estrategia (la misma que coste_estrategia de cotas.py)
+def metrica_estrategia(estrategia):
+    if estrategia == "1":
+        return 'distancia'
+    if estrategia == "2":
+        return 'riesgo'
+    return 'mixta'
+
+# Función para calcular la clave del grafo compacto
+def huella(grafo):
+    h = hashlib.sha256()
+    h.update("\n".join(grafo.ids).encode("utf-8"))
+    h.update(bytes(grafo.tipo))
+    for columna in (grafo.inicio, grafo.destino, grafo.distancia, grafo.riesgo, grafo.consumo):
+        h.update(columna.tobytes())
+    return h.hexdigest()
+
+# Ruta del archivo de caché junto a la instancia (10.json -> 10.caminos.npz)
+def ruta_cache(archivo_json):
+    return os.path.splitext(archivo_json)[0] + ".caminos.npz"
+
+# Algoritmo de Floyd-Warshall sobre el grafo compacto con los pesos dados
+def floyd_warshall(grafo, pesos):
+    n = grafo.n
+    origen = np.repeat(np.arange(n), np.diff(np.frombuffer(grafo.inicio, dtype=np.int32)))
+    destino = np.frombuffer(grafo.destino, dtype=np.int32)
+
+    D = np.full((n, n), np.inf)
+    np.minimum.at(D, (origen, destino), pesos)
+    P = np.where(np.isfinite(D), np.arange(n)[:, np.newaxis], -1).astype(np.int32)
+    np.fill_diagonal(D, 0.0)
+    np.fill_diagonal(P, np.arange(n))
+
+    for k in range(n):
+        nueva = D[:, k, np.newaxis] + D[np.newaxis, k, :]
+        mejora = nueva < D
+        D = np.where(mejora, nueva, D)
+        P = np.where(mejora, P[np.newaxis, k, :], P)
+    return D, P
+
+class CaminosMinimos:
+    # Con archivo se lee la caché si su clave coincide con la del grafo; si no, se
+    # calculan todas las métricas y se guardan en el archivo
+    def __init__(self, grafo, archivo=None):
+        self.grafo = grafo
+        self.clave = huella(grafo)
+        self.distancias = {}
+        self.previos = {}
+        self.desde_cache = archivo is not None and self._cargar(archivo)
+        if not self.desde_cache:
+            for nombre, pesos in METRICAS.items():
+                self.distancias[nombre], self.previos[nombre] = floyd_warshall(grafo, pesos(grafo))
+            if archivo is not None:
+                self._guardar(archivo)
+
+    def _cargar(self, archivo):
+        try:
+            with np.load(archivo) as datos:
+                if str(datos['clave']) != self.clave:
+                    return False
+                for nombre in METRICAS:
+                    self.distancias[nombre] = datos['d_' + nombre]
+                    self.previos[nombre] = datos['p_' + nombre]
+        except (OSError, KeyError, ValueError, EOFError, zipfile.BadZipFile):
+            self.distancias.clear()
+            self.previos.clear()
+            return False
+        return True
+
+    # Se escribe en un archivo temporal y se renombra para no dejar una caché a medias.
+    # Si falla la escritura se borra el temporal
+    def _guardar(self, archivo):
+        matrices = {}
+        for nombre in METRICAS:
+            matrices['d_' + nombre] = self.distancias[nombre]
+            matrices['p_' + nombre] = self.previos[nombre]
+        temporal = archivo + ".tmp.npz"
+        try:
+            np.savez(temporal, clave=np.array(self.clave), **matrices)
+            os.replace(temporal, archivo)
+        except OSError:
+            try:
+                os.remove(temporal)
+            except OSError:
+                pass
+
+    # Matriz de costes mínimos con la métrica de la estrategia
+    def matriz_estrategia(self, estrategia):
+        return self.distancias[metrica_estrategia(estrategia)]
+
+    # Coste mínimo de u a v con la métrica dada
+    def coste(self, metrica, u, v):
+        return float(self.distancias[metrica][u, v])
+
+    # Camino mínimo de u a v (lista de vértices de u a v) o None si no hay camino
+    def camino(self, metrica, u, v):
+        P = self.previos[metrica]
+        if P[u, v] < 0:
+            return None
+        camino = [v]
+        while v != u:
+            v = int(P[u, v])
+            camino.append(v)
+        camino.reverse()
+        return camino
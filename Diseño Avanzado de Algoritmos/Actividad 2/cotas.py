@@ -0,0 +1,110 @@
+# Cotas inferiores admisibles del coste que le queda a una ruta parcial. Desde el punto
+# actual u, la ruta tiene que pasar por todas las entregas pendientes P y acabar en el
+# HUB. Quitando su primer tramo queda un camino que recorre P y el HUB, que es un árbol
+# de expansión de P ∪ {HUB}; el primer tramo cuesta al menos la distancia de u al
+# vértice más cercano de P ∪ {HUB}. Por tanto:
+#
+#   coste restante >= MST(P ∪ {HUB}) + min(d(u, t) para t en P ∪ {HUB})
+#
+# donde d es la distancia mínima por el grafo de aristas seguras: se lee de las
+# matrices de caminos.py si se han calculado y, si no (sin NumPy), se calcula con
+# Dijkstra desde cada entrega y desde el HUB. Los desvíos para recargar solo suman
+# coste, así que la cota ignora la batería y nunca supera el coste real: podar con ella
+# no descarta la ruta óptima. El MST solo depende de las entregas pendientes y se
+# guarda por máscara de entregas realizadas.
+#
+# Los costes se miden con el mismo criterio que compara las soluciones según la
+# estrategia (coste_estrategia): distancia, riesgo o distancia + 50 * riesgo.
+import heapq
+from array import array
+
+# Función para calcular el coste que se minimiza según la estrategia elegida
+def coste_estrategia(distancia, riesgo, estrategia):
+    if estrategia == "1":
+        return distancia
+    if estrategia == "2":
+        return riesgo
+    return distancia + riesgo * 50
+
+# Función para obtener el coste de cada arista del grafo compacto según la estrategia
+def pesos_estrategia(grafo, estrategia):
+    if estrategia == "1":
+        return grafo.distancia
+    if estrategia == "2":
+        return grafo.riesgo
+    return array('d', (d + r * 50 for d, r in zip(grafo.distancia, grafo.riesgo)))
+
+# Algoritmo de Dijkstra sobre el grafo compacto. Devuelve la distancia mínima desde el
+# origen a cada vértice (infinito si no es alcanzable)
+def dijkstra(grafo, pesos, origen):
+    inicio = grafo.inicio
+    destino = grafo.destino
+    dist = [float('inf')] * grafo.n
+    dist[origen] = 0.0
+    cola = [(0.0, origen)]
+    while cola:
+        d, u = heapq.heappop(cola)
+        if d > dist[u]:
+            continue
+        for e in range(inicio[u], inicio[u + 1]):
+            v = destino[e]
+            nd = d + pesos[e]
+            if nd < dist[v]:
+                dist[v] = nd
+                heapq.heappush(cola, (nd, v))
+    return dist
+
+class CotaRuta:
+    def __init__(self, grafo, estrategia, caminos=None):
+        self.grafo = grafo
+        self.pesos = pesos_estrategia(grafo, estrategia)
+
+        # Terminales: las entregas (en el orden de sus bits) y el HUB al final. Como el
+        # grafo es no dirigido, distancias[t][u] es la distancia de u al terminal t
+        self.terminales = grafo.entregas + [grafo.hub]
+        if caminos is not None:
+            matriz = caminos.matriz_estrategia(estrategia)
+            self.distancias = [matriz[t].tolist() for t in self.terminales]
+        else:
+            self.distancias = [dijkstra(grafo, self.pesos, t) for t in self.terminales]
+        self.cache = {}
+
+    # MST de las entregas pendientes y el HUB (algoritmo de Prim sobre el cierre
+    # métrico) y terminales pendientes, guardados por máscara de entregas realizadas
+    def _pendientes(self, entregadas):
+        res = self.cache.get(entregadas)
+        if res is not None:
+            return res
+
+        hub = len(self.terminales) - 1
+        pendientes = [k for k in range(hub) if not entregadas >> k & 1] + [hub]
+        nodos = [self.terminales[k] for k in pendientes]
+        filas = [self.distancias[k] for k in pendientes]
+
+        # Prim en O(k^2): mejor[i] es el coste de unir el terminal i al árbol
+        mst = 0.0
+        mejor = [filas[-1][v] for v in nodos]
+        en_arbol = [False] * len(nodos)
+        en_arbol[-1] = True
+        for _ in range(len(nodos) - 1):
+            i = min((i for i in range(len(nodos)) if not en_arbol[i]), key=mejor.__getitem__)
+            mst += mejor[i]
+            en_arbol[i] = True
+            fila = filas[i]
+            for j in range(len(nodos)):
+                if not en_arbol[j] and fila[nodos[j]] < mejor[j]:
+                    mejor[j] = fila[nodos[j]]
+
+        res = self.cache[entregadas] = (mst, filas)
+        return res
+
+    # Cota inferior del coste que falta desde el punto u con las entregas de la máscara
+    # ya realizadas hasta completar las demás y volver al HUB
+    def restante(self, u, entregadas):
+        mst, filas = self._pendientes(entregadas)
+        return mst + min(fila[u] for fila in filas)
+
+    # Cota para un conjunto de entregas realizadas (en geo se guardan como conjunto)
+    def restante_conjunto(self, u, visitados):
+        bits = self.grafo.bit_entrega
+        return self.restante(u, sum(bits[v] for v in visitados))
@@ -0,0 +1,292 @@
+# Funciones geométricas comunes a los planificadores y precálculo de la seguridad de
+# las aristas. Si una arista cruza o no una zona no-fly solo depende de sus dos
+# extremos, así que se comprueba una sola vez por arista antes de la búsqueda y los
+# planificadores la consultan en O(1) en lugar de recorrer los polígonos cada vez.
+#
+# Con muchas zonas no-fly, cada comprobación usa un índice espacial (cajas de cada
+# zona y rejilla uniforme sobre los lados de los polígonos) para llamar a intersect
+# solo con los lados cercanos al segmento. Si NumPy está instalado, el precálculo
+# comprueba todas las aristas a la vez con operaciones vectorizadas (cruzan_lote).
+import math
+import time
+from collections import defaultdict
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# Número máximo de parejas (arista, lado de polígono) que se evalúan en cada lote
+TAM_LOTE = 1 << 20
+
+# Función para comprobar la posición relativa de los puntos A, B y C
+def orient(a, b, c):
+    return (b[0] - a[0]) * (c[1] - a[1]) - (b[1] - a[1]) * (c[0] - a[0])
+
+# Función para comprobar si el punto C forma parte del segmento A-B
+def on_segment(a, b, c):
+    return (min(a[0], b[0]) <= c[0] <= max(a[0], b[0]) and min(a[1], b[1]) <= c[1] <= max(a[1], b[1]))
+
+# Función para comprobar la intersección de los segmentos A-B y C-D
+def intersect(a, b, c, d):
+    o1 = orient(a, b, c)
+    o2 = orient(a, b, d)
+    o3 = orient(c, d, a)
+    o4 = orient(c, d, b)
+
+    if o1 * o2 < 0 and o3 * o4 < 0:
+        return True
+    if o1 == 0 and on_segment(a, b, c): return True
+    if o2 == 0 and on_segment(a, b, d): return True
+    if o3 == 0 and on_segment(c, d, a): return True
+    if o4 == 0 and on_segment(c, d, b): return True
+    return False
+
+# Función para comprobar si un segmento delimitado por 2 puntos cruza una zona no-fly
+def cruza_no_fly(p1, p2, zonas):
+    for zona in zonas:
+        pol = zona['poligono']
+        for i in range(len(pol)):
+            a = (pol[i]['x'], pol[i]['y'])
+            b = (pol[(i + 1) % len(pol)]['x'], pol[(i + 1) % len(pol)]['y'])
+            if intersect(p1, p2, a, b):
+                return True
+    return False
+
+# Función para obtener los lados (a, b) de los polígonos de las zonas no-fly
+def lados_poligonos(zonas):
+    lados = []
+    for zona in zonas:
+        pol = zona['poligono']
+        for i in range(len(pol)):
+            lados.append(((pol[i]['x'], pol[i]['y']), (pol[(i + 1) % len(pol)]['x'], pol[(i + 1) % len(pol)]['y'])))
+    return lados
+
+# Función para comprobar si dos cajas (xmin, ymin, xmax, ymax) se solapan (incluido el borde)
+def solapan(c1, c2):
+    return c1[0] <= c2[2] and c2[0] <= c1[2] and c1[1] <= c2[3] and c2[1] <= c1[3]
+
+# Función para calcular la caja de un segmento
+def caja_segmento(a, b):
+    return (min(a[0], b[0]), min(a[1], b[1]), max(a[0], b[0]), max(a[1], b[1]))
+
+# Índice espacial de los lados de las zonas no-fly. Primero se descartan las zonas
+# cuya caja no toca la del segmento y después se buscan los lados registrados en las
+# celdas de la rejilla por las que pasa el segmento. Si un lado corta el segmento (o
+# lo toca), el punto común está en la caja del lado y en el segmento y, por tanto, en
+# una celda común, así que el resultado es idéntico al de cruza_no_fly
+class IndiceEspacial:
+    def __init__(self, zonas, tam_celda=None):
+        self.lados = []
+        self.cajas_lados = []
+        self.cajas_zonas = []
+        for zona in zonas:
+            pol = zona['poligono']
+            lados_zona = []
+            for i in range(len(pol)):
+                a = (pol[i]['x'], pol[i]['y'])
+                b = (pol[(i + 1) % len(pol)]['x'], pol[(i + 1) % len(pol)]['y'])
+                self.lados.append((a, b))
+                self.cajas_lados.append(caja_segmento(a, b))
+                lados_zona.append(a)
+            if lados_zona:
+                xs = [p[0] for p in lados_zona]
+                ys = [p[1] for p in lados_zona]
+                self.cajas_zonas.append((min(xs), min(ys), max(xs), max(ys)))
+
+        self.celdas = defaultdict(list)
+        if not self.lados:
+            return
+
+        # Rejilla sobre la caja que contiene todos los lados. Por defecto las celdas
+        # tienen el tamaño medio de un lado, de forma que cada lado cae en pocas celdas
+        self.x0 = min(c[0] for c in self.cajas_lados)
+        self.y0 = min(c[1] for c in self.cajas_lados)
+        if tam_celda is None:
+            medio = sum(max(c[2] - c[0], c[3] - c[1]) for c in self.cajas_lados) / len(self.lados)
+            tam_celda = medio if medio > 0 else 1.0
+        self.tam_celda = tam_celda
+
+        # Última fila y columna de la rejilla con algún lado: las celdas de fuera están
+        # vacías y no se recorren
+        self.i_max = math.floor((max(c[2] for c in self.cajas_lados) - self.x0) / tam_celda)
+        self.j_max = math.floor((max(c[3] for c in self.cajas_lados) - self.y0) / tam_celda)
+
+        for k, caja in enumerate(self.cajas_lados):
+            for celda in self._celdas_caja(caja):
+                self.celdas[celda].append(k)
+
+    # Celdas de la rejilla que cubren una caja
+    def _celdas_caja(self, caja):
+        t = self.tam_celda
+        i0 = math.floor((caja[0] - self.x0) / t)
+        i1 = math.floor((caja[2] - self.x0) / t)
+        j0 = math.floor((caja[1] - self.y0) / t)
+        j1 = math.floor((caja[3] - self.y0) / t)
+        return ((i, j) for i in range(i0, i1 + 1) for j in range(j0, j1 + 1))
+
+    # Celdas de la rejilla por las que pasa el segmento p1-p2, limitadas a la zona de
+    # la rejilla con lados. Se recorre columna a columna: en cada columna el segmento
+    # ocupa un intervalo de y y solo se visitan las celdas de ese intervalo, así que un
+    # segmento largo visita del orden de su longitud en celdas y no toda su caja. Los
+    # intervalos se amplían un margen mínimo para no perder celdas por redondeo (visitar
+    # celdas de más no cambia el resultado)
+    def _celdas_segmento(self, p1, p2):
+        t = self.tam_celda
+        if p1[0] > p2[0]:
+            p1, p2 = p2, p1
+        xa, ya = p1[0] - self.x0, p1[1] - self.y0
+        xb, yb = p2[0] - self.x0, p2[1] - self.y0
+        margen = t * 1e-9
+        pendiente = (yb - ya) / (xb - xa) if xb > xa else 0.0
+
+        i0 = max(0, math.floor((xa - margen) / t))
+        i1 = min(self.i_max, math.floor((xb + margen) / t))
+        for i in range(i0, i1 + 1):
+            # Tramo del segmento dentro de la columna i
+            x1 = max(xa, i * t)
+            x2 = min(xb, (i + 1) * t)
+            if xb > xa:
+                y1 = ya + (x1 - xa) * pendiente
+                y2 = ya + (x2 - xa) * pendiente
+            else:
+                y1, y2 = ya, yb
+            if y1 > y2:
+                y1, y2 = y2, y1
+            j0 = max(0, math.floor((y1 - margen) / t))
+            j1 = min(self.j_max, math.floor((y2 + margen) / t))
+            for j in range(j0, j1 + 1):
+                yield (i, j)
+
+    # Función para comprobar si el segmento p1-p2 corta algún lado de las zonas no-fly
+    def cruza(self, p1, p2):
+        caja = caja_segmento(p1, p2)
+        if not any(solapan(caja, cz) for cz in self.cajas_zonas):
+            return False
+
+        vistos = set()
+        celdas = self.celdas
+        for celda in self._celdas_segmento(p1, p2):
+            for k in celdas.get(celda, ()):
+                if k in vistos:
+                    continue
+                vistos.add(k)
+                if solapan(caja, self.cajas_lados[k]):
+                    a, b = self.lados[k]
+                    if intersect(p1, p2, a, b):
+                        return True
+        return False
+
+# Versiones vectorizadas de orient y on_segment. Los puntos son arrays con las
+# coordenadas en el último eje y se combinan por broadcasting
+def _orient_np(a, b, c):
+    return (b[..., 0] - a[..., 0]) * (c[..., 1] - a[..., 1]) - (b[..., 1] - a[..., 1]) * (c[..., 0] - a[..., 0])
+
+def _on_segment_np(a, b, c):
+    return ((np.minimum(a[..., 0], b[..., 0]) <= c[..., 0]) & (c[..., 0] <= np.maximum(a[..., 0], b[..., 0])) &
+            (np.minimum(a[..., 1], b[..., 1]) <= c[..., 1]) & (c[..., 1] <= np.maximum(a[..., 1], b[..., 1])))
+
+# Función para comprobar en lote qué segmentos P1[k]-P2[k] cortan algún lado de los
+# polígonos. Por trozos de segmentos (como mucho tam_lote parejas por trozo) se
+# cruzan las cajas de todos los segmentos con las de todos los lados por broadcasting
+# y, solo en las parejas cuyas cajas se solapan, se evalúan las mismas condiciones
+# que intersect. Devuelve un array de booleanos con una posición por segmento.
+# Con coordenadas enteras (menores de 2^26) los productos son exactos en float64 y
+# con coordenadas reales las operaciones son las mismas que en intersect
+def cruzan_lote(P1, P2, lados, tam_lote=TAM_LOTE):
+    m = len(P1)
+    res = np.zeros(m, dtype=bool)
+    if m == 0 or not lados:
+        return res
+
+    P1 = np.asarray(P1, dtype=np.float64)
+    P2 = np.asarray(P2, dtype=np.float64)
+    L = np.asarray(lados, dtype=np.float64)
+    cajas_s = np.concatenate([np.minimum(P1, P2), np.maximum(P1, P2)], axis=1)
+    cajas_l = np.concatenate([L.min(axis=1), L.max(axis=1)], axis=1)
+
+    paso = max(1, tam_lote // len(lados))
+    for inicio in range(0, m, paso):
+        cs = cajas_s[inicio:inicio + paso, np.newaxis, :]
+        solape = ((cs[..., 0] <= cajas_l[:, 2]) & (cajas_l[:, 0] <= cs[..., 2]) &
+                  (cs[..., 1] <= cajas_l[:, 3]) & (cajas_l[:, 1] <= cs[..., 3]))
+        si, li = np.nonzero(solape)
+        if len(si) == 0:
+            continue
+
+        A = P1[inicio + si]
+        B = P2[inicio + si]
+        C = L[li, 0]
+        D = L[li, 1]
+        o1 = _orient_np(A, B, C)
+        o2 = _orient_np(A, B, D)
+        o3 = _orient_np(C, D, A)
+        o4 = _orient_np(C, D, B)
+
+        corte = (o1 * o2 < 0) & (o3 * o4 < 0)
+        corte |= (o1 == 0) & _on_segment_np(A, B, C)
+        corte |= (o2 == 0) & _on_segment_np(A, B, D)
+        corte |= (o3 == 0) & _on_segment_np(C, D, A)
+        corte |= (o4 == 0) & _on_segment_np(C, D, B)
+        res[inicio + si[corte]] = True
+    return res
+
+# Tabla de seguridad de las aristas del grafo:
+#   - ids / indice: identificador de cada vértice <-> entero 0..n-1
+#   - segura: matriz densa n x n en un bytearray (1 si la arista existe y no cruza
+#     ninguna zona no-fly, 0 en otro caso)
+#   - adyacencia: grafo con solo las aristas seguras, en el mismo orden que el original
+#   - tiempo: segundos que ha costado el precálculo
+class TablaSeguridad:
+    def __init__(self, puntos, grafo, zonas):
+        inicio = time.perf_counter()
+        self.ids = list(puntos)
+        self.indice = {v: k for k, v in enumerate(self.ids)}
+        self.n = n = len(self.ids)
+        self.segura = bytearray(n * n)
+        self.adyacencia = defaultdict(dict)
+
+        # El cruce es simétrico, así que cada arista se comprueba una sola vez
+        pares = []
+        for u in grafo:
+            iu = self.indice[u]
+            for v in grafo[u]:
+                iv = self.indice[v]
+                if iu < iv:
+                    pares.append((iu, iv))
+        P1 = [(puntos[self.ids[iu]]['x'], puntos[self.ids[iu]]['y']) for iu, _ in pares]
+        P2 = [(puntos[self.ids[iv]]['x'], puntos[self.ids[iv]]['y']) for _, iv in pares]
+
+        # Con NumPy se comprueban todas las aristas en lote con los lados de los
+        # polígonos; si no, una a una con el índice espacial (la rejilla solo se
+        # construye en este caso)
+        if np is not None:
+            cruzan = cruzan_lote(P1, P2, lados_poligonos(zonas)).tolist()
+        else:
+            indice = IndiceEspacial(zonas)
+            cruzan = [indice.cruza(p1, p2) for p1, p2 in zip(P1, P2)]
+
+        self.aristas = len(pares)
+        self.inseguras = sum(cruzan)
+        for (iu, iv), cruza in zip(pares, cruzan):
+            if not cruza:
+                self.segura[iu * n + iv] = 1
+                self.segura[iv * n + iu] = 1
+
+        # Adyacencia podada recorriendo el grafo en su orden original
+        for u in grafo:
+            iu = self.indice[u] * n
+            for v, peso in grafo[u].items():
+                if self.segura[iu + self.indice[v]]:
+                    self.adyacencia[u][v] = peso
+
+        self.tiempo = time.perf_counter() - inicio
+
+    # Función para consultar si la arista u-v existe y es segura
+    def es_segura(self, u, v):
+        return self.segura[self.indice[u] * self.n + self.indice[v]] == 1
+
+    # Resumen del precálculo para mostrar por pantalla
+    def resumen(self):
+        return (f"Precálculo de seguridad: {self.tiempo:.4f} segundos "
+                f"({self.aristas} aristas, {self.inseguras} cruzan zonas no-fly)")
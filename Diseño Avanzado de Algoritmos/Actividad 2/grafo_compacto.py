@@ -0,0 +1,95 @@
+# Representación compacta del grafo para los planificadores. Los identificadores de
+# los vértices ('HUB', 'E1', 'C2'...) se convierten en enteros 0..n-1 y la adyacencia
+# se guarda en formato CSR (compressed sparse row):
+#   - inicio: las aristas que salen de u son las posiciones inicio[u]..inicio[u+1]-1
+#   - destino: vértice al que llega cada arista
+#   - distancia / riesgo / consumo: columnas paralelas con los pesos de cada arista
+# Así la búsqueda trabaja con enteros e índices de arrays en lugar de calcular el hash
+# de cadenas y consultar diccionarios anidados en cada arista. Los nombres solo se
+# recuperan para mostrar la ruta (nombres).
+#
+# El tipo de cada vértice se guarda como máscara de bits (ENTREGA, RECARGA, HUB) y la
+# arista u-v se localiza en O(1) con una matriz densa n x n de posiciones, igual que
+# la tabla de seguridad de geometria.py. Cada punto de entrega tiene además un bit
+# propio para representar el conjunto de entregas realizadas como un entero.
+from array import array
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# Tipos de vértice como máscaras de bits
+ENTREGA = 1
+RECARGA = 2
+HUB = 4
+
+TIPOS = {'punto_entrega': ENTREGA, 'punto_recarga': RECARGA, 'hub_central': HUB}
+
+class GrafoCompacto:
+    # puntos: vértices del JSON; grafo: adyacencia por nombres (normalmente la de solo
+    # aristas seguras de TablaSeguridad). Los vecinos de cada vértice se guardan en el
+    # mismo orden que en grafo, y los enteros siguen el orden de puntos, como los de la
+    # tabla de seguridad
+    def __init__(self, puntos, grafo):
+        self.ids = list(puntos)
+        self.indice = {v: k for k, v in enumerate(self.ids)}
+        self.n = n = len(self.ids)
+
+        self.tipo = bytearray(TIPOS.get(puntos[v]['tipo'], 0) for v in self.ids)
+        self.hub = self.indice['HUB']
+        self.tipo[self.hub] |= HUB
+        self.entregas = [k for k in range(n) if self.tipo[k] & ENTREGA]
+        self.recargas = [k for k in range(n) if self.tipo[k] & RECARGA]
+
+        # Bit de cada punto de entrega en la máscara de entregas realizadas (0 si el
+        # vértice no es de entrega). todas_entregas es la máscara completa
+        self.bit_entrega = [0] * n
+        for k, v in enumerate(self.entregas):
+            self.bit_entrega[v] = 1 << k
+        self.todas_entregas = (1 << len(self.entregas)) - 1
+
+        self.inicio = array('i', [0])
+        self.destino = array('i')
+        self.distancia = array('d')
+        self.riesgo = array('d')
+        self.consumo = array('d')
+        self.posicion = array('i', [-1]) * (n * n)
+
+        for u in range(n):
+            vecinos = grafo.get(self.ids[u], {})
+            for v, peso in vecinos.items():
+                iv = self.indice[v]
+                self.posicion[u * n + iv] = len(self.destino)
+                self.destino.append(iv)
+                self.distancia.append(peso['distancia'])
+                self.riesgo.append(peso['riesgo'])
+                self.consumo.append(peso['consumo'])
+            self.inicio.append(len(self.destino))
+
+    # Número de aristas dirigidas (cada arista del mapa aparece en los dos sentidos)
+    def __len__(self):
+        return len(self.destino)
+
+    # Posiciones de las aristas que salen de u
+    def aristas(self, u):
+        return range(self.inicio[u], self.inicio[u + 1])
+
+    # Posición de la arista u-v, o -1 si no existe
+    def arista(self, u, v):
+        return self.posicion[u * self.n + v]
+
+    # Nombres de los vértices de una ruta de enteros
+    def nombres(self, ruta):
+        return [self.ids[k] for k in ruta]
+
+    # Columnas de pesos como arrays de NumPy (vistas sin copia de los array('d'))
+    def columnas_np(self):
+        if np is None:
+            raise ImportError("columnas_np necesita NumPy")
+        return {
+            'destino': np.frombuffer(self.destino, dtype=np.int32),
+            'distancia': np.frombuffer(self.distancia, dtype=np.float64),
+            'riesgo': np.frombuffer(self.riesgo, dtype=np.float64),
+            'consumo': np.frombuffer(self.consumo, dtype=np.float64),
+        }
@@ -4,18 +4,26 @@ import math
 import time
 import random
 from collections import defaultdict
-import psutil
-import os
+from perfilado import Perfil
+from geometria import TablaSeguridad
+from grafo_compacto import GrafoCompacto, ENTREGA, RECARGA
+from cotas import CotaRuta, coste_estrategia
+
+try:
+    from caminos import CaminosMinimos, ruta_cache
+except ImportError:
+    CaminosMinimos = None
 
 # Parámetros globales del script
 BATERIA_MAXIMA = 50
 UMBRAL_RECARGA = 30
 ratio_profundidad = 1.25
 
-# Función para obtener el uso actual de memoria en MB
-def get_memoria():
-    proceso = psutil.Process(os.getpid())
-    return proceso.memory_info().rss / 1024 / 1024
+# Tabla de transposición: número de entradas (potencia de 2) y anchura de los tramos
+# de batería. Los umbrales de recarga (20, 30 y 45) son múltiplos del tramo, así que
+# dos estados del mismo tramo están en el mismo lado del umbral
+TAM_TRANSPOSICION = 1 << 18
+TRAMO_BATERIA = 5
 
 # Cargamos el JSON para procesar los datos (vertices, rutas, zonas no-fly, etc)
 def cargar_instancia(archivo_json):
@@ -47,109 +55,57 @@ def cargar_instancia(archivo_json):
     
     return puntos, puntos_entrega, puntos_recarga, grafo, nf_zones
 
-# Función para comprobar la posición relativa de los puntos A, B y C
-def orient(a, b, c):
-    return (b[0] - a[0]) * (c[1] - a[1]) - (b[1] - a[1]) * (c[0] - a[0])
-
-# Función para comprobar si el punto C forma parte del segmento A-B
-def on_segment(a, b, c):
-    return (min(a[0], b[0]) <= c[0] <= max(a[0], b[0]) and min(a[1], b[1]) <= c[1] <= max(a[1], b[1]))
-
-# Función para comprobar la intersección de la ruta con la zona no-fly
-def intersect(a, b, c, d):
-    o1 = orient(a, b, c)
-    o2 = orient(a, b, d)
-    o3 = orient(c, d, a)
-    o4 = orient(c, d, b)
-
-    if o1 * o2 < 0 and o3 * o4 < 0:
-        return True
-    if o1 == 0 and on_segment(a, b, c): return True
-    if o2 == 0 and on_segment(a, b, d): return True
-    if o3 == 0 and on_segment(c, d, a): return True
-    if o4 == 0 and on_segment(c, d, b): return True
-    return False
-
-# Función para comprobar la intersección de la ruta con la zona no-fly
-def cruza_no_fly(p1, p2, zonas):
-    for zona in zonas:
-        pol = zona['poligono']
-        for i in range(len(pol)):
-            a = (pol[i]['x'], pol[i]['y'])
-            b = (pol[(i + 1) % len(pol)]['x'], pol[(i + 1) % len(pol)]['y'])
-            if intersect(p1, p2, a, b):
-                return True
-    return False
-
-# Función de implementación del algoritmo mediante Backtracking
-def calculo_ruta(puntos, puntos_entrega, puntos_recarga, grafo, no_fly_zones, BATERIA_MAXIMA, tiempo_limite, estrategia):
-    
-    # Seguimiento de uso máximo de memoria
-    max_memoria = 0
-    
-    # Función para actualizar el máximo de memoria
-    def actualizar_max_memoria():
-        nonlocal max_memoria
-        memoria_actual = get_memoria()
-        if memoria_actual > max_memoria:
-            max_memoria = memoria_actual
-        return memoria_actual
-    
-    # Actualizamos memoria inicial
-    actualizar_max_memoria()
-    
-    # Creamos una caché para guardar las rutas que ya hemos comprobado y evitar repetir cálculos y bucles
-    cache_seguridad = {}
-    
-    # Función para comprobar si la ruta interseca con alguna zona no-fly
-    def es_segura(puntos, ruta_actual, vertice_siguiente, no_fly_zones, cache_seguridad):
-        
-        # Trabajamos con los 3 últimos vértices para descartar bucles
-        if len(ruta_actual) >= 3:
-            clave = (tuple(ruta_actual[-3:]), vertice_siguiente)
-        else:
-            clave = (tuple(ruta_actual), vertice_siguiente)
-        
-        # En el primer movimiento, incluimos el HUB, que siempre va a ser seguro
-        if not ruta_actual:
-            cache_seguridad[clave] = True
-            return True
-        
-        # Antes de calcular, comprobamos la caché
-        if clave in cache_seguridad:
-            return cache_seguridad[clave]
-
-        # Obtenemos las coordenadas del último vértice y del siguiente
-        ultimo_vertice = ruta_actual[-1]
-        x1, y1 = puntos[ultimo_vertice]['x'], puntos[ultimo_vertice]['y']
-        x2, y2 = puntos[vertice_siguiente]['x'], puntos[vertice_siguiente]['y']
-        
-        # Verificamos si interseca con alguna de las zonas no-fly
-        for zona in no_fly_zones:
-            p1_coords = (x1, y1)
-            p2_coords = (x2, y2)
-            if cruza_no_fly(p1_coords, p2_coords, no_fly_zones):
-                cache_seguridad[clave] = False
-                return False
-        
-        # Si llegamos hasta aquí se han pasado todas las verificaciones y, por tanto, es seguro
-        cache_seguridad[clave] = True
-        return True
+# Función de implementación del algoritmo mediante Backtracking. El grafo es el
+# compacto (grafo_compacto.py) construido con solo las aristas seguras, así que la
+# búsqueda trabaja con enteros y ninguna arista recorrida cruza una zona no-fly.
+#
+# El estado de la búsqueda es el punto actual, la máscara de bits de las entregas
+# realizadas y la batería. La ruta es una única pila que se modifica con append/pop
+# y solo se copia al guardar una solución. La tabla de transposición guarda, para
+# cada (punto, máscara, tramo de batería), el menor coste con el que se ha llegado:
+# si se vuelve al mismo estado con más coste, menos batería y más profundidad, el
+# estado está dominado y se poda. La tabla tiene un tamaño fijo (tam_transposicion
+# entradas) y, cuando dos estados caen en la misma entrada, se queda el menos
+# profundo, que es el que poda subárboles más grandes.
+#
+# Cada candidato se poda si su coste más la cota inferior admisible del resto de la
+# ruta (cotas.py) no mejora la mejor solución. La búsqueda sigue siendo heurística:
+# solo se exploran los 3 candidatos con mejor prioridad (estimación del coste con
+# factores por batería y tipo de punto) y se cortan las ramas que superan en un 50%
+# la mejor distancia, así que la ruta no es necesariamente la óptima. Con caminos
+# (caminos.py) la cota lee los caminos mínimos precalculados en lugar de calcularlos
+def calculo_ruta(grafo, BATERIA_MAXIMA, tiempo_limite, estrategia, tam_transposicion=TAM_TRANSPOSICION, caminos=None):
     
     mejor_solucion = None
     mejor_distancia = float('inf')
     mejor_riesgo = float('inf')
-    max_profundidad = len(puntos) * ratio_profundidad
+    mejor_coste = float('inf')
+    max_profundidad = grafo.n * ratio_profundidad
     posibilidades_exploradas = 0
+    estados_dominados = 0
+    podas_cota = 0
+    cota = CotaRuta(grafo, estrategia, caminos)
+    pesos = cota.pesos
     tiempo_inicio = time.time()
+
+    ruta = [grafo.hub]
+    transposicion = [None] * tam_transposicion
+    mascara_tabla = tam_transposicion - 1
+
+    # Columnas del grafo en variables locales para el bucle de la búsqueda
+    hub = grafo.hub
+    tipo = grafo.tipo
+    inicio = grafo.inicio
+    destino = grafo.destino
+    distancia = grafo.distancia
+    riesgo = grafo.riesgo
+    consumo = grafo.consumo
+    bit_entrega = grafo.bit_entrega
+    todas_entregas = grafo.todas_entregas
     
     # Buscamos candidatos mediante el método de poda 
-    def explorar(ruta_actual, visitados, distancia_actual, riesgo_actual, consumo_actual, bateria_actual, profundidad, recargas):
-        nonlocal mejor_solucion, mejor_distancia, mejor_riesgo, posibilidades_exploradas
-        
-        # Actualizamos la memoria periódicamente
-        if posibilidades_exploradas % 100 == 0:
-            actualizar_max_memoria()
+    def explorar(entregadas, distancia_actual, riesgo_actual, consumo_actual, bateria_actual, profundidad, recargas):
+        nonlocal mejor_solucion, mejor_distancia, mejor_riesgo, mejor_coste, posibilidades_exploradas, estados_dominados, podas_cota
         
         posibilidades_exploradas += 1
         
@@ -161,58 +117,61 @@ def calculo_ruta(puntos, puntos_entrega, puntos_recarga, grafo, no_fly_zones, BA
         if profundidad > max_profundidad:
             return
         
-        # Si tenemos una buena solución hacemos una poda más agresiva
+        # Si tenemos una buena solución hacemos una poda más agresiva (heurística, no
+        # usa la cota y puede descartar la ruta óptima)
         if mejor_solucion and posibilidades_exploradas > 10000 and distancia_actual > mejor_distancia * 1.5:
             return
         
+        # Consultamos la tabla de transposición y podamos el estado si está dominado
+        punto_actual = ruta[-1]
+        coste_actual = coste_estrategia(distancia_actual, riesgo_actual, estrategia)
+        tramo = int(bateria_actual // TRAMO_BATERIA)
+        posicion = hash((punto_actual, entregadas, tramo)) & mascara_tabla
+        entrada = transposicion[posicion]
+        if entrada is not None and entrada[0] == punto_actual and entrada[1] == entregadas and entrada[2] == tramo:
+            if entrada[3] <= coste_actual and entrada[4] >= bateria_actual and entrada[5] <= profundidad:
+                estados_dominados += 1
+                return
+            transposicion[posicion] = (punto_actual, entregadas, tramo, coste_actual, bateria_actual, profundidad)
+        elif entrada is None or entrada[5] >= profundidad:
+            transposicion[posicion] = (punto_actual, entregadas, tramo, coste_actual, bateria_actual, profundidad)
+        
         # Comprobamos si se han visitado ya todos los destinos (puntos de entrega)
-        if all(p in visitados for p in puntos_entrega):
+        if entregadas == todas_entregas:
         
-            # Si el último nodo visitado es el HUB, entonces la solución es completa y válida
-            ultimo = ruta_actual[-1]
-            if 'HUB' not in grafo[ultimo]:
+            # Si el último nodo visitado es el HUB, entonces la solución es completa y válida.
+            # La arista solo existe en el grafo si no cruza ninguna zona no-fly
+            ultimo = punto_actual
+            e = grafo.arista(ultimo, hub)
+            if e < 0:
                 return
             
-            datos_hub = grafo[ultimo]['HUB']
-            dist_final = distancia_actual + datos_hub['distancia']
-            riesgo_final = riesgo_actual + datos_hub['riesgo']
-            consumo_final = consumo_actual + datos_hub['consumo']
+            dist_final = distancia_actual + distancia[e]
+            riesgo_final = riesgo_actual + riesgo[e]
+            consumo_final = consumo_actual + consumo[e]
             
             # Comprobamos que tengamos batería para realizar el último paso
-            if bateria_actual < datos_hub['consumo']:
-                return
-            
-            # Comprobamos que la ruta actual no cruza ninguna zona no-fly
-            if not es_segura(puntos, [ultimo], 'HUB', no_fly_zones, cache_seguridad):
+            if bateria_actual < consumo[e]:
                 return
             
             # Evaluamos si la solución actual es mejor que la anterior o si todavía no hay ninguna
             # Dependiendo de la estrategia, evaluamos diferente
-            if estrategia == "1":
-                valor_actual = dist_final
-                mejor_valor = mejor_distancia
-            elif estrategia == "2":
-                valor_actual = riesgo_final
-                mejor_valor = mejor_riesgo
-            else:
-                valor_actual = dist_final + riesgo_final * 50
-                mejor_valor = mejor_distancia + mejor_riesgo * 50
+            valor_actual = coste_estrategia(dist_final, riesgo_final, estrategia)
             
-            if mejor_solucion is None or valor_actual < mejor_valor:
+            if mejor_solucion is None or valor_actual < mejor_coste:
                 mejor_solucion = {
-                    'ruta': ruta_actual + ['HUB'],
+                    'ruta': ruta + [hub],
                     'distancia': dist_final,
                     'riesgo': riesgo_final,
-                    'consumo': consumo_actual + datos_hub['consumo'],
+                    'consumo': consumo_final,
                     'posibilidades_exploradas': posibilidades_exploradas,
                     'recargas': recargas,
                     'estrategia': estrategia
                 }
                 mejor_distancia = dist_final
                 mejor_riesgo = riesgo_final
+                mejor_coste = valor_actual
             return
-            
-        punto_actual = ruta_actual[-1]
         
         # Configuramos el umbral de recarga según la estrategia elegida
         if estrategia == "4":
@@ -224,153 +183,161 @@ def calculo_ruta(puntos, puntos_entrega, puntos_recarga, grafo, no_fly_zones, BA
                         
         candidatos = []
         
-        for vecino, datos in grafo[punto_actual].items():
-            if vecino == 'HUB':
+        # Recorremos las aristas que salen del punto actual (solo hay aristas seguras)
+        for e in range(inicio[punto_actual], inicio[punto_actual + 1]):
+            vecino = destino[e]
+            if vecino == hub:
                 continue
+            tipo_vecino = tipo[vecino]
                 
             # Si el siguiente punto de entrega candidato ya ha sido visitado, lo ignoramos
-            if vecino in puntos_entrega and vecino in visitados:
+            if entregadas & bit_entrega[vecino]:
                 continue
             
             # Si no tuviesemos suficiente combustible para realizar el paso y el siguiente punto no es un punto de recarga, lo ignoramos
-            nueva_bateria = bateria_actual - datos['consumo']
-            if nueva_bateria < 0 and vecino not in puntos_recarga:
+            nueva_bateria = bateria_actual - consumo[e]
+            if nueva_bateria < 0 and not tipo_vecino & RECARGA:
                 continue
             
-            # Si la ruta candidata cruza alguna zona no-fly, la ignoramos
-            if not es_segura(puntos, ruta_actual, vecino, no_fly_zones, cache_seguridad):
-                continue
-            
-            # Calculamos cuantos puntos de entrega nos falta por visitar y estimamos un posible costo para llegar a ellos (cota)
-            restantes = len(puntos_entrega) - len(visitados)
-            estimacion = distancia_actual + datos['distancia'] + (restantes * 25)
+            # Calculamos una cota inferior del coste de terminar la ruta pasando por el vecino
+            restante = cota.restante(vecino, entregadas | bit_entrega[vecino])
+            estimacion = coste_actual + pesos[e] + restante
             
-            # Si la estimación tiene un coste mayor que la mejor actual, la ignoramos
-            if mejor_solucion and estimacion > mejor_distancia * 1.3:
+            # Si ni siquiera la cota mejora la mejor solución actual, la ignoramos
+            if estimacion >= mejor_coste:
+                podas_cota += 1
                 continue
             
-            # Calculamos prioridad la según la estrategia elegida o el valor de la carga si este está por debajo del umbral
-            prioridad = 0
-            
+            # La prioridad parte de la estimación del coste que usa la poda (tramo con los
+            # pesos de la estrategia más la cota del resto) y se ajusta con los factores
+            # heurísticos de batería y de tipo de punto
+            prioridad = pesos[e] + restante
+
             # Si la batería está baja damos prioridad a puntos de recarga penalizando los puntos de entrega
             if bateria_actual < umbral_actual:
-                if vecino in puntos_recarga:
-                    prioridad = datos['distancia'] * 0.01
-                else:
-                    prioridad = datos['distancia'] * 5.0
-            # Si la batería no está por debajo del umbral
-            else:
-                if estrategia == "1":
-                    prioridad = datos['distancia']
-                elif estrategia == "2":
-                    prioridad = datos['distancia'] + datos['riesgo'] * 50
-                elif estrategia == "4":
-                    prioridad = datos['distancia'] + datos['riesgo'] * 40 + datos['consumo'] * 10
-                elif estrategia == "5":
-                    prioridad = datos['distancia'] + datos['riesgo'] * 100 - datos['consumo'] * 5
+                if tipo_vecino & RECARGA:
+                    prioridad *= 0.01
                 else:
-                    prioridad = datos['distancia'] + datos['riesgo'] * 50
-            
+                    prioridad *= 5.0
+
             # Priorizamos los puntos de entrega no visitados
-            if vecino in puntos_entrega and vecino not in visitados:
-                prioridad *= 0.3 
-            
-            candidatos.append((prioridad, vecino, datos, nueva_bateria))
+            if tipo_vecino & ENTREGA:
+                prioridad *= 0.3
+
+            candidatos.append((prioridad, vecino, e, nueva_bateria))
         
         # Ordenamos según la prioridad establecida por la estrategia
         candidatos.sort(key=lambda x: x[0])
         
-        # Limitamos la búsqueda a los mejores 3 candidatos
-        for _, vecino, datos, nueva_bateria in candidatos[:3]:
+        # Limitamos la búsqueda a los mejores 3 candidatos (heurístico: el resto no se explora)
+        for _, vecino, e, nueva_bateria in candidatos[:3]:
             nuevas_recargas = recargas
             nueva_bateria_despues_movimiento = nueva_bateria
+            es_recarga = tipo[vecino] & RECARGA
             
             # Solo contamos una recarga si se pasa por un punto de recarga teniendo la batería por debajo del umbral
-            if vecino in puntos_recarga and nueva_bateria < umbral_actual:
+            if es_recarga and nueva_bateria < umbral_actual:
                 nueva_bateria_despues_movimiento = BATERIA_MAXIMA 
                 nuevas_recargas = recargas + 1
                 
             # Si pasamos por un punto de recarga pero no necesitamos recargar no lo contamos
-            elif vecino in puntos_recarga and nueva_bateria >= umbral_actual:
+            elif es_recarga and nueva_bateria >= umbral_actual:
                 nueva_bateria_despues_movimiento = nueva_bateria
                 nuevas_recargas = recargas
             
-            nuevo_visitados = visitados.copy()
-            if vecino in puntos_entrega:
-                nuevo_visitados.add(vecino)
-            
             # Determinamos si necesitamos recarga urgente en el siguiente paso
-            siguiente_necesita_recarga = (nueva_bateria_despues_movimiento < umbral_actual) and (vecino not in puntos_recarga)
+            siguiente_necesita_recarga = (nueva_bateria_despues_movimiento < umbral_actual) and not es_recarga
             
-            # Proseguimos la búsqueda de forma recursiva
+            # Proseguimos la búsqueda de forma recursiva apilando el vecino en la ruta
+            ruta.append(vecino)
             explorar(
-                ruta_actual + [vecino],
-                nuevo_visitados,
-                distancia_actual + datos['distancia'],
-                riesgo_actual + datos['riesgo'],
-                consumo_actual + datos['consumo'],
+                entregadas | bit_entrega[vecino],
+                distancia_actual + distancia[e],
+                riesgo_actual + riesgo[e],
+                consumo_actual + consumo[e],
                 nueva_bateria_despues_movimiento,
                 profundidad + 1,
                 nuevas_recargas
             )
+            ruta.pop()
             
     # Iniciamos la búsqueda de candidatos
-    explorar(['HUB'], set(), 0, 0, 0, BATERIA_MAXIMA, 0, 0)
+    explorar(0, 0, 0, 0, BATERIA_MAXIMA, 0, 0)
     
     tiempo_total = time.time() - tiempo_inicio
     
-    # Última actualización de memoria
-    actualizar_max_memoria()
-    
     if mejor_solucion:
         mejor_solucion['tiempo_ejecucion'] = tiempo_total
-        mejor_solucion['memoria_maxima_mb'] = max_memoria
+        mejor_solucion['estados_explorados'] = posibilidades_exploradas
+        mejor_solucion['estados_dominados'] = estados_dominados
+        mejor_solucion['podas_cota'] = podas_cota
     
     return mejor_solucion
 
-# Validamos la entrada del script
-if len(sys.argv) == 3:
-    archivo_json = sys.argv[1]
-    tiempo_limite = int(sys.argv[2])
-    estrategia = "3"
-elif len(sys.argv) == 4 and sys.argv[3] in ("1","2","3","4","5"):
-    archivo_json = sys.argv[1]
-    tiempo_limite = int(sys.argv[2])
-    estrategia = sys.argv[3]
-else:
-    print("Uso: python planificador_geom.py <instancia.json> <tiempo> [estrategia (1,2,3,4,5)]")
-    sys.exit(1)
-    
-puntos, puntos_entrega, puntos_recarga, grafo, no_fly_zones = cargar_instancia(archivo_json)
+# Punto de entrada del script (el planificador exacto importa este módulo para usar
+# calculo_ruta como alternativa heurística)
+if __name__ == "__main__":
+    # Validamos la entrada del script
+    if len(sys.argv) == 3:
+        archivo_json = sys.argv[1]
+        tiempo_limite = int(sys.argv[2])
+        estrategia = "3"
+    elif len(sys.argv) == 4 and sys.argv[3] in ("1","2","3","4","5"):
+        archivo_json = sys.argv[1]
+        tiempo_limite = int(sys.argv[2])
+        estrategia = sys.argv[3]
+    else:
+        print("Uso: python planificador_geom.py <instancia.json> <tiempo> [estrategia (1,2,3,4,5)]")
+        sys.exit(1)
 
-print()
-print("="*100)
-print("BUSQUEDA DE RUTA POR BACKTRACKING / BRANCH-AND-BOUND CON PODA GUIADA POR COTAS HEURÍSTICAS")
-print("="*100)
-print(f"Tiempo límite: {tiempo_limite} segundos")
-print(f"Batería máxima: {BATERIA_MAXIMA}%")
-print(f"Umbral de recarga: {UMBRAL_RECARGA}%")
-print(f"Vértices totales (sin HUB): {len(puntos)-1}")
-print(f"Puntos de entrega: {len(puntos_entrega)}")
-print(f"Puntos de recarga: {len(puntos_recarga)}")
+    # Medición de recursos (tiempo de CPU, pico de memoria y fases)
+    perfil = Perfil().iniciar()
 
-# Ejecutamos el algoritmo de planificación
-res = calculo_ruta(puntos, puntos_entrega, puntos_recarga, grafo, no_fly_zones, BATERIA_MAXIMA, tiempo_limite, estrategia)
+    with perfil.fase("carga"):
+        puntos, puntos_entrega, puntos_recarga, grafo, no_fly_zones = cargar_instancia(archivo_json)
 
-# Mostramos los resultados
-if res:
-    print(f"\nRuta encontrada:")
-    print(f"Ruta: {' -> '.join(res['ruta'])}")
-    print(f"Distancia recorrida: {res['distancia']:.2f}")
-    riesgo_tramo = round(res['riesgo']/len(res['ruta']), 2)
-    print(f"Riesgo por tramo: {riesgo_tramo}")
-    print(f"Consumo total: {res['consumo']:.2f}")
-    print(f"Tiempo ejecución: {res['tiempo_ejecucion']:.2f} segundos")
-    print(f"Memoria máxima utilizada: {res['memoria_maxima_mb']:.2f} MB")
-    entregas_visitadas = sum(1 for p in res['ruta'] if p in puntos_entrega)
-    print(f"Puntos de entrega visitados: {entregas_visitadas}/{len(puntos_entrega)}")
-    print(f"Recargas efectuadas: {res['recargas']}")
     print()
-else:
-    print("\nNo se ha podido encontrar una solución válida completa en el tiempo establecido.\n")
+    print("="*100)
+    print("BUSQUEDA DE RUTA POR BACKTRACKING / BRANCH-AND-BOUND CON PODA GUIADA POR COTAS HEURÍSTICAS")
+    print("="*100)
+    print(f"Tiempo límite: {tiempo_limite} segundos")
+    print(f"Batería máxima: {BATERIA_MAXIMA}%")
+    print(f"Umbral de recarga: {UMBRAL_RECARGA}%")
+    print(f"Vértices totales (sin HUB): {len(puntos)-1}")
+    print(f"Puntos de entrega: {len(puntos_entrega)}")
+    print(f"Puntos de recarga: {len(puntos_recarga)}")
+
+    # Precalculamos qué aristas cruzan alguna zona no-fly
+    with perfil.fase("precalculo"):
+        seguridad = TablaSeguridad(puntos, grafo, no_fly_zones)
+        grafo_seguro = GrafoCompacto(puntos, seguridad.adyacencia)
+        caminos = CaminosMinimos(grafo_seguro, ruta_cache(archivo_json)) if CaminosMinimos else None
+    print(seguridad.resumen())
+
+    # Ejecutamos el algoritmo de planificación
+    with perfil.fase("busqueda"):
+        res = calculo_ruta(grafo_seguro, BATERIA_MAXIMA, tiempo_limite, estrategia, caminos=caminos)
+    perfil.detener()
+
+    # Mostramos los resultados
+    if res:
+        res['ruta'] = grafo_seguro.nombres(res['ruta'])
+        print(f"\nRuta encontrada:")
+        print(f"Ruta: {' -> '.join(res['ruta'])}")
+        print(f"Distancia recorrida: {res['distancia']:.2f}")
+        riesgo_tramo = round(res['riesgo']/len(res['ruta']), 2)
+        print(f"Riesgo por tramo: {riesgo_tramo}")
+        print(f"Consumo total: {res['consumo']:.2f}")
+        print(f"Tiempo ejecución: {res['tiempo_ejecucion']:.2f} segundos")
+        print(f"Memoria máxima utilizada: {perfil.memoria() / 1024 / 1024:.2f} MB")
+        entregas_visitadas = sum(1 for p in res['ruta'] if p in puntos_entrega)
+        print(f"Puntos de entrega visitados: {entregas_visitadas}/{len(puntos_entrega)}")
+        print(f"Recargas efectuadas: {res['recargas']}")
+        print(f"Estados explorados: {res['estados_explorados']} (podados por la tabla de transposición: {res['estados_dominados']})")
+        print(f"Candidatos podados por la cota inferior: {res['podas_cota']}")
+        perfil.imprimir()
+        print()
+    else:
+        print("\nNo se ha podido encontrar una solución válida completa en el tiempo establecido.\n")
+        perfil.imprimir()
 
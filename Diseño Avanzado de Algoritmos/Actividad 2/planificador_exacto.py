@@ -0,0 +1,323 @@
+import os
+import sys
+import math
+import time
+import heapq
+import importlib.util
+from perfilado import Perfil
+from geometria import TablaSeguridad
+from grafo_compacto import GrafoCompacto, ENTREGA, RECARGA
+from cotas import CotaRuta, coste_estrategia
+
+try:
+    import numpy as np
+    from caminos import CaminosMinimos, ruta_cache
+except ImportError:
+    np = None
+    CaminosMinimos = None
+
+# Parámetros globales del script
+BATERIA_MAXIMA = 50
+UMBRAL_RECARGA = 30
+MEMORIA_MAXIMA_MB = 512
+
+# Bytes por estado de las tablas: coste (float64) y estado previo (int32)
+BYTES_ESTADO = 8 + 4
+
+# Bytes aproximados de cada entrada de la cola de prioridad (la tupla de 4 elementos,
+# sus dos floats y sus dos enteros y la posición en la lista)
+BYTES_COLA = 200
+
+# Bytes aproximados que guarda la cota (cotas.py) por cada máscara a la que se llega,
+# sin contar una referencia por terminal pendiente
+BYTES_COTA = 256
+
+# Planificador exacto mediante programación dinámica sobre máscaras de bits
+# (Held-Karp) con la batería como parte del estado. Un estado es (entregas realizadas,
+# punto actual, batería) y la ruta óptima es el camino mínimo en el grafo de estados
+# desde (ninguna entrega, HUB, batería llena) hasta (todas las entregas, HUB), con las
+# mismas reglas que los planificadores heurísticos:
+#   - cada punto de entrega se visita una sola vez y el HUB solo al final
+#   - un tramo solo se puede hacer si la batería alcanza para su consumo
+#   - al llegar a un punto de recarga con la batería por debajo del umbral se recarga
+#
+# Se resuelve con A*: la heurística es la cota de cotas.py (MST de las entregas
+# pendientes y el HUB sobre los caminos mínimos seguros de caminos.py más la
+# distancia al más cercano), que es admisible y consistente, así que el primer estado final que sale
+# de la cola es el óptimo. A* solo llega a una pequeña parte de las máscaras, así que
+# los costes y los estados previos se guardan en tablas de NumPy de n * niveles
+# posiciones (punto * niveles + batería) que se crean la primera vez que se llega a
+# cada máscara. El estado previo se guarda sin su máscara: es la misma máscara o, si
+# el punto es de entrega, la máscara sin el bit de ese punto.
+#
+# La batería se discretiza en unidades enteras redondeando el consumo hacia arriba,
+# de forma que ninguna ruta aceptada se queda sin batería. La memoria máxima se aplica
+# a la búsqueda: las tablas que se van creando, la cola de prioridad y los MST que la
+# cota guarda por máscara. Si la búsqueda la supera (o no está NumPy), se usa el
+# Branch-and-Bound de planificador_b&b.py, que no tiene límite de memoria. Antes de
+# empezar se estima la memoria de las tablas en el peor caso (todas las máscaras)
+# solo como aviso.
+
+# Umbral de recarga según la estrategia elegida (igual que en los planificadores)
+def umbral_estrategia(estrategia):
+    if estrategia == "4":
+        return UMBRAL_RECARGA + 15
+    if estrategia == "5":
+        return UMBRAL_RECARGA - 10
+    return UMBRAL_RECARGA
+
+# Función para estimar el número de estados y la memoria de las tablas en bytes en el
+# peor caso, si la búsqueda llegase a todas las máscaras de entregas
+def estimar_memoria(grafo, bateria_maxima):
+    estados = (1 << len(grafo.entregas)) * grafo.n * (int(bateria_maxima) + 1)
+    return estados, estados * BYTES_ESTADO
+
+# Función para cargar planificador_b&b.py como módulo (el nombre tiene '&', así que
+# no se puede importar con import)
+def cargar_heuristico():
+    ruta = os.path.join(os.path.dirname(os.path.abspath(__file__)), "planificador_b&b.py")
+    spec = importlib.util.spec_from_file_location("planificador_bb", ruta)
+    modulo = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(modulo)
+    return modulo
+
+# Función para comprobar si una ruta cumple la regla de batería del modelo exacto:
+# ningún tramo puede consumir más batería de la que queda al empezarlo
+def respeta_bateria(grafo, ruta, bateria_maxima, umbral):
+    bateria = bateria_maxima
+    for a, b in zip(ruta, ruta[1:]):
+        e = grafo.arista(a, b)
+        if e < 0:
+            return False
+
+        # El consumo se redondea hacia arriba igual que en la búsqueda exacta
+        gasto = math.ceil(grafo.consumo[e])
+        if gasto > bateria:
+            return False
+        bateria -= gasto
+        if grafo.tipo[b] & RECARGA and bateria < umbral:
+            bateria = bateria_maxima
+    return True
+
+# Función de implementación del planificador exacto. Devuelve None si se agota el
+# tiempo o la memoria máxima (en MB) o si no existe ninguna ruta válida
+def calculo_ruta(grafo, bateria_maxima, tiempo_limite, estrategia, caminos=None, memoria_maxima=MEMORIA_MAXIMA_MB):
+    inicio_busqueda = time.time()
+    n = grafo.n
+    niveles = int(bateria_maxima) + 1
+    umbral = umbral_estrategia(estrategia)
+    hub = grafo.hub
+    tipo = grafo.tipo
+    inicio = grafo.inicio
+    destino = grafo.destino
+    bit_entrega = grafo.bit_entrega
+    todas_entregas = grafo.todas_entregas
+
+    cota = CotaRuta(grafo, estrategia, caminos)
+    pesos = cota.pesos
+    gasto = [math.ceil(c) for c in grafo.consumo]
+
+    # Tablas de costes y estados previos por máscara. Cada máscara ocupa su tabla y lo
+    # que guarda la cota, y la cola puede crecer hasta la memoria que dejan las máscaras
+    tam_tabla = n * niveles
+    bytes_mascara = tam_tabla * BYTES_ESTADO + BYTES_COTA + 8 * len(cota.terminales)
+    limite = int(memoria_maxima * 1024 * 1024)
+    max_cola = (limite - bytes_mascara) // BYTES_COLA
+    costes = {}
+    previos = {}
+    if max_cola < 1:
+        return None
+    costes[0] = np.full(tam_tabla, np.inf)
+    previos[0] = np.full(tam_tabla, -1, dtype=np.int32)
+
+    origen = hub * niveles + (niveles - 1)
+    costes[0][origen] = 0.0
+    cola = [(cota.restante(hub, 0), 0.0, 0, origen)]
+    expandidos = 0
+    final = None
+
+    while cola:
+        _, g, entregadas, estado = heapq.heappop(cola)
+        coste = costes[entregadas]
+        if g > coste[estado]:
+            continue
+
+        u, bateria = divmod(estado, niveles)
+        if u == hub and entregadas == todas_entregas and (entregadas, estado) != (0, origen):
+            final = (entregadas, estado)
+            break
+
+        expandidos += 1
+        if expandidos % 4096 == 0 and time.time() - inicio_busqueda > tiempo_limite:
+            return None
+
+        for e in range(inicio[u], inicio[u + 1]):
+            if gasto[e] > bateria:
+                continue
+            v = destino[e]
+            nuevas = entregadas
+            if v == hub:
+                if entregadas != todas_entregas:
+                    continue
+            elif tipo[v] & ENTREGA:
+                if entregadas & bit_entrega[v]:
+                    continue
+                nuevas = entregadas | bit_entrega[v]
+
+            nueva_bateria = bateria - gasto[e]
+            if tipo[v] & RECARGA and nueva_bateria < umbral:
+                nueva_bateria = niveles - 1
+
+            # Creamos las tablas de la máscara la primera vez que se llega a ella
+            tabla = costes.get(nuevas)
+            if tabla is None:
+                max_cola = (limite - (len(costes) + 1) * bytes_mascara) // BYTES_COLA
+                if len(cola) >= max_cola:
+                    return None
+                tabla = costes[nuevas] = np.full(tam_tabla, np.inf)
+                previos[nuevas] = np.full(tam_tabla, -1, dtype=np.int32)
+
+            siguiente = v * niveles + nueva_bateria
+            ng = g + pesos[e]
+            if ng < tabla[siguiente]:
+                if len(cola) >= max_cola:
+                    return None
+                tabla[siguiente] = ng
+                previos[nuevas][siguiente] = estado
+                heapq.heappush(cola, (ng + cota.restante(v, nuevas), ng, nuevas, siguiente))
+
+    if final is None:
+        return None
+
+    # Reconstruimos la ruta siguiendo los estados previos. Al llegar a un punto de
+    # entrega se añade su bit, así que la máscara anterior es la actual sin ese bit
+    ruta = []
+    entregadas, estado = final
+    while estado >= 0:
+        u = estado // niveles
+        ruta.append(u)
+        estado = int(previos[entregadas][estado])
+        if tipo[u] & ENTREGA:
+            entregadas ^= bit_entrega[u]
+    ruta.reverse()
+
+    # Métricas de la ruta con los pesos reales del grafo
+    distancia = riesgo = consumo = 0.0
+    bateria = bateria_maxima
+    recargas = 0
+    for a, b in zip(ruta, ruta[1:]):
+        e = grafo.arista(a, b)
+        distancia += grafo.distancia[e]
+        riesgo += grafo.riesgo[e]
+        consumo += grafo.consumo[e]
+        bateria -= gasto[e]
+        if tipo[b] & RECARGA and bateria < umbral:
+            bateria = bateria_maxima
+            recargas += 1
+
+    return {
+        'ruta': ruta,
+        'distancia': distancia,
+        'riesgo': riesgo,
+        'consumo': consumo,
+        'recargas': recargas,
+        'valor': coste_estrategia(distancia, riesgo, estrategia),
+        'estados_expandidos': expandidos,
+        'tablas': len(costes),
+        'memoria_tablas': len(costes) * tam_tabla * BYTES_ESTADO,
+        'memoria_busqueda': len(costes) * bytes_mascara + len(cola) * BYTES_COLA,
+        'tiempo_ejecucion': time.time() - inicio_busqueda,
+        'exacta': True
+    }
+
+# Punto de entrada del script
+if __name__ == "__main__":
+    # Validamos la entrada del script
+    if len(sys.argv) in (3, 4, 5) and (len(sys.argv) == 3 or sys.argv[3] in ("1","2","3","4","5")):
+        archivo_json = sys.argv[1]
+        tiempo_limite = int(sys.argv[2])
+        estrategia = sys.argv[3] if len(sys.argv) >= 4 else "3"
+        memoria_maxima = float(sys.argv[4]) if len(sys.argv) == 5 else MEMORIA_MAXIMA_MB
+    else:
+        print("Uso: python planificador_exacto.py <instancia.json> <tiempo> [estrategia (1,2,3,4,5)] [memoria_maxima_MB]")
+        print("  memoria_maxima_MB: límite aproximado de las tablas, la cola y las cotas de la búsqueda exacta")
+        print("  (por defecto 512); el Branch-and-Bound que se usa si se supera no tiene límite de memoria")
+        sys.exit(1)
+
+    # Medición de recursos (tiempo de CPU, pico de memoria y fases)
+    perfil = Perfil().iniciar()
+
+    heuristico = cargar_heuristico()
+    with perfil.fase("carga"):
+        puntos, puntos_entrega, puntos_recarga, grafo, no_fly_zones = heuristico.cargar_instancia(archivo_json)
+
+    print()
+    print("="*100)
+    print("BUSQUEDA DE RUTA ÓPTIMA POR PROGRAMACIÓN DINÁMICA (HELD-KARP CON BATERÍA)")
+    print("="*100)
+    print(f"Tiempo límite: {tiempo_limite} segundos")
+    print(f"Batería máxima: {BATERIA_MAXIMA}%")
+    print(f"Umbral de recarga: {umbral_estrategia(estrategia)}%")
+    print(f"Vértices totales (sin HUB): {len(puntos)-1}")
+    print(f"Puntos de entrega: {len(puntos_entrega)}")
+    print(f"Puntos de recarga: {len(puntos_recarga)}")
+
+    # Precalculamos qué aristas cruzan alguna zona no-fly
+    with perfil.fase("precalculo"):
+        seguridad = TablaSeguridad(puntos, grafo, no_fly_zones)
+        grafo_seguro = GrafoCompacto(puntos, seguridad.adyacencia)
+        caminos = CaminosMinimos(grafo_seguro, ruta_cache(archivo_json)) if CaminosMinimos else None
+    print(seguridad.resumen())
+
+    # Estimamos la memoria del peor caso (todas las máscaras) como aviso
+    estados, memoria = estimar_memoria(grafo_seguro, BATERIA_MAXIMA)
+    print(f"Espacio de estados: {estados} estados, {memoria / 1024 / 1024:.2f} MB en el peor caso (máximo {memoria_maxima:.0f} MB)")
+    if memoria > memoria_maxima * 1024 * 1024:
+        print("Aviso: el peor caso supera la memoria máxima; la búsqueda se detiene si sus tablas, su cola y sus cotas la alcanzan.")
+
+    res = None
+    tiempo_inicio = time.time()
+    if np is None:
+        print("NumPy no está instalado: se usa el Branch-and-Bound heurístico.")
+    else:
+        with perfil.fase("busqueda"):
+            res = calculo_ruta(grafo_seguro, BATERIA_MAXIMA, tiempo_limite, estrategia, caminos, memoria_maxima)
+        if res is None:
+            print("La programación dinámica no ha terminado en el tiempo o la memoria máxima (o no hay ruta válida): se usa el Branch-and-Bound heurístico.")
+
+    # Alternativa heurística con el tiempo que quede
+    if res is None:
+        restante = max(1, tiempo_limite - (time.time() - tiempo_inicio))
+        with perfil.fase("busqueda_heuristica"):
+            res = heuristico.calculo_ruta(grafo_seguro, BATERIA_MAXIMA, restante, estrategia, caminos=caminos)
+
+        # El Branch-and-Bound admite llegar a una recarga con batería negativa, así que
+        # su ruta se comprueba con la regla de batería del modelo exacto
+        if res:
+            res['bateria_valida'] = respeta_bateria(grafo_seguro, res['ruta'], BATERIA_MAXIMA, umbral_estrategia(estrategia))
+    perfil.detener()
+
+    # Mostramos los resultados
+    if res:
+        ruta = grafo_seguro.nombres(res['ruta'])
+        print(f"\nRuta {'óptima' if res.get('exacta') else 'encontrada'} ({len(ruta)} nodos):")
+        print(f"Ruta: {' -> '.join(ruta)}")
+        print(f"Distancia recorrida: {res['distancia']:.2f}")
+        riesgo_tramo = round(res['riesgo']/len(ruta), 2)
+        print(f"Riesgo por tramo: {riesgo_tramo}")
+        print(f"Consumo total: {res['consumo']:.2f}")
+        print(f"Tiempo ejecución: {res['tiempo_ejecucion']:.2f} segundos")
+        print(f"Memoria máxima utilizada: {perfil.memoria() / 1024 / 1024:.2f} MB")
+        entregas_visitadas = sum(1 for p in ruta if p in puntos_entrega)
+        print(f"Puntos de entrega visitados: {entregas_visitadas}/{len(puntos_entrega)}")
+        print(f"Recargas efectuadas: {res['recargas']}")
+        if res.get('exacta'):
+            print(f"Estados expandidos: {res['estados_expandidos']}")
+            print(f"Tablas de estados: {res['tablas']} máscaras, {res['memoria_tablas'] / 1024 / 1024:.2f} MB (búsqueda completa: {res['memoria_busqueda'] / 1024 / 1024:.2f} MB)")
+        elif not res['bateria_valida']:
+            print("Aviso: la ruta heurística no respeta la batería del modelo exacto (algún tramo consume más batería de la que queda).")
+        perfil.imprimir()
+        print()
+    else:
+        print("\nNo se ha podido encontrar una solución válida completa en el tiempo establecido.\n")
+        perfil.imprimir()
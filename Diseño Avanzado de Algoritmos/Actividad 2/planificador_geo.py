@@ -2,20 +2,22 @@ import sys
 import json
 import time
 import math
-import psutil
-import os
 from collections import defaultdict
+from perfilado import Perfil
+from geometria import TablaSeguridad
+from grafo_compacto import GrafoCompacto, ENTREGA, RECARGA
+from cotas import CotaRuta, coste_estrategia
+
+try:
+    from caminos import CaminosMinimos, ruta_cache
+except ImportError:
+    CaminosMinimos = None
 
 # Parámetros globales del script
 BATERIA_MAXIMA = 50
 UMBRAL_RECARGA = 30
-FACTOR_PODA = 1.25
 MAX_RECURSION = 5000
 
-# Función para obtener el uso actual de memoria en MB
-def memoria_mb():
-    return psutil.Process(os.getpid()).memory_info().rss / 1024 / 1024
-
 # Cargamos el JSON para procesar los datos (vertices, rutas, zonas no-fly, etc)
 def cargar_instancia(archivo_json):
     with open(archivo_json, 'r') as f:
@@ -46,52 +48,11 @@ def cargar_instancia(archivo_json):
     
     return puntos, puntos_entrega, puntos_recarga, grafo, nf_zones
 
-# Función para comprobar la posición relativa de los puntos A, B y C
-def orient(a, b, c):
-    return (b[0] - a[0]) * (c[1] - a[1]) - (b[1] - a[1]) * (c[0] - a[0])
-
-# Función para comprobar si el punto C forma parte del segmento A-B
-def on_segment(a, b, c):
-    return (min(a[0], b[0]) <= c[0] <= max(a[0], b[0]) and min(a[1], b[1]) <= c[1] <= max(a[1], b[1]))
-
-# Función para comprobar la intersección de la ruta con la zona no-fly
-def intersect(a, b, c, d):
-    o1 = orient(a, b, c)
-    o2 = orient(a, b, d)
-    o3 = orient(c, d, a)
-    o4 = orient(c, d, b)
-
-    if o1 * o2 < 0 and o3 * o4 < 0:
-        return True
-    if o1 == 0 and on_segment(a, b, c): return True
-    if o2 == 0 and on_segment(a, b, d): return True
-    if o3 == 0 and on_segment(c, d, a): return True
-    if o4 == 0 and on_segment(c, d, b): return True
-    return False
-
-# Función para comprobar si un segmento delimitado por 2 puntos cruza una zona no-fly
-def cruza_no_fly(p1, p2, zonas):
-    for zona in zonas:
-        pol = zona['poligono']
-        for i in range(len(pol)):
-            a = (pol[i]['x'], pol[i]['y'])
-            b = (pol[(i + 1) % len(pol)]['x'], pol[(i + 1) % len(pol)]['y'])
-            if intersect(p1, p2, a, b):
-                return True
-    return False
-
-# Función para calcular el grafo visible eliminando las aristas que coinciden con las zonas no-fly
-def grafo_visible(puntos, grafo_base, zonas):
-    grafo = defaultdict(dict)
-
-    for u in grafo_base:
-        for v, peso in grafo_base[u].items():
-            p1 = (puntos[u]['x'], puntos[u]['y'])
-            p2 = (puntos[v]['x'], puntos[v]['y'])
-
-            if not cruza_no_fly(p1, p2, zonas):
-                grafo[u][v] = peso
-    return grafo
+# Función para calcular el grafo visible eliminando las aristas que coinciden con las
+# zonas no-fly. Es el grafo compacto (vértices como enteros) de la adyacencia podada
+# de la tabla de seguridad precalculada
+def grafo_visible(puntos, seguridad):
+    return GrafoCompacto(puntos, seguridad.adyacencia)
 
 # Función para calcular el consumo de la ruta final.
 def calculo_consumo(ruta, grafo):
@@ -99,53 +60,89 @@ def calculo_consumo(ruta, grafo):
     for i in range(len(ruta) - 1):
         p1 = ruta[i]
         p2 = ruta[i + 1]
-       
-        # Verificamos si la arista existe en el grafo visible
-        if p2 in grafo[p1]:
-            consumo += grafo[p1][p2]['consumo']
-        # Comprobamos también el sentido contrario de la arista
-        else:
-            consumo += grafo[p2][p1]['consumo']
+
+        # Verificamos si la arista existe en el grafo visible y, si no, comprobamos
+        # también el sentido contrario de la arista
+        e = grafo.arista(p1, p2)
+        if e < 0:
+            e = grafo.arista(p2, p1)
+        if e < 0:
+            raise KeyError(f"la arista {grafo.ids[p1]}-{grafo.ids[p2]} no existe en el grafo visible")
+        consumo += grafo.consumo[e]
     return consumo
 
-# Función para encontrar el punto de recarga más cercano y accesible
-def encontrar_recarga_cercana(punto_actual, bateria_actual, puntos, puntos_recarga, grafo):
+# Función para encontrar el punto de recarga más cercano y accesible. Sin caminos
+# mínimos solo se miran las conexiones directas; con ellos (caminos.py) se prueban
+# para cada recarga el camino de menor distancia y el de menor consumo, aunque tengan
+# varios tramos, siempre que no pasen por el HUB, por entregas ya visitadas ni por
+# otra recarga. Devuelve el punto de recarga y las posiciones de las aristas del camino
+def encontrar_recarga_cercana(punto_actual, bateria_actual, grafo, caminos=None, visitados=()):
     
     mejor_recarga = None
     mejor_distancia = float('inf')
     
-    for recarga in puntos_recarga:
-        # Comprobamos si hay conexión directa
-        if recarga in grafo[punto_actual]:
-            datos = grafo[punto_actual][recarga]
-            
+    for recarga in grafo.recargas:
+        if caminos is None:
+            # Comprobamos si hay conexión directa
+            e = grafo.arista(punto_actual, recarga)
+            opciones = [[e]] if e >= 0 else []
+        else:
+            opciones = []
+            for metrica in ('distancia', 'consumo'):
+                camino = caminos.camino(metrica, punto_actual, recarga)
+                if camino is None or len(camino) < 2:
+                    continue
+                intermedios = camino[1:-1]
+                if any(v == grafo.hub or v in visitados or grafo.tipo[v] & RECARGA for v in intermedios):
+                    continue
+                opciones.append([grafo.arista(a, b) for a, b in zip(camino, camino[1:])])
+        
+        for aristas in opciones:
             # Comprobamos si se puede llegar con la batería actual
-            if bateria_actual >= datos['consumo']:
-                if datos['distancia'] < mejor_distancia:
-                    mejor_distancia = datos['distancia']
-                    mejor_recarga = (recarga, datos)
+            if bateria_actual >= sum(grafo.consumo[e] for e in aristas):
+                distancia = sum(grafo.distancia[e] for e in aristas)
+                if distancia < mejor_distancia:
+                    mejor_distancia = distancia
+                    mejor_recarga = (recarga, aristas)
     
     return mejor_recarga
 
-# Función de implementación del planificador mediante algoritmos geométricos
-def calculo_ruta(puntos, puntos_entrega, puntos_recarga, grafo, tiempo_limite, estrategia):
+# Función de implementación del planificador mediante algoritmos geométricos. Los
+# vértices son los enteros del grafo compacto y caminos son los caminos mínimos
+# precalculados (None si no está NumPy)
+def calculo_ruta(grafo, tiempo_limite, estrategia, caminos=None):
     mejor = None
     mejor_dist = float('inf')
     mejor_riesgo = float('inf')
     inicio = time.time()
-    max_mem = 0
     estados_visitados = set()
     llamadas_recursivas = [0]
 
-    # Calculamos las entregas restantes
+    # Columnas del grafo en variables locales para el bucle de la búsqueda
+    hub = grafo.hub
+    tipo = grafo.tipo
+    destino = grafo.destino
+    distancia = grafo.distancia
+    riesgo = grafo.riesgo
+    consumo = grafo.consumo
+    num_entregas = len(grafo.entregas)
+
+    # Cota inferior admisible del coste que falta desde el nodo con las entregas
+    # visitadas (cotas.py), en las unidades de la estrategia. La poda por cota no
+    # descarta la ruta óptima, pero la búsqueda sigue siendo heurística porque solo se
+    # exploran los candidatos seleccionados por prioridad en cada punto
+    cota = CotaRuta(grafo, estrategia, caminos)
+    pesos = cota.pesos
+    mejor_coste = float('inf')
+    podas_cota = 0
+
     def entregas_restantes(nodo, visitados):
-        return (len(puntos_entrega) - len(visitados)) * 20
+        return cota.restante_conjunto(nodo, visitados)
 
-    def bt(ruta, visitados, dist, riesgo, bateria, recargas, profundidad, necesita_recarga_urgente=False):
-        nonlocal mejor, mejor_dist, mejor_riesgo, max_mem
+    def bt(ruta, visitados, dist, riesgo_ruta, bateria, recargas, profundidad, necesita_recarga_urgente=False):
+        nonlocal mejor, mejor_dist, mejor_riesgo, mejor_coste, podas_cota
         
         llamadas_recursivas[0] += 1
-        max_mem = max(max_mem, memoria_mb())
         
         # Comprobamos como vamos de tiempo y paramos si es encesario
         if time.time() - inicio > tiempo_limite:
@@ -156,7 +153,7 @@ def calculo_ruta(puntos, puntos_entrega, puntos_recarga, grafo, tiempo_limite, e
             return False
         
         # Podamos los estados que no dan buenos resultados si han hecho muchos movimientos pero no han completado entregas
-        if len(ruta) > len(puntos_entrega) * 2 + 10:
+        if len(ruta) > num_entregas * 2 + 10:
             # Si hemos hecho muchos movimientos pero pocas entregas
             entregas_realizadas = len(visitados)
             if entregas_realizadas < len(ruta) / 3:
@@ -170,36 +167,28 @@ def calculo_ruta(puntos, puntos_entrega, puntos_recarga, grafo, tiempo_limite, e
         estados_visitados.add(firma)
         
         # Todas las entregas visitadas
-        if len(visitados) == len(puntos_entrega):
+        if len(visitados) == num_entregas:
             u = ruta[-1]
-            if 'HUB' in grafo[u]:
-                peso = grafo[u]['HUB']
-                if bateria >= peso['consumo']:
-                    total_dist = dist + peso['distancia']
-                    total_riesgo = riesgo + peso['riesgo']
+            e = grafo.arista(u, hub)
+            if e >= 0:
+                if bateria >= consumo[e]:
+                    total_dist = dist + distancia[e]
+                    total_riesgo = riesgo_ruta + riesgo[e]
                     
                     # Evaluamos según la estrategia elegida
-                    if estrategia == "1":
-                        valor_actual = total_dist
-                        mejor_valor = mejor_dist
-                    elif estrategia == "2":
-                        valor_actual = total_riesgo
-                        mejor_valor = mejor_riesgo
-                    else:
-                        valor_actual = total_dist + total_riesgo * 50
-                        mejor_valor = mejor_dist + mejor_riesgo * 50
+                    valor_actual = coste_estrategia(total_dist, total_riesgo, estrategia)
                     
-                    if mejor is None or valor_actual < mejor_valor:
+                    if mejor is None or valor_actual < mejor_coste:
                         mejor_dist = total_dist
                         mejor_riesgo = total_riesgo
+                        mejor_coste = valor_actual
                         mejor = {
-                            'ruta': ruta + ['HUB'],
+                            'ruta': ruta + [hub],
                             'distancia': total_dist,
                             'riesgo': total_riesgo,
                             'recargas': recargas,
                             'consumo': BATERIA_MAXIMA * recargas + (BATERIA_MAXIMA - bateria),
-                            'tiempo_ejecucion': time.time() - inicio,
-                            'memoria_maxima_mb': max_mem
+                            'tiempo_ejecucion': time.time() - inicio
                         }
             return False
 
@@ -216,17 +205,21 @@ def calculo_ruta(puntos, puntos_entrega, puntos_recarga, grafo, tiempo_limite, e
         # Si la batería está por debajo del umbral y no estamos ya yendo a una recarga buscamos un punto de recarga cercano
         if bateria < umbral_actual and not necesita_recarga_urgente:
             
-            recarga_cercana = encontrar_recarga_cercana(u, bateria, puntos, puntos_recarga, grafo)
+            recarga_cercana = encontrar_recarga_cercana(u, bateria, grafo, caminos, visitados)
             
             if recarga_cercana:
-                vecino, datos = recarga_cercana
+                vecino, aristas = recarga_cercana
                 nueva_bateria = BATERIA_MAXIMA
+                
+                # Las entregas por las que pasa el camino hasta la recarga quedan hechas
+                tramo = [destino[e] for e in aristas]
+                nuevos_visitados = visitados | {v for v in tramo if tipo[v] & ENTREGA}
 
                 detener = bt(
-                    ruta + [vecino],
-                    visitados.copy(),
-                    dist + datos['distancia'],
-                    riesgo + datos['riesgo'],
+                    ruta + tramo,
+                    nuevos_visitados,
+                    dist + sum(distancia[e] for e in aristas),
+                    riesgo_ruta + sum(riesgo[e] for e in aristas),
                     nueva_bateria,
                     recargas + 1,
                     profundidad + 1,
@@ -238,21 +231,22 @@ def calculo_ruta(puntos, puntos_entrega, puntos_recarga, grafo, tiempo_limite, e
         
         # Ordenamos los vecinos según la estrategía elegida
         vecinos = []
-        for v, peso in grafo[u].items():
-            if v == 'HUB' and len(visitados) < len(puntos_entrega):
+        for e in grafo.aristas(u):
+            v = destino[e]
+            if v == hub and len(visitados) < num_entregas:
                 continue
             
             # Si un vecino es un punto de entrega que ya hemos visitado, lo ignoramos
-            if v in puntos_entrega and v in visitados:
+            if tipo[v] & ENTREGA and v in visitados:
                 continue
             
-            if peso['consumo'] > bateria:
+            if consumo[e] > bateria:
                 continue
             
-            if v in puntos_recarga:
+            if tipo[v] & RECARGA:
                 # Revisamos si hay un bucle local en caso de que los dos últimos movimientos fueron entre las dos mismas recargas
                 if len(ruta) >= 2:
-                    if ruta[-1] in puntos_recarga and ruta[-2] in puntos_recarga:
+                    if tipo[ruta[-1]] & RECARGA and tipo[ruta[-2]] & RECARGA:
                         if v == ruta[-2]:
                             continue
                 if ruta.count(v) > 2: 
@@ -266,47 +260,47 @@ def calculo_ruta(puntos, puntos_entrega, puntos_recarga, grafo, tiempo_limite, e
             
             # Si la batería está baja damos prioridad a puntos de recarga penalizando los puntos de entrega
             if bateria < umbral_actual:
-                if v in puntos_recarga:
-                    prioridad = peso['distancia'] * 0.01
+                if tipo[v] & RECARGA:
+                    prioridad = distancia[e] * 0.01
                 else:
-                    prioridad = peso['distancia'] * 5.0
+                    prioridad = distancia[e] * 5.0
             # Si la batería no está por debajo del umbral
             else:
                 if estrategia == "1":
-                    prioridad = peso['distancia']
+                    prioridad = distancia[e]
                 elif estrategia == "2":
-                    prioridad = peso['distancia'] + peso['riesgo'] * 50
+                    prioridad = distancia[e] + riesgo[e] * 50
                 elif estrategia == "4":
-                    prioridad = peso['riesgo'] * 40 + peso['consumo'] * 10
+                    prioridad = riesgo[e] * 40 + consumo[e] * 10
                 elif estrategia == "5":
-                    prioridad = peso['distancia'] + peso['riesgo'] * 100 - peso['consumo'] * 5
+                    prioridad = distancia[e] + riesgo[e] * 100 - consumo[e] * 5
                 else:
-                    prioridad = peso['distancia'] + peso['riesgo'] * 50
+                    prioridad = distancia[e] + riesgo[e] * 50
             
             # Priorizamos los puntos de entrega no visitados
-            if v in puntos_entrega and v not in visitados:
+            if tipo[v] & ENTREGA:
                 prioridad *= 0.3
             
             # Comprobamos los puntos de recarga y los penalizamos si ya hemos pasado por ellos
-            if v in puntos_recarga:
+            if tipo[v] & RECARGA:
                 visitas_recarga = ruta.count(v)
                 if visitas_recarga > 1:
                     prioridad *= (visitas_recarga + 1)
                 recargas_seguidas = 0
                 for i in range(min(3, len(ruta))):
-                    if ruta[-i-1] in puntos_recarga:
+                    if tipo[ruta[-i-1]] & RECARGA:
                         recargas_seguidas += 1
-                if recargas_seguidas >= 2 and v in puntos_recarga:
+                if recargas_seguidas >= 2:
                     prioridad *= 2.0
             
-            vecinos.append((prioridad, v, peso))
+            vecinos.append((prioridad, v, e))
         
         # Ordenamos según la prioridad establecida por la estrategia
         vecinos.sort(key=lambda x: x[0])
         
         # Creamos una lista de posibles candidatos y, en función de las necesidades y las orioridades los priorizamos
-        entregas_candidatas = [(p, v, peso) for p, v, peso in vecinos if v in puntos_entrega]
-        recargas_candidatas = [(p, v, peso) for p, v, peso in vecinos if v in puntos_recarga]
+        entregas_candidatas = [(p, v, e) for p, v, e in vecinos if tipo[v] & ENTREGA]
+        recargas_candidatas = [(p, v, e) for p, v, e in vecinos if tipo[v] & RECARGA]
         candidatos_seleccionados = []
         
         if bateria > umbral_actual and entregas_candidatas:
@@ -317,29 +311,32 @@ def calculo_ruta(puntos, puntos_entrega, puntos_recarga, grafo, tiempo_limite, e
             if recargas_candidatas:
                 candidatos_seleccionados.extend(recargas_candidatas[:1])
                 
+        # Como mucho se exploran dos candidatos por punto (heurístico)
         if len(candidatos_seleccionados) < 2:
             candidatos_seleccionados = vecinos[:2]
         
-        for prioridad, v, peso in candidatos_seleccionados:
-            nueva_bateria = bateria - peso['consumo']
+        for prioridad, v, e in candidatos_seleccionados:
+            nueva_bateria = bateria - consumo[e]
             nuevas_recargas = recargas
             
-            if v in puntos_recarga and nueva_bateria < umbral_actual:
+            if tipo[v] & RECARGA and nueva_bateria < umbral_actual:
                 nueva_bateria = BATERIA_MAXIMA
                 nuevas_recargas += 1
 
-            estimacion = dist + peso['distancia'] + entregas_restantes(v, visitados)
-            if mejor and estimacion > mejor_dist * FACTOR_PODA:
-                continue
-            
             nuevos_visitados = set(visitados)
-            if v in puntos_entrega and v not in visitados:
+            if tipo[v] & ENTREGA and v not in visitados:
                 nuevos_visitados.add(v)
+
+            # Podamos si el coste hasta v más la cota del resto no mejora la mejor solución
+            estimacion = coste_estrategia(dist, riesgo_ruta, estrategia) + pesos[e] + entregas_restantes(v, nuevos_visitados)
+            if estimacion >= mejor_coste:
+                podas_cota += 1
+                continue
             
             # Determinamos si necesitamos recargar urgentemente
-            siguiente_necesita_recarga = (nueva_bateria < umbral_actual) and (v not in puntos_recarga)
+            siguiente_necesita_recarga = (nueva_bateria < umbral_actual) and not tipo[v] & RECARGA
             
-            detener = bt(ruta + [v], nuevos_visitados, dist + peso['distancia'], riesgo + peso['riesgo'], nueva_bateria, nuevas_recargas, profundidad + 1, siguiente_necesita_recarga)
+            detener = bt(ruta + [v], nuevos_visitados, dist + distancia[e], riesgo_ruta + riesgo[e], nueva_bateria, nuevas_recargas, profundidad + 1, siguiente_necesita_recarga)
             
             # Si el tiempo se ha agotado, finalizamos la ejecución al acabar la iteración
             if detener:
@@ -349,13 +346,13 @@ def calculo_ruta(puntos, puntos_entrega, puntos_recarga, grafo, tiempo_limite, e
 
     tiempo_inicio = time.time()
     
-    bt(['HUB'], set(), 0, 0, BATERIA_MAXIMA, 0, 0, necesita_recarga_urgente=False)
+    bt([hub], set(), 0, 0, BATERIA_MAXIMA, 0, 0, necesita_recarga_urgente=False)
     
     tiempo_total = time.time() - tiempo_inicio
     
     if mejor:
         mejor['tiempo'] = tiempo_total
-        mejor['memoria_mb'] = max_mem
+        mejor['podas_cota'] = podas_cota
     
     return mejor
 
@@ -372,7 +369,11 @@ else:
     print("Uso: python planificador_geom.py <instancia.json> <tiempo> [estrategia]")
     sys.exit(1)
 
-puntos, puntos_entrega, puntos_recarga, grafo_base, zonas = cargar_instancia(archivo_json)
+# Medición de recursos (tiempo de CPU, pico de memoria y fases)
+perfil = Perfil().iniciar()
+
+with perfil.fase("carga"):
+    puntos, puntos_entrega, puntos_recarga, grafo_base, zonas = cargar_instancia(archivo_json)
 tiempo_limite = int(sys.argv[2])
 
 print()
@@ -387,24 +388,33 @@ print(f"Puntos de entrega: {len(puntos_entrega)}")
 print(f"Puntos de recarga: {len(puntos_recarga)}")
 
 # Calculamos el grafo visible eliminando todas aquellas aristas que coincidan con alguna zona no-fly
-grafo = grafo_visible(puntos, grafo_base, zonas)
+with perfil.fase("precalculo"):
+    seguridad = TablaSeguridad(puntos, grafo_base, zonas)
+    grafo = grafo_visible(puntos, seguridad)
+    caminos = CaminosMinimos(grafo, ruta_cache(archivo_json)) if CaminosMinimos else None
+print(seguridad.resumen())
 
 # Ejecutamos el algoritmo de planificación
-res = calculo_ruta(puntos, puntos_entrega, puntos_recarga, grafo, tiempo_limite, estrategia)
+with perfil.fase("busqueda"):
+    res = calculo_ruta(grafo, tiempo_limite, estrategia, caminos)
+perfil.detener()
 
 # Mostramos los resultados
 if res:
     print(f"\nRuta encontrada ({len(res['ruta'])} nodos):")
-    print(f"Ruta: {' -> '.join(res['ruta'])}")
+    print(f"Ruta: {' -> '.join(grafo.nombres(res['ruta']))}")
     print(f"Distancia recorrida: {res['distancia']:.2f}")
     riesgo_tramo = round(res['riesgo']/len(res['ruta']), 2)
     print(f"Riesgo por tramo: {riesgo_tramo}")
-    print(f"Consumo total: {calculo_consumo(res['ruta'], grafo)}")
+    print(f"Consumo total: {calculo_consumo(res['ruta'], grafo):g}")
     print(f"Tiempo ejecución: {res['tiempo']:.2f} segundos")
-    print(f"Memoria máxima utilizada: {res['memoria_mb']:.2f} MB")
-    entregas_visitadas = sum(1 for p in res['ruta'] if p in puntos_entrega)
+    print(f"Memoria máxima utilizada: {perfil.memoria() / 1024 / 1024:.2f} MB")
+    entregas_visitadas = sum(1 for p in res['ruta'] if grafo.tipo[p] & ENTREGA)
     print(f"Puntos de entrega visitados: {entregas_visitadas}/{len(puntos_entrega)}")
     print(f"Recargas efectuadas: {res['recargas']}")
+    print(f"Candidatos podados por la cota inferior: {res['podas_cota']}")
+    perfil.imprimir()
     print()
 else:
-    print("\nNo se ha podido encontrar una solución válida completa en el tiempo establecido.\n")
\ No newline at end of file
+    print("\nNo se ha podido encontrar una solución válida completa en el tiempo establecido.\n")
+    perfil.imprimir()
\ No newline at end of file
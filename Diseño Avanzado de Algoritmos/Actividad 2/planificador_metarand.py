@@ -3,10 +3,16 @@ import json
 import math
 import random
 import time
-import psutil
-import os
 from collections import defaultdict
 import copy
+from perfilado import Perfil
+from geometria import TablaSeguridad
+from grafo_compacto import GrafoCompacto, ENTREGA, RECARGA
+
+try:
+    from caminos import CaminosMinimos, ruta_cache
+except ImportError:
+    CaminosMinimos = None
 
 # Parámetros globales del script
 BATERIA_MAXIMA = 50
@@ -18,11 +24,6 @@ ITERACIONES_POR_TEMPERATURA = 100
 MAX_ITERACIONES_SIN_MEJORA = 500
 tiempo_inicio = time.time()
 
-# Función para obtener el uso actual de memoria en MB
-def get_memoria():
-    proceso = psutil.Process(os.getpid())
-    return proceso.memory_info().rss / 1024 / 1024
-
 # Cargamos el JSON para procesar los datos (vertices, rutas, zonas no-fly, etc)
 def cargar_instancia(archivo_json):
     with open(archivo_json, 'r') as f:
@@ -53,69 +54,58 @@ def cargar_instancia(archivo_json):
     
     return puntos, puntos_entrega, puntos_recarga, grafo, nf_zones
 
-# Función para comprobar la posición relativa de los puntos A, B y C
-def orient(a, b, c):
-    return (b[0] - a[0]) * (c[1] - a[1]) - (b[1] - a[1]) * (c[0] - a[0])
-
-# Función para comprobar si el punto C forma parte del segmento A-B
-def on_segment(a, b, c):
-    return (min(a[0], b[0]) <= c[0] <= max(a[0], b[0]) and
-            min(a[1], b[1]) <= c[1] <= max(a[1], b[1]))
-
-# Función para comprobar la intersección de la ruta con la zona no-fly
-def intersect(a, b, c, d):
-    o1 = orient(a, b, c)
-    o2 = orient(a, b, d)
-    o3 = orient(c, d, a)
-    o4 = orient(c, d, b)
-
-    if o1 * o2 < 0 and o3 * o4 < 0:
-        return True
-    if o1 == 0 and on_segment(a, b, c): return True
-    if o2 == 0 and on_segment(a, b, d): return True
-    if o3 == 0 and on_segment(c, d, a): return True
-    if o4 == 0 and on_segment(c, d, b): return True
-    return False
-
-# Función para comprobar si un segmento delimitado por 2 puntos cruza una zona no-fly
-def cruza_no_fly(p1, p2, zonas, puntos):
-    a = (puntos[p1]['x'], puntos[p1]['y'])
-    b = (puntos[p2]['x'], puntos[p2]['y'])
-    
-    for zona in zonas:
-        pol = zona['poligono']
-        for i in range(len(pol)):
-            c = (pol[i]['x'], pol[i]['y'])
-            d = (pol[(i + 1) % len(pol)]['x'], pol[(i + 1) % len(pol)]['y'])
-            if intersect(a, b, c, d):
-                return True
-    return False
+# Los vértices de las rutas son los enteros del grafo compacto (grafo_compacto.py),
+# construido a partir de la tabla de seguridad con solo las aristas que no cruzan
+# ninguna zona no-fly. Los nombres solo se recuperan para mostrar la ruta
 
 # Función para comprobar que una ruta no cruce ninguna zona no-fly
-def es_ruta_segura(ruta, puntos, grafo, zonas_no_fly):
+def es_ruta_segura(ruta, grafo):
     for i in range(len(ruta) - 1):
-        if cruza_no_fly(ruta[i], ruta[i+1], zonas_no_fly, puntos):
+        if grafo.arista(ruta[i], ruta[i+1]) < 0:
             return False
     return True
 
-# Función para comprobar que un punto conecta con otro y que no cruza ninguna zona no-fly
-def es_arista_valida(p1, p2, puntos, grafo, zonas_no_fly):
-    if p2 not in grafo[p1]:
-        return False
-    return not cruza_no_fly(p1, p2, zonas_no_fly, puntos)
-
 # Función para filtrar los tramos posibles para eliminar los no deseados y devolver los válidos
-def obtener_vecinos_validos(punto_actual, puntos, grafo, zonas_no_fly, puntos_recarga, visitados=None):
+def obtener_vecinos_validos(punto_actual, grafo, puntos_recarga, visitados=None):
     vecinos = []
-    for vecino in grafo[punto_actual]:
+    for e in grafo.aristas(punto_actual):
+        vecino = grafo.destino[e]
         if vecino == punto_actual:
             continue
-        if visitados and vecino in visitados and vecino not in puntos_recarga:
+        if visitados and vecino in visitados and not grafo.tipo[vecino] & RECARGA:
             continue
-        if es_arista_valida(punto_actual, vecino, puntos, grafo, zonas_no_fly):
-            vecinos.append(vecino)
+        vecinos.append(vecino)
     return vecinos
 
+# Función para calcular la batería al final de un camino (lista de vértices desde el
+# punto actual) recargando en los puntos de recarga como en la ruta. Devuelve None si
+# algún tramo consume más batería de la que queda
+def bateria_camino(camino, bateria, grafo):
+    for a, b in zip(camino, camino[1:]):
+        e = grafo.arista(a, b)
+        if e < 0 or bateria < grafo.consumo[e]:
+            return None
+        bateria -= grafo.consumo[e]
+        if grafo.tipo[b] & RECARGA and bateria < UMBRAL_RECARGA:
+            bateria = BATERIA_MAXIMA
+    return bateria
+
+# Función para obtener los saltos de varios tramos hasta los destinos con los caminos
+# mínimos precalculados (caminos.py): se busca el camino de menor distancia a cada
+# destino y se descarta si pasa por el HUB o por algún punto de entrega antes de
+# llegar o si no hay batería para recorrerlo. Devuelve los caminos sin el punto actual
+def saltos_validos(punto_actual, destinos, bateria, grafo, caminos):
+    saltos = []
+    for destino in destinos:
+        camino = caminos.camino('distancia', punto_actual, destino)
+        if camino is None or len(camino) < 2:
+            continue
+        if any(v == grafo.hub or grafo.tipo[v] & ENTREGA for v in camino[1:-1]):
+            continue
+        if bateria_camino(camino, bateria, grafo) is not None:
+            saltos.append(camino[1:])
+    return saltos
+
 # Función para buscar y eliminar ciclos dentro de la ruta (ej. C1->C2->C1->C2)
 def eliminar_ciclos(ruta):
     if len(ruta) < 4:
@@ -137,20 +127,20 @@ def eliminar_ciclos(ruta):
     return nueva_ruta
 
 # Función para evalua la validez de una ruta, obtener sus métricas y establecer las prioridades en función de la estrategia
-def evaluar_ruta(ruta, puntos, puntos_entrega, puntos_recarga, grafo, zonas_no_fly, estrategia):
-    if ruta[0] != "HUB" or ruta[-1] != "HUB":
+def evaluar_ruta(ruta, puntos_entrega, puntos_recarga, grafo, estrategia):
+    if ruta[0] != grafo.hub or ruta[-1] != grafo.hub:
         return None
-    entregas_en_ruta = [p for p in ruta if p in puntos_entrega]
+    entregas_en_ruta = [p for p in ruta if grafo.tipo[p] & ENTREGA]
     if len(set(entregas_en_ruta)) != len(puntos_entrega):
         return None
     
     entregas_contadas = {}
     for punto in ruta[1:-1]:
-        if punto in puntos_entrega:
+        if grafo.tipo[punto] & ENTREGA:
             if punto in entregas_contadas:
                 return None
             entregas_contadas[punto] = True
-    if not es_ruta_segura(ruta, puntos, grafo, zonas_no_fly):
+    if not es_ruta_segura(ruta, grafo):
         return None
 
     distancia_total = 0
@@ -160,25 +150,20 @@ def evaluar_ruta(ruta, puntos, puntos_entrega, puntos_recarga, grafo, zonas_no_f
     recargas = 0
     
     for i in range(len(ruta) - 1):
-        p1 = ruta[i]
         p2 = ruta[i+1]
         
-        if p2 not in grafo[p1]:
-            if p1 not in grafo[p2]:
-                return None
-            peso = grafo[p2][p1]
-        else:
-            peso = grafo[p1][p2]
+        # La ruta es segura, así que todas sus aristas existen en el grafo
+        e = grafo.arista(ruta[i], p2)
 
-        if bateria < peso['consumo']:
+        if bateria < grafo.consumo[e]:
             return None
 
-        distancia_total += peso['distancia']
-        riesgo_total += peso['riesgo']
-        consumo_total += peso['consumo']
-        bateria -= peso['consumo']
+        distancia_total += grafo.distancia[e]
+        riesgo_total += grafo.riesgo[e]
+        consumo_total += grafo.consumo[e]
+        bateria -= grafo.consumo[e]
 
-        if p2 in puntos_recarga and bateria < UMBRAL_RECARGA:
+        if grafo.tipo[p2] & RECARGA and bateria < UMBRAL_RECARGA:
             bateria = BATERIA_MAXIMA
             recargas += 1
         
@@ -197,19 +182,23 @@ def evaluar_ruta(ruta, puntos, puntos_entrega, puntos_recarga, grafo, zonas_no_f
     return (True, distancia_total, riesgo_total, recargas, consumo_total, valor)
 
 # Función para eliminar ciclos de una ruta, evaluar su validez y sacar las métricas
-def limpiar_ruta(ruta, puntos, puntos_entrega, puntos_recarga, grafo, zonas_no_fly, estrategia):
+def limpiar_ruta(ruta, puntos_entrega, puntos_recarga, grafo, estrategia):
     # Primero limpiar ciclos
     ruta_fix = eliminar_ciclos(ruta)
     
     # Luego evaluar normalmente
-    return evaluar_ruta(ruta_fix, puntos, puntos_entrega, puntos_recarga, grafo, zonas_no_fly, estrategia)
+    return evaluar_ruta(ruta_fix, puntos_entrega, puntos_recarga, grafo, estrategia)
 
-# Función para generar una primera ruta aleatoria con un algoritmo voraz
-def generar_ruta_aleatoria(puntos, puntos_entrega, puntos_recarga, grafo, zonas_no_fly):
+# Función para generar una primera ruta aleatoria con un algoritmo voraz. Con caminos
+# mínimos (caminos.py), cuando no hay conexión directa con ninguna entrega pendiente
+# (o recarga, si la batería está baja) ni ningún vecino válido al que avanzar, se
+# elige un salto de varios tramos hasta una de ellas, y la vuelta al HUB también
+# puede tener varios tramos
+def generar_ruta_aleatoria(puntos_entrega, puntos_recarga, grafo, caminos=None):
 
-    ruta = ["HUB"]
+    ruta = [grafo.hub]
     bateria = BATERIA_MAXIMA
-    visitados = set(["HUB"])
+    visitados = set([grafo.hub])
     entregas_realizadas = set()
     
     # Mezclamos las entregas para orden aleatorio
@@ -230,69 +219,78 @@ def generar_ruta_aleatoria(puntos, puntos_entrega, puntos_recarga, grafo, zonas_
             # Buscamos las recargas cercanas
             recargas_validas = []
             for recarga in puntos_recarga:
-                if (recarga in grafo[punto_actual] and 
-                    not cruza_no_fly(punto_actual, recarga, zonas_no_fly, puntos) and
-                    bateria >= grafo[punto_actual][recarga]['consumo']):
+                e = grafo.arista(punto_actual, recarga)
+                if e >= 0 and bateria >= grafo.consumo[e]:
                     recargas_validas.append(recarga)
             
             if recargas_validas:
-                siguiente = random.choice(recargas_validas)
+                tramo = [random.choice(recargas_validas)]
             else:
-                vecinos_validos = obtener_vecinos_validos(punto_actual, puntos, grafo, zonas_no_fly, puntos_recarga, visitados)
-                if not vecinos_validos:
+                opciones = [[v] for v in obtener_vecinos_validos(punto_actual, grafo, puntos_recarga, visitados)]
+                if caminos and not opciones:
+                    opciones = saltos_validos(punto_actual, puntos_recarga, bateria, grafo, caminos)
+                if not opciones:
                     break
-                siguiente = random.choice(vecinos_validos)
+                tramo = random.choice(opciones)
         else:
             # Priorizamos las puntos de entrega que tenemos aún pendiente
             entregas_validas = []
             for entrega in entregas_por_visitar:
-                if (entrega in grafo[punto_actual] and 
-                    not cruza_no_fly(punto_actual, entrega, zonas_no_fly, puntos) and
-                    bateria >= grafo[punto_actual][entrega]['consumo']):
+                e = grafo.arista(punto_actual, entrega)
+                if e >= 0 and bateria >= grafo.consumo[e]:
                     entregas_validas.append(entrega)
             
             if entregas_validas:
-                siguiente = random.choice(entregas_validas)
+                tramo = [random.choice(entregas_validas)]
             else:
-                vecinos_validos = obtener_vecinos_validos(punto_actual, puntos, grafo, zonas_no_fly, puntos_recarga, visitados)
-                if not vecinos_validos:
+                opciones = [[v] for v in obtener_vecinos_validos(punto_actual, grafo, puntos_recarga, visitados)]
+                if caminos and not opciones:
+                    opciones = saltos_validos(punto_actual, entregas_por_visitar, bateria, grafo, caminos)
+                if not opciones:
                     break
-                siguiente = random.choice(vecinos_validos)
+                tramo = random.choice(opciones)
         
-        # Calculamos la batería tras el paso y comprobamos que esta no sea 0
-        consumo = grafo[punto_actual][siguiente]['consumo']
-        bateria -= consumo
+        # Recorremos el tramo (un solo punto o un salto de varios) actualizando la batería
+        for siguiente in tramo:
+            # Calculamos la batería tras el paso y comprobamos que esta no sea 0
+            consumo = grafo.consumo[grafo.arista(ruta[-1], siguiente)]
+            bateria -= consumo
+            if bateria < 0:
+                break
+            
+            # Si llegamos a una recarga con la batería por debajo del umbral, la recargamos
+            if grafo.tipo[siguiente] & RECARGA and bateria < UMBRAL_RECARGA:
+                bateria = BATERIA_MAXIMA
+            
+            ruta.append(siguiente)
+            visitados.add(siguiente)
+            
+            if siguiente in entregas_por_visitar:
+                entregas_realizadas.add(siguiente)
+                entregas_por_visitar.remove(siguiente)
         if bateria < 0:
             break
         
-        # Si llegamos a una recarga con la batería por debajo del umbral, la recargamos
-        if siguiente in puntos_recarga and bateria < UMBRAL_RECARGA:
-            bateria = BATERIA_MAXIMA
-        
-        ruta.append(siguiente)
-        visitados.add(siguiente)
-        
-        if siguiente in entregas_por_visitar:
-            entregas_realizadas.add(siguiente)
-            entregas_por_visitar.remove(siguiente)
-        
         intentos += 1
     
     # Si se han visitado todos los puntos de entrega se intenta volver al HUB y se devuelve la ruta habiéndola limpiado
     # de posibles ciclos
     if entregas_realizadas == set(puntos_entrega):
         punto_actual = ruta[-1]
-        if ("HUB" in grafo[punto_actual] and 
-            not cruza_no_fly(punto_actual, "HUB",  zonas_no_fly, puntos) and
-            bateria >= grafo[punto_actual]["HUB"]['consumo']):
-            ruta.append("HUB")
+        e = grafo.arista(punto_actual, grafo.hub)
+        if e >= 0 and bateria >= grafo.consumo[e]:
+            ruta.append(grafo.hub)
+            return eliminar_ciclos(ruta)
+        saltos = saltos_validos(punto_actual, [grafo.hub], bateria, grafo, caminos) if caminos else []
+        if saltos:
+            ruta.extend(saltos[0])
             return eliminar_ciclos(ruta)
     
     return None
 
 # Función base del simmulated annealing. Comprueba las vecindades de la ruta aleatoria inicialmente generada y
 # trata de obtener un mejor resultado a partir de ellas
-def generar_vecino(ruta, puntos, puntos_entrega, puntos_recarga, grafo, zonas_no_fly):
+def generar_vecino(ruta, puntos_entrega, puntos_recarga, grafo):
 
     if len(ruta) <= 3:
         return ruta.copy()
@@ -326,21 +324,22 @@ def generar_vecino(ruta, puntos, puntos_entrega, puntos_recarga, grafo, zonas_no
         nueva_ruta.insert(j, elemento)   
     
     # Nos aseguramos de que la ruta empiece y finalice en el HUB y quitamos los posibles ciclos antes de finalizar
-    if nueva_ruta[0] != "HUB":
-        nueva_ruta.insert(0, "HUB")
-    if nueva_ruta[-1] != "HUB":
-        nueva_ruta.append("HUB")
+    if nueva_ruta[0] != grafo.hub:
+        nueva_ruta.insert(0, grafo.hub)
+    if nueva_ruta[-1] != grafo.hub:
+        nueva_ruta.append(grafo.hub)
     return eliminar_ciclos(nueva_ruta)
 
 # Implementación de simmulated annealing para la generación de la ruta
-def calculo_ruta(puntos, puntos_entrega, puntos_recarga, grafo, zonas_no_fly, tiempo_limite, estrategia, max_memoria=None):
-    max_mem = get_memoria()
+# Con caminos (caminos.py, None si no está NumPy) la ruta inicial puede saltar entre
+# entregas por sus caminos mínimos
+def calculo_ruta(puntos_entrega, puntos_recarga, grafo, tiempo_limite, estrategia, max_memoria=None, caminos=None):
     
     # Generamos una solución inicial de forma aleatoria mediante un algoritmo voraz
     solucion_actual = None
     intentos_iniciales = 0
     while solucion_actual is None and intentos_iniciales < 50:
-        solucion_actual = generar_ruta_aleatoria(puntos, puntos_entrega, puntos_recarga, grafo, zonas_no_fly)
+        solucion_actual = generar_ruta_aleatoria(puntos_entrega, puntos_recarga, grafo, caminos)
         intentos_iniciales += 1
         if time.time() - tiempo_inicio > tiempo_limite:
             return None
@@ -349,7 +348,7 @@ def calculo_ruta(puntos, puntos_entrega, puntos_recarga, grafo, zonas_no_fly, ti
         return None
     
     # Evaluamos la solución inicial eliminando los posibles ciclos
-    eval_actual = limpiar_ruta(solucion_actual, puntos, puntos_entrega, puntos_recarga, grafo, zonas_no_fly, estrategia)
+    eval_actual = limpiar_ruta(solucion_actual, puntos_entrega, puntos_recarga, grafo, estrategia)
     if eval_actual is None:
         return None
     es_valida_actual, dist_actual, riesgo_actual, recargas_actual, consumo_actual, valor_actual = eval_actual
@@ -375,8 +374,8 @@ def calculo_ruta(puntos, puntos_entrega, puntos_recarga, grafo, zonas_no_fly, ti
             soluciones_generadas += 1
             
             # Generamos vecinos de forma aleatoria y los evaluamos para comprobar que sea válido
-            solucion_vecina = generar_vecino(solucion_actual, puntos, puntos_entrega, puntos_recarga, grafo, zonas_no_fly)
-            eval_vecina = limpiar_ruta(solucion_vecina, puntos, puntos_entrega, puntos_recarga, grafo, zonas_no_fly, estrategia)
+            solucion_vecina = generar_vecino(solucion_actual, puntos_entrega, puntos_recarga, grafo)
+            eval_vecina = limpiar_ruta(solucion_vecina, puntos_entrega, puntos_recarga, grafo, estrategia)
             if eval_vecina is None:
                 continue
             
@@ -411,9 +410,6 @@ def calculo_ruta(puntos, puntos_entrega, puntos_recarga, grafo, zonas_no_fly, ti
                     soluciones_aceptadas += 1
                     iteraciones_sin_mejora += 1
             
-            # Actualizamos el uso de memoria
-            max_mem = max(max_mem, get_memoria())
-            
             # Comprobamos que nos quede tiempo
             if time.time() - tiempo_inicio > tiempo_limite:
                 break
@@ -429,7 +425,7 @@ def calculo_ruta(puntos, puntos_entrega, puntos_recarga, grafo, zonas_no_fly, ti
             break
     
     # Nos aseguramos de que la mejor solucion actual esté libre de ciclos y guardamos las métricas
-    mejor_eval = limpiar_ruta(mejor_solucion, puntos, puntos_entrega, puntos_recarga, grafo, zonas_no_fly, estrategia) 
+    mejor_eval = limpiar_ruta(mejor_solucion, puntos_entrega, puntos_recarga, grafo, estrategia) 
     es_valida, distancia, riesgo, recargas, consumo, valor = mejor_eval  
     
     res = {
@@ -438,7 +434,6 @@ def calculo_ruta(puntos, puntos_entrega, puntos_recarga, grafo, zonas_no_fly, ti
         'riesgo': riesgo,
         'consumo': consumo,
         'recargas': recargas,
-        'memoria_maxima_mb': max_mem,
         'iteraciones_totales': iteraciones_totales,
         'soluciones_generadas': soluciones_generadas,
         'soluciones_aceptadas': soluciones_aceptadas,
@@ -460,7 +455,18 @@ elif len(sys.argv) == 4 and sys.argv[3] in ("1","2","3","4","5"):
 else:
     print("Uso: python planificador_geom.py <instancia.json> <tiempo> [estrategia]")
     sys.exit(1)
-puntos, puntos_entrega, puntos_recarga, grafo, zonas_no_fly = cargar_instancia(archivo_json)
+
+# Medición de recursos (tiempo de CPU, pico de memoria y fases)
+perfil = Perfil().iniciar()
+
+with perfil.fase("carga"):
+    puntos, puntos_entrega, puntos_recarga, grafo, zonas_no_fly = cargar_instancia(archivo_json)
+
+# Precalculamos qué aristas cruzan alguna zona no-fly
+with perfil.fase("precalculo"):
+    seguridad = TablaSeguridad(puntos, grafo, zonas_no_fly)
+    grafo_seguro = GrafoCompacto(puntos, seguridad.adyacencia)
+    caminos = CaminosMinimos(grafo_seguro, ruta_cache(archivo_json)) if CaminosMinimos else None
 
 print()
 print("="*100)
@@ -472,29 +478,33 @@ print(f"Umbral de recarga: {UMBRAL_RECARGA}%")
 print(f"Vértices totales (sin HUB): {len(puntos)-1}")
 print(f"Puntos de entrega: {len(puntos_entrega)}")
 print(f"Puntos de recarga: {len(puntos_recarga)}")
+print(seguridad.resumen())
 
 # Ejecutamos el algoritmo de planificación aleatorio que puede no devolver resultado y únicamente paramos cuando se obtenga una ruta válida (Algoritmo Las Vegas)
 intentos = 0
 while True:
     intentos += 1
-    res = calculo_ruta(puntos, puntos_entrega, puntos_recarga, grafo, zonas_no_fly, tiempo_limite, estrategia)  
+    with perfil.fase("busqueda"):
+        res = calculo_ruta(grafo_seguro.entregas, grafo_seguro.recargas, grafo_seguro, tiempo_limite, estrategia, caminos=caminos)  
     if res:
         # Paramos el tiempo de ejecución
         tiempo_total = time.time() - tiempo_inicio
         break
+perfil.detener()
         
 # Mostramos los resultados
 print(f"\nRuta encontrada ({len(res['ruta'])} nodos):")
-print(f"Ruta: {' -> '.join(res['ruta'])}")
+print(f"Ruta: {' -> '.join(grafo_seguro.nombres(res['ruta']))}")
 print(f"Distancia recorrida: {res['distancia']:.2f}")
 riesgo_tramo = round(res['riesgo']/len(res['ruta']), 2)
 print(f"Riesgo por tramo: {riesgo_tramo}")
 print(f"Consumo total: {res['consumo']:.2f}")
 print(f"Tiempo ejecución: {tiempo_total:.2f} segundos")
-print(f"Memoria máxima utilizada: {res['memoria_maxima_mb']:.2f} MB")
-entregas_visitadas = sum(1 for p in res['ruta'] if p in puntos_entrega)
+print(f"Memoria máxima utilizada: {perfil.memoria() / 1024 / 1024:.2f} MB")
+entregas_visitadas = sum(1 for p in res['ruta'] if grafo_seguro.tipo[p] & ENTREGA)
 print(f"Puntos de entrega visitados: {entregas_visitadas}/{len(puntos_entrega)}")
 print(f"Recargas efectuadas: {res['recargas']}")
 print(f"Total de intentos del algoritmo Las Vegas: {intentos}")
+perfil.imprimir()
 print()
 